@@ -6,11 +6,7 @@ export const getAdminSummary = async () => {
   return data;
 };
 
-/**
- * Obtiene logs de bitácora con filtros opcionales
- * @param {Object} filtros - Objeto con filtros: fecha, usuario, accion
- */
-export const obtenerLogsFiltrados = async (filtros = {}) => {
+const parametrosBitacora = (filtros = {}) => {
   const params = new URLSearchParams();
   
   if (filtros.fecha) {
@@ -22,7 +18,41 @@ export const obtenerLogsFiltrados = async (filtros = {}) => {
   if (filtros.accion) {
     params.append('accion', filtros.accion);
   }
+  return params;
+};
+
+/**
+ * Obtiene una página de logs de bitácora con filtros opcionales
+ * @param {Object} filtros - Objeto con filtros: fecha, usuario, accion
+ * @param {string|null} siguiente - URL `siguiente` de la página anterior (null para la primera)
+ * @returns {{ total, siguiente, logs }} - `siguiente` es null en la última página
+ */
+export const obtenerLogsFiltrados = async (filtros = {}, siguiente = null) => {
+  const params = parametrosBitacora(filtros);
+  // Se toma sólo el cursor de `siguiente`: la URL absoluta que arma el backend puede
+  // no coincidir con la de axiosInstance (proxy, http/https)
+  const cursor = siguiente && new URL(siguiente).searchParams.get('cursor');
+  if (cursor) {
+    params.append('cursor', cursor);
+  }
   
   const { data } = await axiosInstance.get(`/api/reportes/bitacora/?${params.toString()}`);
   return data;
-};
\ No newline at end of file
+};
+
+/**
+ * Exportación completa de la bitácora filtrada (todas las filas, no sólo las cargadas)
+ * @param {Object} filtros - Objeto con filtros: fecha, usuario, accion
+ * @param {string} formato - 'csv' o 'ndjson'
+ * @returns {Blob}
+ */
+export const exportarBitacora = async (filtros = {}, formato = 'csv') => {
+  const params = parametrosBitacora(filtros);
+  params.append('formato', formato);
+  // Sin timeout: el backend envía el archivo en streaming y puede tardar más que una página
+  const { data } = await axiosInstance.get(`/api/reportes/bitacora/exportar/?${params.toString()}`, {
+    responseType: 'blob',
+    timeout: 0,
+  });
+  return data;
+};
@@ -2,14 +2,18 @@ import React, { useState, useEffect } from 'react';
 import { obtenerLogsFiltrados } from '../api/admin';
 import { 
   generarReporteBitacoraPDF, 
-  generarReporteBitacoraExcel, 
-  generarReporteBitacoraJSON 
+  generarReporteBitacoraCSV, 
+  generarReporteBitacoraNDJSON 
 } from '../services/reportService';
 
 const BitacoraPage = () => {
   const [logs, setLogs] = useState([]);
   const [total, setTotal] = useState(0);
+  // URL de la página siguiente (null en la última); el backend devuelve 100 registros por página
+  const [siguiente, setSiguiente] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [cargandoMas, setCargandoMas] = useState(false);
+  const [exportando, setExportando] = useState(null);
   const [error, setError] = useState(null);
 
   // Filtros
@@ -18,19 +22,23 @@ const BitacoraPage = () => {
     usuario: '',
     accion: ''
   });
+  // Filtros con los que se pidió la primera página: los usan "Cargar más" y las exportaciones
+  const [filtrosAplicados, setFiltrosAplicados] = useState({});
 
   // Cargar logs al montar y cuando cambien los filtros
   useEffect(() => {
     solicitarLogs();
   }, []);
 
-  const solicitarLogs = async () => {
+  const solicitarLogs = async (filtrosConsulta = filtros) => {
     setLoading(true);
     setError(null);
     try {
-      const data = await obtenerLogsFiltrados(filtros);
+      const data = await obtenerLogsFiltrados(filtrosConsulta);
       setLogs(data.logs);
       setTotal(data.total);
+      setSiguiente(data.siguiente);
+      setFiltrosAplicados(filtrosConsulta);
     } catch (err) {
       console.error('Error al obtener loges:', err);
       setError('Error al cargar la bitácora');
@@ -39,6 +47,33 @@ const BitacoraPage = () => {
     }
   };
 
+  const cargarMas = async () => {
+    if (!siguiente) return;
+    setCargandoMas(true);
+    try {
+      const data = await obtenerLogsFiltrados(filtrosAplicados, siguiente);
+      setLogs(prev => [...prev, ...data.logs]);
+      setSiguiente(data.siguiente);
+    } catch (err) {
+      console.error('Error al obtener loges:', err);
+      setError('Error al cargar más registros de la bitácora');
+    } finally {
+      setCargandoMas(false);
+    }
+  };
+
+  const exportar = async (formato, generar) => {
+    setExportando(formato);
+    try {
+      await generar(filtrosAplicados);
+    } catch (err) {
+      console.error('Error al exportar la bitácora:', err);
+      setError('Error al exportar la bitácora');
+    } finally {
+      setExportando(null);
+    }
+  };
+
   const handleFiltroChange = (e) => {
     const { name, value } = e.target;
     setFiltros(prev => ({
@@ -57,13 +92,8 @@ const BitacoraPage = () => {
       usuario: '',
       accion: ''
     });
-    // Forzar recarga sin filtros
-    setTimeout(() => {
-      obtenerLogsFiltrados({}).then(data => {
-        setLogs(data.logs);
-        setTotal(data.total);
-      });
-    }, 100);
+    // Recargar sin filtros
+    solicitarLogs({});
   };
 
   const consultarDatos = (logId) => {
@@ -79,10 +109,7 @@ const BitacoraPage = () => {
       [criterio]: valor
     }));
     // Auto-aplicar
-    obtenerLogsFiltrados({ ...filtros, [criterio]: valor }).then(data => {
-      setLogs(data.logs);
-      setTotal(data.total);
-    });
+    solicitarLogs({ ...filtros, [criterio]: valor });
   };
 
   const formatearFecha = (fechaISO) => {
@@ -201,6 +228,9 @@ const BitacoraPage = () => {
             <p className="text-indigo-800 font-semibold">
               📊 Total de registros encontrados: <span className="text-2xl">{total}</span>
             </p>
+            <p className="text-indigo-600 text-sm">
+              Mostrando {logs.length} registros (más recientes primero). El total puede ser aproximado en bitácoras muy grandes.
+            </p>
           </div>
         )}
 
@@ -220,22 +250,27 @@ const BitacoraPage = () => {
             </div>
             <div className="flex flex-wrap gap-3">
               <button
-                onClick={() => generarReporteBitacoraPDF(logs, filtros)}
+                onClick={() => generarReporteBitacoraPDF(logs, filtrosAplicados)}
+                title="Incluye sólo los registros cargados en pantalla"
                 className="flex items-center gap-2 bg-gradient-to-r from-red-500 to-red-600 text-white px-5 py-3 rounded-xl font-semibold hover:from-red-600 hover:to-red-700 transition-all duration-300 shadow-lg hover:shadow-xl transform hover:scale-105"
               >
-                Exportar PDF
+                Exportar PDF ({logs.length} cargados)
               </button>
               <button
-                onClick={() => generarReporteBitacoraExcel(logs, filtros)}
+                onClick={() => exportar('csv', generarReporteBitacoraCSV)}
+                disabled={exportando !== null}
+                title="Todos los registros que cumplen los filtros"
                 className="flex items-center gap-2 bg-gradient-to-r from-green-500 to-emerald-600 text-white px-5 py-3 rounded-xl font-semibold hover:from-green-600 hover:to-emerald-700 transition-all duration-300 shadow-lg hover:shadow-xl transform hover:scale-105"
               >
-                Exportar Excel
+                {exportando === 'csv' ? 'Exportando...' : 'Exportar Excel (CSV)'}
               </button>
               <button
-                onClick={() => generarReporteBitacoraJSON(logs, filtros)}
+                onClick={() => exportar('ndjson', generarReporteBitacoraNDJSON)}
+                disabled={exportando !== null}
+                title="Todos los registros que cumplen los filtros"
                 className="flex items-center gap-2 bg-gradient-to-r from-purple-500 to-indigo-600 text-white px-5 py-3 rounded-xl font-semibold hover:from-purple-600 hover:to-indigo-700 transition-all duration-300 shadow-lg hover:shadow-xl transform hover:scale-105"
               >
-                Exportar JSON
+                {exportando === 'ndjson' ? 'Exportando...' : 'Exportar JSON (NDJSON)'}
               </button>
             </div>
           </div>
@@ -323,6 +358,17 @@ const BitacoraPage = () => {
                 </tbody>
               </table>
             </div>
+            {siguiente && (
+              <div className="p-4 text-center border-t border-gray-200">
+                <button
+                  onClick={cargarMas}
+                  disabled={cargandoMas}
+                  className="bg-slate-600 text-white px-6 py-2 rounded-lg font-semibold hover:bg-slate-700 transition shadow-md disabled:opacity-50"
+                >
+                  {cargandoMas ? 'Cargando...' : '⬇️ Cargar más'}
+                </button>
+              </div>
+            )}
           </div>
         )}
 
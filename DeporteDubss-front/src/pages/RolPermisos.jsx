@@ -1,6 +1,7 @@
 
 import React, { useState, useEffect } from 'react';
 import axiosInstance from '../api/axiosInstance';
+import { getRoles } from '../api/auth';
 
 function RolPermisos() {
     const [permisos, setPermisos] = useState([]);
@@ -29,7 +30,7 @@ function RolPermisos() {
     };
     const fetchRoles = async () => {
         try {
-            const res = await axiosInstance.get('/api/roles/');
+            const res = await getRoles();
             setRoles(res.data);
         } catch (err) {
             setError('Error al cargar roles');
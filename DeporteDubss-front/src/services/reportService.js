@@ -2,6 +2,7 @@ import jsPDF from 'jspdf';
 import autoTable from 'jspdf-autotable';
 import * as XLSX from 'xlsx';
 import { saveAs } from 'file-saver';
+import { exportarBitacora } from '../api/admin';
 
 /**
  * Servicio para generar reportes en múltiples formatos
@@ -11,6 +12,7 @@ import { saveAs } from 'file-saver';
 // REPORTES DE BITÁCORA
 // ============================================
 
+// PDF de los registros cargados en pantalla (las páginas ya pedidas al backend)
 export const generarReporteBitacoraPDF = (logs, filtros = {}) => {
     const doc = new jsPDF();
     
@@ -93,61 +95,16 @@ export const generarReporteBitacoraPDF = (logs, filtros = {}) => {
     doc.save(`bitacora_${new Date().getTime()}.pdf`);
 };
 
-export const generarReporteBitacoraExcel = (logs, filtros = {}) => {
-    // Preparar datos
-    const data = logs.map(log => ({
-        'ID': log.id,
-        'Usuario': `${log.usuario.nombre} ${log.usuario.apellido}`,
-        'Correo': log.usuario.correo,
-        'Rol': log.usuario.rol || 'N/A',
-        'Acción': log.accion,
-        'Fecha': new Date(log.fecha).toLocaleString('es-ES'),
-        'Detalle': log.detalle || 'N/A'
-    }));
-    
-    // Crear hoja de cálculo
-    const ws = XLSX.utils.json_to_sheet(data);
-    
-    // Ajustar ancho de columnas
-    ws['!cols'] = [
-        { wch: 8 },  // ID
-        { wch: 25 }, // Usuario
-        { wch: 30 }, // Correo
-        { wch: 15 }, // Rol
-        { wch: 20 }, // Acción
-        { wch: 20 }, // Fecha
-        { wch: 40 }  // Detalle
-    ];
-    
-    // Crear libro
-    const wb = XLSX.utils.book_new();
-    XLSX.utils.book_append_sheet(wb, ws, 'Bitácora');
-    
-    // Guardar archivo
-    XLSX.writeFile(wb, `bitacora_${new Date().getTime()}.xlsx`);
+// Excel (CSV) y JSON (NDJSON) usan la exportación en streaming del backend: incluyen
+// toda la bitácora filtrada, no sólo las páginas cargadas en pantalla
+export const generarReporteBitacoraCSV = async (filtros = {}) => {
+    const blob = await exportarBitacora(filtros, 'csv');
+    saveAs(blob, `bitacora_${new Date().getTime()}.csv`);
 };
 
-export const generarReporteBitacoraJSON = (logs, filtros = {}) => {
-    const reporte = {
-        titulo: 'Reporte de Bitácora del Sistema',
-        fechaGeneracion: new Date().toISOString(),
-        filtrosAplicados: filtros,
-        totalRegistros: logs.length,
-        datos: logs.map(log => ({
-            id: log.id,
-            usuario: {
-                nombre: `${log.usuario.nombre} ${log.usuario.apellido}`,
-                correo: log.usuario.correo,
-                rol: log.usuario.rol
-            },
-            accion: log.accion,
-            fecha: log.fecha,
-            detalle: log.detalle
-        }))
-    };
-    
-    const blob = new Blob([JSON.stringify(reporte, null, 2)], { type: 'application/json' });
-    saveAs(blob, `bitacora_${new Date().getTime()}.json`);
+export const generarReporteBitacoraNDJSON = async (filtros = {}) => {
+    const blob = await exportarBitacora(filtros, 'ndjson');
+    saveAs(blob, `bitacora_${new Date().getTime()}.ndjson`);
 };
 
 // ============================================
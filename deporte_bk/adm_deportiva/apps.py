@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AdmDeportivaConfig(AppConfig):
     name = 'adm_deportiva'
+
+    def ready(self):
+        # Conecta las señales que mantienen las tablas de posiciones
+        from . import signals
@@ -0,0 +1,43 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from deporte_bd.models import Campeonato
+from adm_deportiva.round_robin import FixtureError, generate_fixture
+
+class Command(BaseCommand):
+    help = 'Genera el fixture completo (todos contra todos) de un campeonato con sus equipos inscritos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campeonato', type=int, help='ID del campeonato')
+        parser.add_argument('--ida-y-vuelta', action='store_true', help='Dos ruedas, con la localía invertida en la segunda')
+        parser.add_argument('--fecha-inicio', help='Fecha de la primera jornada (YYYY-MM-DD); por defecto Fecha_Inicio')
+        parser.add_argument('--dias', type=int, default=7, help='Días entre jornadas')
+        parser.add_argument('--instalacion', type=int, default=None, help='Instalación asignada a los partidos')
+        parser.add_argument('--reemplazar', action='store_true', help='Reemplaza un fixture existente sin resultados')
+
+    def handle(self, *args, **options):
+        try:
+            campeonato = Campeonato.objects.get(pk=options['campeonato'])
+        except Campeonato.DoesNotExist:
+            raise CommandError("Campeonato no encontrado")
+        try:
+            fecha_inicio = datetime.strptime(options['fecha_inicio'], '%Y-%m-%d').date() if options['fecha_inicio'] else None
+        except ValueError:
+            raise CommandError("--fecha-inicio debe tener formato YYYY-MM-DD")
+
+        start = time.perf_counter()
+        try:
+            jornadas, partidos = generate_fixture(
+                campeonato,
+                double=options['ida_y_vuelta'],
+                start_date=fecha_inicio,
+                days_between=options['dias'],
+                instalacion_id=options['instalacion'],
+                replace=options['reemplazar'],
+            )
+        except FixtureError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Fixture generado: {jornadas} jornadas y {partidos} partidos en {(time.perf_counter() - start) * 1000:.0f} ms"
+        ))
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from deporte_bd.models import Campeonato
+from adm_deportiva.scheduler import (
+    DEFAULT_DAYS_BETWEEN, DEFAULT_REST_DAYS, DEFAULT_WINDOW_DAYS, ScheduleError, schedule_championship
+)
+
+class Command(BaseCommand):
+    help = 'Asigna día e instalación a los partidos pendientes de un campeonato'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campeonato', type=int, help='ID del campeonato')
+        parser.add_argument('--descanso', type=int, default=DEFAULT_REST_DAYS,
+                            help='Días libres mínimos entre dos partidos de un equipo')
+        parser.add_argument('--ventana', type=int, default=DEFAULT_WINDOW_DAYS,
+                            help='Días que dura cada jornada a partir de su fecha')
+        parser.add_argument('--fecha-inicio', help='Fecha base para jornadas sin fecha (YYYY-MM-DD)')
+        parser.add_argument('--dias', type=int, default=DEFAULT_DAYS_BETWEEN, help='Días entre jornadas sin fecha')
+        parser.add_argument('--simular', action='store_true', help='Calcula la programación sin guardarla')
+
+    def handle(self, *args, **options):
+        try:
+            campeonato = Campeonato.objects.get(pk=options['campeonato'])
+        except Campeonato.DoesNotExist:
+            raise CommandError("Campeonato no encontrado")
+        try:
+            fecha_inicio = datetime.strptime(options['fecha_inicio'], '%Y-%m-%d').date() if options['fecha_inicio'] else None
+        except ValueError:
+            raise CommandError("--fecha-inicio debe tener formato YYYY-MM-DD")
+
+        try:
+            resumen = schedule_championship(
+                campeonato, rest_days=options['descanso'], window_days=options['ventana'],
+                start_date=fecha_inicio, days_between=options['dias'], dry_run=options['simular']
+            )
+        except ScheduleError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Programados {resumen['programados']} partidos en {resumen['tiempo_ms']} ms"
+        ))
+        if resumen['sin_programar']:
+            self.stdout.write(self.style.WARNING(
+                f"Sin lugar en su jornada: {len(resumen['sin_programar'])} partidos "
+                f"({', '.join(map(str, resumen['sin_programar'][:20]))})"
+            ))
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from deporte_bd.models import Campeonato
+from adm_deportiva.standings import rebuild_many
+
+class Command(BaseCommand):
+    help = ('Recalcula las tablas de posiciones (Historial) desde los partidos jugados, '
+            'con una consulta agregada por campeonato')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campeonato', type=int, action='append', dest='campeonatos',
+                            help='Campeonato a recalcular (repetible)')
+        parser.add_argument('--all', action='store_true', help='Recalcula todos los campeonatos')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Procesos que recalculan campeonatos en paralelo')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            campeonatos = list(Campeonato.objects.order_by('id').values_list('id', flat=True))
+        elif options['campeonatos']:
+            campeonatos = options['campeonatos']
+            faltantes = set(campeonatos) - set(Campeonato.objects.filter(id__in=campeonatos).values_list('id', flat=True))
+            if faltantes:
+                raise CommandError(f"Campeonatos inexistentes: {', '.join(map(str, sorted(faltantes)))}")
+        else:
+            raise CommandError("Indique --campeonato ID o --all")
+
+        workers = max(options['workers'], 1)
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite admite un solo escritor: los procesos sólo se bloquearían entre sí
+            self.stdout.write(self.style.WARNING("SQLite no admite escrituras concurrentes: se usa un solo proceso"))
+            workers = 1
+
+        start = time.perf_counter()
+        filas = partidos = 0
+        for campeonato_id, c_filas, c_partidos, segundos in rebuild_many(campeonatos, workers=workers):
+            filas += c_filas
+            partidos += c_partidos
+            self.stdout.write(f"Campeonato {campeonato_id}: {c_filas} filas, {c_partidos} partidos en {segundos * 1000:.1f} ms")
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Tablas recalculadas: {len(campeonatos)} campeonatos, {filas} filas y {partidos} partidos "
+            f"en {elapsed:.2f} s ({filas / elapsed:.0f} filas/s, {partidos / elapsed:.0f} partidos/s, "
+            f"{workers} procesos)"
+        ))
@@ -0,0 +1,107 @@
+"""
+Generación del fixture completo de un campeonato (todos contra todos).
+
+Las jornadas se arman con el método del círculo: un equipo queda fijo y el resto rota
+una posición por jornada. La localía sigue el esquema de De Werra, que alterna local y
+visitante con el mínimo de "quiebres" (n - 2) y deja a cada equipo con la misma cantidad
+de partidos de local (±1). Con una cantidad impar de equipos se agrega un descanso
+(bye). En ida y vuelta la segunda rueda repite la primera con la localía invertida.
+
+Todas las jornadas (Fixture) y partidos se insertan con bulk_create en una sola
+transacción.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+
+from deporte_bd.models import Fixture, Historial, Instalacion, Partido
+from adm_recursos.calendario import refresh as refresh_calendario
+
+
+class FixtureError(ValueError):
+    """El fixture no se puede generar con los datos del campeonato."""
+
+
+def round_robin(team_ids, double=False):
+    """
+    Jornadas de un todos contra todos: lista de jornadas, cada una una lista de
+    (local, visitante). Los equipos que descansan no aparecen en su jornada.
+    """
+    teams = list(team_ids)
+    if len(set(teams)) != len(teams):
+        raise FixtureError("Hay equipos repetidos")
+    if len(teams) < 2:
+        raise FixtureError("Se necesitan al menos dos equipos")
+    if len(teams) % 2:
+        teams.append(None)
+
+    n = len(teams)
+    circle, fixed = teams[:-1], teams[-1]
+    size = n - 1
+    rounds = []
+    for r in range(size):
+        pairs = [(fixed, circle[r]) if r % 2 == 0 else (circle[r], fixed)]
+        for k in range(1, n // 2):
+            a, b = circle[(r + k) % size], circle[(r - k) % size]
+            pairs.append((a, b) if k % 2 else (b, a))
+        rounds.append([(home, away) for home, away in pairs if home is not None and away is not None])
+
+    if double:
+        rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+    return rounds
+
+
+def generate_fixture(campeonato, double=False, start_date=None, days_between=7,
+                     instalacion_id=None, replace=False):
+    """
+    Genera e inserta el fixture del campeonato con sus equipos inscritos (Historial).
+    - start_date: fecha de la primera jornada (por defecto Fecha_Inicio del campeonato);
+      las siguientes se separan `days_between` días. Sin fecha las jornadas quedan sin fecha.
+    - instalacion_id: instalación asignada a los partidos (por defecto la primera activa).
+    - replace: elimina antes las jornadas existentes si ninguno de sus partidos tiene resultado.
+    Devuelve (jornadas, partidos) creados.
+    """
+    team_ids = list(
+        Historial.objects.filter(IDCampeonato=campeonato).order_by('id').values_list('IDEquipo_id', flat=True)
+    )
+    rounds = round_robin(team_ids, double=double)
+
+    if instalacion_id is not None:
+        instalacion = Instalacion.objects.filter(pk=instalacion_id).first()
+        if instalacion is None:
+            raise FixtureError("Instalación no encontrada")
+    else:
+        instalacion = Instalacion.objects.filter(Estado=1).order_by('id').first() or Instalacion.objects.order_by('id').first()
+        if instalacion is None:
+            raise FixtureError("No hay instalaciones registradas")
+
+    start_date = start_date or campeonato.Fecha_Inicio
+
+    with transaction.atomic():
+        existentes = Fixture.objects.select_for_update().filter(IDCampeonato=campeonato)
+        if existentes.exists():
+            if not replace:
+                raise FixtureError("El campeonato ya tiene jornadas (use reemplazar para regenerarlas)")
+            if Partido.objects.filter(IDFixture__IDCampeonato=campeonato, IDResultado__isnull=False).exists():
+                raise FixtureError("No se puede reemplazar un fixture con resultados cargados")
+            existentes.delete()
+
+        fixtures = Fixture.objects.bulk_create([
+            Fixture(
+                IDCampeonato=campeonato,
+                Numero=numero,
+                Fecha=start_date + timedelta(days=days_between * (numero - 1)) if start_date else None
+            )
+            for numero in range(1, len(rounds) + 1)
+        ])
+        partidos = Partido.objects.bulk_create([
+            Partido(
+                IDFixture=fixture, IDInstalacion=instalacion, Fecha=fixture.Fecha,
+                IDEquipo_Local_id=home, IDEquipo_Visitante_id=away
+            )
+            for fixture, pairs in zip(fixtures, rounds)
+            for home, away in pairs
+        ], batch_size=1000)
+        # bulk_create no dispara señales: se cargan las filas del calendario
+        refresh_calendario(Partido.objects.filter(IDFixture__IDCampeonato=campeonato))
+    return len(fixtures), len(partidos)
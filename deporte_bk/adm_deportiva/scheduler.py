@@ -0,0 +1,182 @@
+"""
+Programación de partidos: asigna a cada partido pendiente un día y una instalación.
+
+Restricciones:
+- sólo instalaciones activas (Instalacion.Estado = 1) y un partido por instalación y día,
+- un partido por equipo y día, con al menos `rest_days` días libres entre partidos
+  de un mismo equipo,
+- cada partido se juega dentro de la ventana de su jornada: desde Fixture.Fecha y
+  durante `window_days` días.
+
+La ocupación se lleva en memoria (OccupancyIndex): por instalación y por equipo un entero
+de Python cuyos bits son los días desde una fecha de origen, así que comprobar o marcar
+un día es una operación de bits O(1). El índice se carga una vez con los partidos ya
+programados del rango de fechas (de todos los campeonatos) y la asignación es voraz en
+orden de jornada.
+"""
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+
+from deporte_bd.models import Instalacion, Partido
+from adm_recursos.calendario import refresh as refresh_calendario
+
+DEFAULT_REST_DAYS = 2
+DEFAULT_WINDOW_DAYS = 3
+DEFAULT_DAYS_BETWEEN = 7
+
+
+class ScheduleError(ValueError):
+    """No se puede programar con los datos recibidos."""
+
+
+class OccupancyIndex:
+    """Días ocupados por instalación y por equipo, como bitsets relativos a `origin`."""
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.venues = {}
+        self.teams = {}
+
+    def day(self, fecha):
+        return (fecha - self.origin).days
+
+    def venue_free(self, venue_id, day):
+        return not (self.venues.get(venue_id, 0) >> day) & 1
+
+    def team_free(self, team_id, day, rest_days=0):
+        """El equipo no juega entre day - rest_days y day + rest_days."""
+        low = max(day - rest_days, 0)
+        mask = ((1 << (day + rest_days - low + 1)) - 1) << low
+        return not self.teams.get(team_id, 0) & mask
+
+    def add(self, venue_id, local_id, visit_id, day):
+        bit = 1 << day
+        self.venues[venue_id] = self.venues.get(venue_id, 0) | bit
+        self.teams[local_id] = self.teams.get(local_id, 0) | bit
+        self.teams[visit_id] = self.teams.get(visit_id, 0) | bit
+
+    @classmethod
+    def load(cls, start, end, queryset=None, venues=None, teams=None):
+        """
+        Índice con los partidos programados entre `start` y `end` (por Partido.Fecha o,
+        si no tiene, por la fecha de su jornada). `venues`/`teams` limitan la carga a los
+        partidos de esas instalaciones o equipos.
+        """
+        index = cls(start)
+        partidos = (queryset if queryset is not None else Partido.objects.all()).filter(
+            Q(Fecha__range=(start, end)) | Q(Fecha__isnull=True, IDFixture__Fecha__range=(start, end))
+        )
+        if venues is not None or teams is not None:
+            partidos = partidos.filter(
+                Q(IDInstalacion_id__in=venues or [])
+                | Q(IDEquipo_Local_id__in=teams or [])
+                | Q(IDEquipo_Visitante_id__in=teams or [])
+            )
+        rows = partidos.values_list(
+            'IDInstalacion_id', 'IDEquipo_Local_id', 'IDEquipo_Visitante_id', 'Fecha', 'IDFixture__Fecha'
+        )
+        for venue_id, local_id, visit_id, fecha, fecha_jornada in rows:
+            index.add(venue_id, local_id, visit_id, index.day(fecha or fecha_jornada))
+        return index
+
+
+def _active_venues():
+    return list(Instalacion.objects.filter(Estado=1).order_by('id').values_list('id', flat=True))
+
+
+def schedule_championship(campeonato, rest_days=DEFAULT_REST_DAYS, window_days=DEFAULT_WINDOW_DAYS,
+                          start_date=None, days_between=DEFAULT_DAYS_BETWEEN, dry_run=False):
+    """
+    Programa los partidos pendientes (sin resultado) de un campeonato.
+    Las jornadas sin fecha empiezan en start_date (o Fecha_Inicio) + days_between * (Numero - 1).
+    Devuelve un resumen con los partidos programados y los que no encontraron lugar.
+    """
+    started = time.perf_counter()
+    venues = _active_venues()
+    if not venues:
+        raise ScheduleError("No hay instalaciones activas")
+
+    pendientes = Partido.objects.filter(IDFixture__IDCampeonato=campeonato, IDResultado__isnull=True)
+    matches = list(
+        pendientes.order_by('IDFixture__Numero', 'id')
+        .values_list('id', 'IDEquipo_Local_id', 'IDEquipo_Visitante_id', 'IDFixture__Numero', 'IDFixture__Fecha')
+    )
+    if not matches:
+        return {'programados': 0, 'sin_programar': [], 'tiempo_ms': 0.0}
+
+    start_date = start_date or campeonato.Fecha_Inicio
+    bases = []
+    for _, _, _, numero, fecha_jornada in matches:
+        if fecha_jornada is None and start_date is None:
+            raise ScheduleError("Las jornadas no tienen fecha: indique una fecha de inicio")
+        bases.append(fecha_jornada or start_date + timedelta(days=days_between * (numero - 1)))
+
+    first = min(bases) - timedelta(days=rest_days)
+    last = max(bases) + timedelta(days=window_days + rest_days)
+    # Los pendientes de este campeonato se vuelven a programar: no ocupan lugar
+    index = OccupancyIndex.load(first, last, queryset=Partido.objects.exclude(pk__in=pendientes.values('pk')))
+
+    assigned, unscheduled = [], []
+    for i, ((partido_id, local_id, visit_id, _, _), base) in enumerate(zip(matches, bases)):
+        base_day = index.day(base)
+        placed = False
+        for day in range(base_day, base_day + window_days):
+            if not (index.team_free(local_id, day, rest_days) and index.team_free(visit_id, day, rest_days)):
+                continue
+            # Se rota la instalación inicial para repartir el uso
+            for k in range(len(venues)):
+                venue_id = venues[(i + k) % len(venues)]
+                if index.venue_free(venue_id, day):
+                    index.add(venue_id, local_id, visit_id, day)
+                    assigned.append(Partido(
+                        id=partido_id, IDInstalacion_id=venue_id, Fecha=index.origin + timedelta(days=day)
+                    ))
+                    placed = True
+                    break
+            if placed:
+                break
+        if not placed:
+            unscheduled.append(partido_id)
+
+    if not dry_run and assigned:
+        with transaction.atomic():
+            Partido.objects.bulk_update(assigned, ['IDInstalacion', 'Fecha'], batch_size=1000)
+            refresh_calendario(Partido.objects.filter(pk__in=[partido.pk for partido in assigned]))
+    return {
+        'programados': len(assigned),
+        'sin_programar': unscheduled,
+        'tiempo_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def validate_change(partido, instalacion_id, fecha, rest_days=DEFAULT_REST_DAYS):
+    """
+    Verifica si mover `partido` a (instalacion_id, fecha) genera conflictos. Sólo se cargan
+    los partidos de esa instalación y de ambos equipos en [fecha - rest_days, fecha + rest_days]
+    (índices por instalación/equipo y fecha); cada verificación es O(1) sobre el índice.
+    Devuelve la lista de conflictos (vacía si el cambio es válido).
+    """
+    estado = Instalacion.objects.filter(pk=instalacion_id).values_list('Estado', flat=True).first()
+    if estado is None:
+        return ["Instalación no encontrada"]
+
+    conflictos = []
+    if estado != 1:
+        conflictos.append("La instalación no está disponible")
+
+    local_id, visit_id = partido.IDEquipo_Local_id, partido.IDEquipo_Visitante_id
+    index = OccupancyIndex.load(
+        fecha - timedelta(days=rest_days), fecha + timedelta(days=rest_days),
+        queryset=Partido.objects.exclude(pk=partido.pk),
+        venues=[instalacion_id], teams=[local_id, visit_id]
+    )
+    day = index.day(fecha)
+    if not index.venue_free(instalacion_id, day):
+        conflictos.append("La instalación ya tiene un partido ese día")
+    for equipo_id, rol in ((local_id, 'local'), (visit_id, 'visitante')):
+        if not index.team_free(equipo_id, day, rest_days):
+            conflictos.append(f"El equipo {rol} ya tiene un partido a menos de {rest_days + 1} días de esa fecha")
+    return conflictos
@@ -49,7 +49,7 @@ class PartidoSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Partido
-        fields = ['id', 'IDPartido', 'IDFixture', 'IDInstalacion', 'IDResultado', 'IDEquipo_Local', 'IDEquipo_Visitante']
+        fields = ['id', 'IDPartido', 'IDFixture', 'IDInstalacion', 'IDResultado', 'IDEquipo_Local', 'IDEquipo_Visitante', 'Fecha']
         read_only_fields = ['id', 'IDPartido']
 
     def validate(self, data):
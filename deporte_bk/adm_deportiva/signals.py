@@ -0,0 +1,79 @@
+"""
+Mantiene las tablas de posiciones (Historial) al día con los resultados.
+
+Se compara el aporte de un partido antes y después de cada escritura y se aplica sólo
+la diferencia (ver standings.apply_change) cuando:
+- un Partido recibe, cambia o pierde su IDResultado (o cambia de equipos/jornada),
+- se guarda un Resultado ya asociado a un Partido con otros goles,
+- se elimina un Resultado o un Partido con resultado.
+
+Mover una jornada (Fixture) a otro campeonato no se sigue: se repara con rebuild_standings.
+"""
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from deporte_bd.models import Partido, Resultado
+from .standings import apply_change, is_suspended, match_contribution
+
+
+@receiver(pre_save, sender=Partido)
+def partido_pre_save(sender, instance, raw=False, **kwargs):
+    instance._tabla_previa = None
+    if raw or instance.pk is None or is_suspended():
+        return
+    instance._tabla_previa = match_contribution(instance.pk)
+
+
+@receiver(post_save, sender=Partido)
+def partido_post_save(sender, instance, raw=False, **kwargs):
+    if raw or is_suspended():
+        return
+    previa = getattr(instance, '_tabla_previa', None)
+    if previa is None and not instance.IDResultado_id:
+        return
+    apply_change(previa, match_contribution(instance.pk))
+
+
+@receiver(pre_delete, sender=Partido)
+def partido_pre_delete(sender, instance, **kwargs):
+    instance._tabla_previa = match_contribution(instance.pk) if instance.IDResultado_id else None
+
+
+@receiver(post_delete, sender=Partido)
+def partido_post_delete(sender, instance, **kwargs):
+    previa = getattr(instance, '_tabla_previa', None)
+    if previa:
+        apply_change(previa, None)
+
+
+@receiver(pre_save, sender=Resultado)
+def resultado_pre_save(sender, instance, raw=False, **kwargs):
+    instance._tabla_previa = None
+    if raw or instance.pk is None or is_suspended():
+        return
+    partido_id = Partido.objects.filter(IDResultado_id=instance.pk).values_list('id', flat=True).first()
+    if partido_id:
+        instance._tabla_previa = match_contribution(partido_id)
+
+
+@receiver(post_save, sender=Resultado)
+def resultado_post_save(sender, instance, created=False, raw=False, **kwargs):
+    # Un resultado nuevo aún no está asociado a ningún partido
+    previa = getattr(instance, '_tabla_previa', None)
+    if raw or created or previa is None:
+        return
+    apply_change(previa, previa[:3] + (instance.Goles_Local, instance.Goles_Visitante) + previa[5:])
+
+
+@receiver(pre_delete, sender=Resultado)
+def resultado_pre_delete(sender, instance, **kwargs):
+    # El partido pierde la referencia (SET_NULL) sin disparar sus señales
+    partido_id = Partido.objects.filter(IDResultado_id=instance.pk).values_list('id', flat=True).first()
+    instance._tabla_previa = match_contribution(partido_id) if partido_id else None
+
+
+@receiver(post_delete, sender=Resultado)
+def resultado_post_delete(sender, instance, **kwargs):
+    previa = getattr(instance, '_tabla_previa', None)
+    if previa:
+        apply_change(previa, None)
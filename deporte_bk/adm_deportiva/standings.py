@@ -0,0 +1,323 @@
+"""
+Tablas de posiciones (Historial) mantenidas de forma incremental.
+
+Cada resultado aporta a las filas de Historial de sus dos equipos en su campeonato:
+PJ, PG/PE/PP, GF, GC, DG y Puntos (3/1/0). Al cargar, corregir o eliminar un resultado
+se aplica sólo la diferencia entre el aporte anterior y el nuevo, con expresiones F()
+sobre las filas bloqueadas del campeonato, y luego se recalcula Posicion (puntos,
+diferencia de gol, goles a favor). Las lecturas de la tabla no necesitan tocar Partido.
+La misma diferencia se aplica a las tablas acumuladas por jornada (HistorialJornada),
+que permiten consultar la tabla "al cierre de la jornada N" con una sola lectura.
+
+`rebuild_standings` recalcula la tabla de un campeonato desde sus partidos con una sola
+consulta agregada, para reparar inconsistencias (p. ej. datos cargados con las señales
+suspendidas); `rebuild_many` reparte varios campeonatos en un pool de procesos.
+"""
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from deporte_bd.models import Fixture, Historial, HistorialJornada, Partido, Resultado
+
+WIN_POINTS, DRAW_POINTS = 3, 1
+STAT_FIELDS = ('Puntos', 'PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'DG')
+# Orden de la tabla: puntos, diferencia de gol, goles a favor (desempate final por id)
+STANDINGS_ORDER = ('-Puntos', '-DG', '-GF', 'id')
+
+# Valores leídos de un partido para calcular su aporte
+CONTRIBUTION_FIELDS = (
+    'IDFixture__IDCampeonato_id', 'IDEquipo_Local_id', 'IDEquipo_Visitante_id',
+    'IDResultado__Goles_Local', 'IDResultado__Goles_Visitante', 'IDFixture__Numero'
+)
+
+_state = threading.local()
+
+
+@contextmanager
+def standings_suspended():
+    """
+    Desactiva la actualización incremental en el hilo actual (cargas masivas como
+    `poblacion`, que escriben Historial por su cuenta). Reparar luego con rebuild_standings.
+    """
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def team_deltas(goles_propios, goles_rival):
+    """Aporte de un partido a la fila de Historial de un equipo."""
+    if goles_propios > goles_rival:
+        resultado = {'Puntos': WIN_POINTS, 'PG': 1, 'PE': 0, 'PP': 0}
+    elif goles_propios == goles_rival:
+        resultado = {'Puntos': DRAW_POINTS, 'PG': 0, 'PE': 1, 'PP': 0}
+    else:
+        resultado = {'Puntos': 0, 'PG': 0, 'PE': 0, 'PP': 1}
+    return dict(
+        resultado,
+        PJ=1, GF=goles_propios, GC=goles_rival, DG=goles_propios - goles_rival
+    )
+
+
+def match_contribution(partido_id):
+    """
+    Aporte actual de un partido: (campeonato, local, visita, goles local, goles visita,
+    jornada), o None si el partido no existe o no tiene resultado.
+    """
+    row = Partido.objects.filter(pk=partido_id).values_list(*CONTRIBUTION_FIELDS).first()
+    if row is None or row[3] is None:
+        return None
+    return row
+
+
+def _accumulate(deltas, contribution, sign, key=lambda campeonato_id, team_id: (campeonato_id, team_id)):
+    campeonato_id, local_id, visit_id, goles_local, goles_visitante = contribution[:5]
+    for team_id, own, rival in ((local_id, goles_local, goles_visitante), (visit_id, goles_visitante, goles_local)):
+        team = deltas.setdefault(key(campeonato_id, team_id), dict.fromkeys(STAT_FIELDS, 0))
+        for field, value in team_deltas(own, rival).items():
+            team[field] += sign * value
+
+
+def apply_change(before, after):
+    """
+    Aplica el cambio de aporte de un partido (`before` -> `after`, cualquiera puede ser
+    None) a las filas de Historial afectadas, recalcula las posiciones de los campeonatos
+    involucrados y actualiza sus tablas por jornada. Todo ocurre en una transacción con las filas del campeonato bloqueadas,
+    de modo que dos resultados simultáneos no pisan sus sumas ni sus posiciones.
+    """
+    if before == after or is_suspended():
+        return
+    deltas = {}
+    if before:
+        _accumulate(deltas, before, -1)
+    if after:
+        _accumulate(deltas, after, +1)
+
+    campeonatos = sorted({campeonato_id for campeonato_id, _ in deltas})
+    with transaction.atomic():
+        for campeonato_id in campeonatos:
+            # Se bloquea el campeonato completo, siempre en el mismo orden (id)
+            locked = set(
+                Historial.objects.select_for_update()
+                .filter(IDCampeonato_id=campeonato_id).order_by('id')
+                .values_list('IDEquipo_id', flat=True)
+            )
+            for (camp_id, team_id), values in deltas.items():
+                if camp_id != campeonato_id or not any(values.values()):
+                    continue
+                changes = {field: F(field) + value for field, value in values.items() if value}
+                if team_id in locked:
+                    Historial.objects.filter(IDCampeonato_id=campeonato_id, IDEquipo_id=team_id).update(**changes)
+                elif values['PJ'] > 0:
+                    # Equipo con partido pero sin inscripción: se crea su fila
+                    Historial.objects.create(IDCampeonato_id=campeonato_id, IDEquipo_id=team_id, **values)
+            recompute_positions(campeonato_id)
+            _update_snapshots(campeonato_id, [
+                (contribution, sign) for contribution, sign in ((before, -1), (after, +1))
+                if contribution and contribution[0] == campeonato_id
+            ])
+
+
+def recompute_positions(campeonato_id):
+    """Recalcula Posicion de un campeonato; sólo escribe las filas que cambian."""
+    rows = Historial.objects.filter(IDCampeonato_id=campeonato_id).order_by(*STANDINGS_ORDER).only('id', 'Posicion')
+    changed = []
+    for posicion, historial in enumerate(rows, start=1):
+        if historial.Posicion != posicion:
+            historial.Posicion = posicion
+            changed.append(historial)
+    if changed:
+        Historial.objects.bulk_update(changed, ['Posicion'], batch_size=500)
+    return len(changed)
+
+
+def _ranked(table):
+    """
+    {equipo_id: {campo: valor}} -> filas compactas de HistorialJornada en orden de posición.
+    Los equipos sin partidos (p. ej. tras eliminar su único resultado) no tienen fila, igual
+    que al reconstruir: la vista los agrega al final.
+    """
+    rows = [[team_id] + [values[field] for field in STAT_FIELDS] for team_id, values in table.items() if values['PJ']]
+    # Puntos, DG, GF y, en igualdad, el id del equipo
+    rows.sort(key=lambda row: (-row[1], -row[8], -row[6], row[0]))
+    return rows
+
+
+def _unpack(rows):
+    return {row[0]: dict(zip(STAT_FIELDS, row[1:])) for row in rows}
+
+
+def _update_snapshots(campeonato_id, changes):
+    """
+    Aplica los aportes `changes` [(contribución, signo)] a las tablas por jornada: cada
+    partido de la jornada k modifica las tablas de las jornadas >= k. Si la jornada k
+    aún no tiene tabla se crea a partir de la anterior (las jornadas sin resultados no
+    tienen tabla propia: vale la última anterior).
+    """
+    if not changes:
+        return
+    first = min(contribution[5] for contribution, _ in changes)
+    snapshots = list(
+        HistorialJornada.objects.select_for_update()
+        .filter(IDCampeonato_id=campeonato_id, Jornada__gte=first).order_by('Jornada')
+    )
+    existing = {snapshot.Jornada for snapshot in snapshots}
+    new = []
+    for jornada in sorted({contribution[5] for contribution, sign in changes if sign > 0} - existing):
+        # La tabla de la jornada parte de la última anterior (antes de aplicar los cambios)
+        earlier = [snapshot.Tabla for snapshot in snapshots if snapshot.Jornada < jornada]
+        base = earlier[-1] if earlier else (
+            HistorialJornada.objects.filter(IDCampeonato_id=campeonato_id, Jornada__lt=jornada)
+            .order_by('-Jornada').values_list('Tabla', flat=True).first()
+        )
+        new.append(HistorialJornada(IDCampeonato_id=campeonato_id, Jornada=jornada, Tabla=list(base or [])))
+
+    now = timezone.now()
+    for snapshot in sorted(snapshots + new, key=lambda snapshot: snapshot.Jornada):
+        snapshot.Actualizado = now
+        table = _unpack(snapshot.Tabla)
+        for contribution, sign in changes:
+            if contribution[5] <= snapshot.Jornada:
+                _accumulate(table, contribution, sign, key=lambda _, team_id: team_id)
+        snapshot.Tabla = _ranked(table)
+    if snapshots:
+        HistorialJornada.objects.bulk_update(snapshots, ['Tabla', 'Actualizado'], batch_size=100)
+    if new:
+        HistorialJornada.objects.bulk_create(new)
+
+
+def _aggregate_sql():
+    """
+    Consulta agregada de un campeonato por jornada y equipo: cada partido jugado aparece
+    dos veces (desde el local y desde la visita) en un UNION ALL y se agrupa.
+    Los nombres de tablas y columnas salen de los modelos.
+    """
+    partido, fixture, resultado = Partido._meta, Fixture._meta, Resultado._meta
+    qn = connection.ops.quote_name
+    column = lambda meta, name: qn(meta.get_field(name).column)
+    joins = (
+        f'FROM {qn(partido.db_table)} p '
+        f'JOIN {qn(fixture.db_table)} f ON f.{qn(fixture.pk.column)} = p.{column(partido, "IDFixture")} '
+        f'JOIN {qn(resultado.db_table)} r ON r.{qn(resultado.pk.column)} = p.{column(partido, "IDResultado")} '
+        f'WHERE f.{column(fixture, "IDCampeonato")} = %s'
+    )
+    goles_local, goles_visitante = column(resultado, 'Goles_Local'), column(resultado, 'Goles_Visitante')
+    numero = column(fixture, 'Numero')
+    return (
+        'SELECT jornada, equipo, COUNT(*), '
+        'SUM(CASE WHEN gf > gc THEN 1 ELSE 0 END), '
+        'SUM(CASE WHEN gf = gc THEN 1 ELSE 0 END), '
+        'SUM(CASE WHEN gf < gc THEN 1 ELSE 0 END), '
+        'SUM(gf), SUM(gc) '
+        'FROM ('
+        f'SELECT f.{numero} AS jornada, p.{column(partido, "IDEquipo_Local")} AS equipo, '
+        f'r.{goles_local} AS gf, r.{goles_visitante} AS gc {joins} '
+        'UNION ALL '
+        f'SELECT f.{numero}, p.{column(partido, "IDEquipo_Visitante")}, r.{goles_visitante}, r.{goles_local} {joins}'
+        ') t GROUP BY jornada, equipo ORDER BY jornada'
+    )
+
+
+def compute_jornadas(campeonato_id):
+    """
+    Tablas acumuladas de un campeonato al cierre de cada jornada con resultados, calculadas
+    con una sola consulta agregada: [(jornada, {equipo_id: {campo: valor}})] en orden.
+    La última es la tabla actual.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(_aggregate_sql(), [campeonato_id, campeonato_id])
+        rows = cursor.fetchall()
+
+    jornadas = []
+    table = {}
+    for jornada, team_id, pj, pg, pe, pp, gf, gc in rows:
+        if not jornadas or jornadas[-1][0] != jornada:
+            table = {t: dict(values) for t, values in table.items()}
+            jornadas.append((jornada, table))
+        values = table.setdefault(team_id, dict.fromkeys(STAT_FIELDS, 0))
+        for field, value in (('Puntos', WIN_POINTS * pg + DRAW_POINTS * pe), ('PJ', pj), ('PG', pg), ('PE', pe),
+                             ('PP', pp), ('GF', gf), ('GC', gc), ('DG', gf - gc)):
+            values[field] += value
+    return jornadas
+
+
+def compute_standings(campeonato_id):
+    """Tabla actual de un campeonato calculada desde sus partidos: {equipo_id: {campo: valor}}."""
+    jornadas = compute_jornadas(campeonato_id)
+    return jornadas[-1][1] if jornadas else {}
+
+
+def rebuild_standings(campeonato_id):
+    """
+    Reemplaza las estadísticas y posiciones de Historial de un campeonato, y sus tablas
+    por jornada, por las calculadas desde sus partidos (una consulta agregada y un único
+    bulk_update). Los equipos inscritos sin partidos jugados quedan en cero.
+    Devuelve (filas escritas, partidos procesados).
+    """
+    jornadas = compute_jornadas(campeonato_id)
+    standings = jornadas[-1][1] if jornadas else {}
+    with transaction.atomic():
+        rows = list(
+            Historial.objects.select_for_update().filter(IDCampeonato_id=campeonato_id).order_by('id')
+        )
+        existing = {h.IDEquipo_id for h in rows}
+        created = Historial.objects.bulk_create([
+            Historial(IDCampeonato_id=campeonato_id, IDEquipo_id=team_id, **values)
+            for team_id, values in standings.items() if team_id not in existing
+        ])
+        rows += created
+        for historial in rows:
+            values = standings.get(historial.IDEquipo_id) or dict.fromkeys(STAT_FIELDS, 0)
+            for field in STAT_FIELDS:
+                setattr(historial, field, values[field])
+        rows.sort(key=lambda h: (-h.Puntos, -h.DG, -h.GF, h.pk))
+        for posicion, historial in enumerate(rows, start=1):
+            historial.Posicion = posicion
+        Historial.objects.bulk_update(rows, STAT_FIELDS + ('Posicion',), batch_size=500)
+
+        HistorialJornada.objects.filter(IDCampeonato_id=campeonato_id).delete()
+        HistorialJornada.objects.bulk_create([
+            HistorialJornada(IDCampeonato_id=campeonato_id, Jornada=jornada, Tabla=_ranked(table))
+            for jornada, table in jornadas
+        ])
+    return len(rows) + len(jornadas), sum(values['PJ'] for values in standings.values()) // 2
+
+
+def _rebuild_task(campeonato_id):
+    start = time.perf_counter()
+    filas, partidos = rebuild_standings(campeonato_id)
+    return campeonato_id, filas, partidos, time.perf_counter() - start
+
+
+def _init_worker():
+    # Con spawn el proceso hijo arranca sin Django configurado
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def rebuild_many(campeonato_ids, workers=1):
+    """
+    Recalcula varios campeonatos, en paralelo en un pool de procesos si workers > 1.
+    Cada proceso abre su propia conexión; las del proceso actual se cierran antes del fork.
+    Devuelve [(campeonato_id, filas, partidos, segundos)] a medida que terminan.
+    """
+    if workers > 1 and len(campeonato_ids) > 1:
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            yield from pool.map(_rebuild_task, campeonato_ids)
+    else:
+        for campeonato_id in campeonato_ids:
+            yield _rebuild_task(campeonato_id)
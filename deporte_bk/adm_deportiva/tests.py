@@ -1,3 +1,252 @@
-from django.test import TestCase
+from collections import Counter
+from datetime import date, timedelta
+from itertools import combinations
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from deporte_bd.models import (
+    Campeonato, Categoria, Delegado, Deporte, Equipo, Fixture, Historial, HistorialJornada, Instalacion, Organizador,
+    Partido, Resultado, Rol, Usuario
+)
+from .round_robin import FixtureError, round_robin
+from .scheduler import OccupancyIndex, validate_change
+from .standings import STAT_FIELDS, compute_jornadas, rebuild_standings, standings_suspended, team_deltas
+
+
+def crear_campeonato(n_equipos=4, fecha_inicio=date(2026, 3, 1)):
+    """Campeonato con `n_equipos` inscritos y una instalación activa."""
+    rol = Rol.objects.create(Nombre='Test')
+    organizador = Organizador.objects.create(IDUsuario=Usuario.objects.create(
+        IDRol=rol, Nombre='Org', Apellido='Test', Correo='org@test.local', Contrasena='-'
+    ))
+    delegado = Delegado.objects.create(IDUsuario=Usuario.objects.create(
+        IDRol=rol, Nombre='Del', Apellido='Test', Correo='del@test.local', Contrasena='-'
+    ))
+    deporte = Deporte.objects.create(IDCategoria=Categoria.objects.create(Nombre='Test'), Nombre='Fútbol')
+    campeonato = Campeonato.objects.create(
+        IDUsuario=organizador, IDDeporte=deporte, Nombre='Torneo', Fecha_Inicio=fecha_inicio
+    )
+    equipos = [Equipo.objects.create(IDUsuario=delegado, Nombre=f'Equipo {i}') for i in range(1, n_equipos + 1)]
+    Historial.objects.bulk_create([Historial(IDCampeonato=campeonato, IDEquipo=equipo) for equipo in equipos])
+    instalacion = Instalacion.objects.create(Nombre='Cancha 1')
+    return campeonato, equipos, instalacion
+
+
+class RoundRobinTests(SimpleTestCase):
+    def test_every_pairing_once_and_one_match_per_team_per_round(self):
+        for n in range(2, 41):
+            with self.subTest(equipos=n):
+                teams = list(range(1, n + 1))
+                rounds = round_robin(teams)
+                self.assertEqual(len(rounds), n - 1 if n % 2 == 0 else n)
+
+                pairings = Counter(frozenset(pair) for pairs in rounds for pair in pairs)
+                self.assertEqual(set(pairings), {frozenset(pair) for pair in combinations(teams, 2)})
+                self.assertEqual(set(pairings.values()), {1})
+
+                for pairs in rounds:
+                    playing = [team for pair in pairs for team in pair]
+                    self.assertEqual(len(playing), len(set(playing)))
+                    # Con cantidad impar descansa exactamente un equipo por jornada
+                    self.assertEqual(len(playing), n - n % 2)
+
+    def test_home_away_balance(self):
+        for n in range(2, 41):
+            with self.subTest(equipos=n):
+                sides = {team: [] for team in range(n)}
+                for pairs in round_robin(range(n)):
+                    for home, away in pairs:
+                        sides[home].append('L')
+                        sides[away].append('V')
+                home_games = [side.count('L') for side in sides.values()]
+                self.assertLessEqual(max(home_games) - min(home_games), 1)
+                if n % 2 == 0:
+                    # De Werra: el mínimo de quiebres (dos localías o visitas seguidas) es n - 2
+                    breaks = sum(a == b for side in sides.values() for a, b in zip(side, side[1:]))
+                    self.assertEqual(breaks, n - 2)
+
+    def test_double_round_mirrors_first_with_swapped_venues(self):
+        rounds = round_robin(range(6), double=True)
+        first, second = rounds[:5], rounds[5:]
+        self.assertEqual(second, [[(away, home) for home, away in pairs] for pairs in first])
+
+    def test_invalid_teams(self):
+        with self.assertRaises(FixtureError):
+            round_robin([1])
+        with self.assertRaises(FixtureError):
+            round_robin([1, 2, 2])
+
+
+class OccupancyIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.origin = date(2026, 3, 1)
+        self.index = OccupancyIndex(self.origin)
+
+    def test_day_is_relative_to_origin(self):
+        self.assertEqual(self.index.day(self.origin), 0)
+        self.assertEqual(self.index.day(self.origin + timedelta(days=40)), 40)
+
+    def test_venue_allows_one_match_per_day(self):
+        self.index.add(venue_id=1, local_id=10, visit_id=20, day=5)
+        self.assertFalse(self.index.venue_free(1, 5))
+        self.assertTrue(self.index.venue_free(1, 4))
+        self.assertTrue(self.index.venue_free(1, 6))
+        self.assertTrue(self.index.venue_free(2, 5))
+
+    def test_team_rest_days(self):
+        self.index.add(venue_id=1, local_id=10, visit_id=20, day=10)
+        for team in (10, 20):
+            self.assertFalse(self.index.team_free(team, 10))
+            self.assertTrue(self.index.team_free(team, 11))
+            # Con 2 días de descanso quedan ocupados del 8 al 12
+            for day in range(8, 13):
+                self.assertFalse(self.index.team_free(team, day, rest_days=2))
+            self.assertTrue(self.index.team_free(team, 7, rest_days=2))
+            self.assertTrue(self.index.team_free(team, 13, rest_days=2))
+        self.assertTrue(self.index.team_free(30, 10, rest_days=2))
+
+    def test_rest_window_is_clipped_at_origin(self):
+        self.index.add(venue_id=1, local_id=10, visit_id=20, day=0)
+        self.assertFalse(self.index.team_free(10, 1, rest_days=3))
+        self.assertTrue(self.index.team_free(10, 4, rest_days=3))
+
+    def test_far_days_use_the_same_bitset(self):
+        self.index.add(venue_id=1, local_id=10, visit_id=20, day=400)
+        self.assertFalse(self.index.venue_free(1, 400))
+        self.assertTrue(self.index.team_free(10, 397, rest_days=2))
+        self.assertFalse(self.index.team_free(10, 398, rest_days=2))
+
+
+class ValidateChangeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.campeonato, cls.equipos, cls.instalacion = crear_campeonato()
+        cls.otra = Instalacion.objects.create(Nombre='Cancha 2')
+        fixture = Fixture.objects.create(IDCampeonato=cls.campeonato, Numero=1, Fecha=date(2026, 3, 1))
+        a, b, c, d = cls.equipos
+        cls.jugado = Partido.objects.create(
+            IDFixture=fixture, IDInstalacion=cls.instalacion, IDEquipo_Local=a, IDEquipo_Visitante=b,
+            Fecha=date(2026, 3, 10)
+        )
+        cls.partido = Partido.objects.create(
+            IDFixture=fixture, IDInstalacion=cls.otra, IDEquipo_Local=c, IDEquipo_Visitante=d, Fecha=date(2026, 3, 1)
+        )
+
+    def test_free_slot(self):
+        self.assertEqual(validate_change(self.partido, self.instalacion.pk, date(2026, 3, 20)), [])
+
+    def test_venue_taken(self):
+        conflictos = validate_change(self.partido, self.instalacion.pk, date(2026, 3, 10))
+        self.assertEqual(conflictos, ["La instalación ya tiene un partido ese día"])
+
+    def test_team_without_rest(self):
+        a, b, c, d = self.equipos
+        partido = Partido(pk=None, IDEquipo_Local=a, IDEquipo_Visitante=c)
+        conflictos = validate_change(partido, self.otra.pk, date(2026, 3, 12), rest_days=2)
+        self.assertEqual(len(conflictos), 1)
+        self.assertIn("equipo local", conflictos[0])
+        self.assertEqual(validate_change(partido, self.otra.pk, date(2026, 3, 13), rest_days=2), [])
+
+    def test_own_date_is_not_a_conflict(self):
+        self.assertEqual(validate_change(self.jugado, self.instalacion.pk, date(2026, 3, 10)), [])
+
+    def test_inactive_or_missing_venue(self):
+        Instalacion.objects.filter(pk=self.otra.pk).update(Estado=0)
+        self.assertEqual(
+            validate_change(self.partido, self.otra.pk, date(2026, 3, 20)), ["La instalación no está disponible"]
+        )
+        self.assertEqual(validate_change(self.partido, 0, date(2026, 3, 20)), ["Instalación no encontrada"])
+
+
+class TeamDeltasTests(SimpleTestCase):
+    def test_win_draw_loss(self):
+        self.assertEqual(team_deltas(3, 1), {'Puntos': 3, 'PJ': 1, 'PG': 1, 'PE': 0, 'PP': 0, 'GF': 3, 'GC': 1, 'DG': 2})
+        self.assertEqual(team_deltas(2, 2), {'Puntos': 1, 'PJ': 1, 'PG': 0, 'PE': 1, 'PP': 0, 'GF': 2, 'GC': 2, 'DG': 0})
+        self.assertEqual(team_deltas(0, 1), {'Puntos': 0, 'PJ': 1, 'PG': 0, 'PE': 0, 'PP': 1, 'GF': 0, 'GC': 1, 'DG': -1})
+
+
+class StandingsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.campeonato, cls.equipos, cls.instalacion = crear_campeonato()
+        cls.jornadas = [
+            Fixture.objects.create(IDCampeonato=cls.campeonato, Numero=numero, Fecha=date(2026, 3, 7 * numero))
+            for numero in (1, 2)
+        ]
+
+    def partido(self, jornada, local, visitante, goles=None):
+        resultado = Resultado.objects.create(Goles_Local=goles[0], Goles_Visitante=goles[1]) if goles else None
+        return Partido.objects.create(
+            IDFixture=self.jornadas[jornada - 1], IDInstalacion=self.instalacion, IDResultado=resultado,
+            IDEquipo_Local=self.equipos[local], IDEquipo_Visitante=self.equipos[visitante]
+        )
+
+    def tabla(self):
+        filas = Historial.objects.filter(IDCampeonato=self.campeonato).values('IDEquipo_id', *STAT_FIELDS)
+        return {fila.pop('IDEquipo_id'): fila for fila in filas}
+
+    def posiciones(self):
+        return list(
+            Historial.objects.filter(IDCampeonato=self.campeonato).order_by('Posicion').values_list('IDEquipo_id', flat=True)
+        )
+
+    def assertMatchesRecomputed(self):
+        """La tabla incremental y las tablas por jornada coinciden con las calculadas desde cero."""
+        jornadas = compute_jornadas(self.campeonato.pk)
+        vacia = dict.fromkeys(STAT_FIELDS, 0)
+        actual = jornadas[-1][1] if jornadas else {}
+        self.assertEqual(self.tabla(), {equipo.pk: actual.get(equipo.pk, vacia) for equipo in self.equipos})
+        snapshots = {
+            jornada: {fila[0]: dict(zip(STAT_FIELDS, fila[1:])) for fila in tabla}
+            for jornada, tabla in HistorialJornada.objects.filter(IDCampeonato=self.campeonato).values_list('Jornada', 'Tabla')
+        }
+        for jornada, tabla in jornadas:
+            self.assertEqual(snapshots[jornada], tabla)
+
+    def test_results_update_rows_and_positions(self):
+        a, b, c, d = (equipo.pk for equipo in self.equipos)
+        self.partido(1, 0, 1, (2, 0))
+        self.partido(1, 2, 3, (1, 1))
+        self.partido(2, 3, 0, (3, 1))
+        tabla = self.tabla()
+        self.assertEqual(tabla[a], {'Puntos': 3, 'PJ': 2, 'PG': 1, 'PE': 0, 'PP': 1, 'GF': 3, 'GC': 3, 'DG': 0})
+        self.assertEqual(tabla[d], {'Puntos': 4, 'PJ': 2, 'PG': 1, 'PE': 1, 'PP': 0, 'GF': 4, 'GC': 2, 'DG': 2})
+        self.assertEqual(self.posiciones(), [d, a, c, b])
+        self.assertMatchesRecomputed()
+
+    def test_correction_applies_only_the_difference(self):
+        a, b = self.equipos[0].pk, self.equipos[1].pk
+        partido = self.partido(1, 0, 1, (2, 0))
+        self.partido(2, 1, 2, (1, 0))
+        resultado = partido.IDResultado
+        resultado.Goles_Local, resultado.Goles_Visitante = 0, 3
+        resultado.save()
+        tabla = self.tabla()
+        self.assertEqual(tabla[a], {'Puntos': 0, 'PJ': 1, 'PG': 0, 'PE': 0, 'PP': 1, 'GF': 0, 'GC': 3, 'DG': -3})
+        self.assertEqual(tabla[b]['Puntos'], 6)
+        self.assertEqual(self.posiciones()[0], b)
+        self.assertMatchesRecomputed()
+
+    def test_deletions_and_moves(self):
+        primero = self.partido(1, 0, 1, (2, 0))
+        segundo = self.partido(1, 2, 3, (0, 1))
+        tercero = self.partido(2, 0, 2, (1, 1))
+        segundo.IDResultado.delete()
+        self.assertMatchesRecomputed()
+        tercero.delete()
+        self.assertMatchesRecomputed()
+        # Cambiar de jornada mueve el aporte entre las tablas por jornada
+        primero.IDFixture = self.jornadas[1]
+        primero.save()
+        self.assertMatchesRecomputed()
+        self.assertEqual(self.tabla()[self.equipos[0].pk]['Puntos'], 3)
+
+    def test_rebuild_repairs_suspended_updates(self):
+        with standings_suspended():
+            self.partido(1, 0, 1, (2, 0))
+            self.partido(2, 2, 3, (0, 0))
+        self.assertEqual(self.tabla()[self.equipos[0].pk]['PJ'], 0)
+        filas, partidos = rebuild_standings(self.campeonato.pk)
+        self.assertEqual(partidos, 2)
+        self.assertMatchesRecomputed()
+        self.assertEqual(self.posiciones()[0], self.equipos[0].pk)
@@ -2,7 +2,8 @@ from django.urls import path
 from .views import (
     IncidenciaViewSet, CampeonatoViewSet, FixtureViewSet,
     ResultadoViewSet, PartidoViewSet, HistorialViewSet, EquipoViewSet,
-    CampeonatoDetalleView, InscribirEquipoView
+    CampeonatoDetalleView, InscribirEquipoView, TablaCampeonatoView, GenerarFixtureView,
+    ProgramarPartidosView, ValidarProgramacionView
 )
 
 # Explicit URL patterns to avoid multiple DRF router registrations which
@@ -42,6 +43,9 @@ urlpatterns = [
     path('campeonatos/<int:pk>/', campeonato_detail, name='campeonato-detail'),
     path('campeonatos/<int:pk>/detalle/', CampeonatoDetalleView.as_view(), name='campeonato-detalle'),
     path('campeonatos/<int:pk>/inscribir/', InscribirEquipoView.as_view(), name='campeonato-inscribir'),
+    path('campeonatos/<int:pk>/generar-fixture/', GenerarFixtureView.as_view(), name='campeonato-generar-fixture'),
+    path('campeonatos/<int:pk>/programar/', ProgramarPartidosView.as_view(), name='campeonato-programar'),
+    path('campeonatos/<int:pk>/tabla/', TablaCampeonatoView.as_view(), name='campeonato-tabla'),
     
     # Fixtures
     path('fixtures/', fixture_list, name='fixture-list'),
@@ -54,6 +58,7 @@ urlpatterns = [
     # Partidos
     path('partidos/', partido_list, name='partido-list'),
     path('partidos/<int:pk>/', partido_detail, name='partido-detail'),
+    path('partidos/<int:pk>/validar-programacion/', ValidarProgramacionView.as_view(), name='partido-validar-programacion'),
     
     # Historial
     path('historial/', historial_list, name='historial-list'),
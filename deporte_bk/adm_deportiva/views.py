@@ -7,7 +7,15 @@ from django.db.models import Q
         
 from deporte_bd.models import (
     Incidencia, Campeonato, Fixture, Resultado, 
-    Partido, Historial, Equipo
+    Partido, Historial, HistorialJornada, Equipo
+)
+from deporte_bd.pagination import KeysetPagination, estimated_count
+from deporte_bd.search import matching
+from .standings import STAT_FIELDS
+from .round_robin import FixtureError, generate_fixture
+from .scheduler import (
+    DEFAULT_DAYS_BETWEEN, DEFAULT_REST_DAYS, DEFAULT_WINDOW_DAYS,
+    ScheduleError, schedule_championship, validate_change
 )
 from .serializers import (
     IncidenciaSerializer, CampeonatoSerializer, FixtureSerializer,
@@ -30,6 +38,7 @@ class CampeonatoViewSet(viewsets.ModelViewSet):
     """CRUD endpoints for Campeonato (championship management)"""
     queryset = Campeonato.objects.select_related('IDUsuario', 'IDDeporte').all().order_by('-Fecha_Inicio')
     serializer_class = CampeonatoSerializer
+    cursor_ordering = ('-id',)  # Fecha_Inicio admite nulos
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [filters.SearchFilter]
     search_fields = ['Nombre', 'Estado']
@@ -63,8 +72,9 @@ class PartidoViewSet(viewsets.ModelViewSet):
 
 class HistorialViewSet(viewsets.ModelViewSet):
     """CRUD endpoints for Historial (championship standings)"""
-    queryset = Historial.objects.select_related('IDCampeonato', 'IDEquipo').all().order_by('IDCampeonato', '-Puntos', '-DG')
+    queryset = Historial.objects.select_related('IDCampeonato', 'IDEquipo').all().order_by('IDCampeonato', '-Puntos', '-DG', '-GF')
     serializer_class = HistorialSerializer
+    cursor_ordering = ('IDCampeonato', '-Puntos', '-DG', '-GF', 'id')
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
@@ -81,6 +91,7 @@ class IncidenciaViewSet(viewsets.ModelViewSet):
 	"""CRUD endpoints for Incidencia"""
 	queryset = Incidencia.objects.select_related('IDPartido').all().order_by('-Fecha')
 	serializer_class = IncidenciaSerializer
+	cursor_ordering = ('-Fecha', '-id')
 	permission_classes = [permissions.IsAuthenticated]
 	filter_backends = [filters.SearchFilter]
 	search_fields = ['Descripcion']
@@ -190,6 +201,178 @@ class CampeonatoDetalleView(APIView):
 
         return Response(data)
 
+class GenerarFixtureView(APIView):
+    """
+    Genera todas las jornadas y partidos de un campeonato con sus equipos inscritos
+    (todos contra todos, método del círculo) en una sola transacción.
+    Parámetros: ida_y_vuelta (bool), fecha_inicio (YYYY-MM-DD), dias_entre_jornadas,
+    instalacion_id y reemplazar (bool, regenera un fixture sin resultados).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk: int):
+        try:
+            campeonato = Campeonato.objects.get(pk=pk)
+        except Campeonato.DoesNotExist:
+            return Response({'detail': 'Campeonato no encontrado'}, status=404)
+
+        try:
+            fecha_param = request.data.get('fecha_inicio')
+            fecha_inicio = datetime.strptime(fecha_param, '%Y-%m-%d').date() if fecha_param else None
+            dias = int(request.data.get('dias_entre_jornadas', 7))
+            instalacion_id = request.data.get('instalacion_id')
+            instalacion_id = int(instalacion_id) if instalacion_id not in (None, '') else None
+        except (TypeError, ValueError):
+            return Response(
+                {'detail': 'Parámetros inválidos: fecha_inicio debe ser YYYY-MM-DD y los ids enteros'},
+                status=400
+            )
+
+        try:
+            jornadas, partidos = generate_fixture(
+                campeonato,
+                double=bool(request.data.get('ida_y_vuelta', False)),
+                start_date=fecha_inicio,
+                days_between=dias,
+                instalacion_id=instalacion_id,
+                replace=bool(request.data.get('reemplazar', False)),
+            )
+        except FixtureError as e:
+            return Response({'detail': str(e)}, status=400)
+
+        return Response({
+            'detail': 'Fixture generado exitosamente',
+            'jornadas': jornadas,
+            'partidos': partidos
+        }, status=201)
+
+
+class ProgramarPartidosView(APIView):
+    """
+    Asigna día e instalación a los partidos pendientes de un campeonato respetando la
+    disponibilidad de las instalaciones, un partido por equipo y día y los días de descanso.
+    Parámetros: dias_descanso, dias_por_jornada, fecha_inicio (jornadas sin fecha),
+    dias_entre_jornadas y simular (no guarda los cambios).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk: int):
+        try:
+            campeonato = Campeonato.objects.get(pk=pk)
+        except Campeonato.DoesNotExist:
+            return Response({'detail': 'Campeonato no encontrado'}, status=404)
+
+        try:
+            fecha_param = request.data.get('fecha_inicio')
+            fecha_inicio = datetime.strptime(fecha_param, '%Y-%m-%d').date() if fecha_param else None
+            descanso = int(request.data.get('dias_descanso', DEFAULT_REST_DAYS))
+            ventana = int(request.data.get('dias_por_jornada', DEFAULT_WINDOW_DAYS))
+            dias = int(request.data.get('dias_entre_jornadas', DEFAULT_DAYS_BETWEEN))
+        except (TypeError, ValueError):
+            return Response(
+                {'detail': 'Parámetros inválidos: fecha_inicio debe ser YYYY-MM-DD y los días enteros'},
+                status=400
+            )
+        if descanso < 0 or ventana < 1:
+            return Response({'detail': 'dias_descanso debe ser >= 0 y dias_por_jornada >= 1'}, status=400)
+
+        try:
+            resumen = schedule_championship(
+                campeonato, rest_days=descanso, window_days=ventana, start_date=fecha_inicio,
+                days_between=dias, dry_run=bool(request.data.get('simular', False))
+            )
+        except ScheduleError as e:
+            return Response({'detail': str(e)}, status=400)
+        return Response(resumen)
+
+
+class ValidarProgramacionView(APIView):
+    """
+    Verifica si un partido puede moverse a una instalación y fecha sin conflictos
+    (instalación ocupada o inactiva, equipos sin los días de descanso mínimos).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk: int):
+        try:
+            partido = Partido.objects.get(pk=pk)
+        except Partido.DoesNotExist:
+            return Response({'detail': 'Partido no encontrado'}, status=404)
+
+        try:
+            instalacion_id = int(request.data.get('instalacion_id') or partido.IDInstalacion_id)
+            fecha = datetime.strptime(request.data.get('fecha'), '%Y-%m-%d').date()
+            descanso = int(request.data.get('dias_descanso', DEFAULT_REST_DAYS))
+        except (TypeError, ValueError):
+            return Response(
+                {'detail': 'Se requiere fecha (YYYY-MM-DD); instalacion_id y dias_descanso deben ser enteros'},
+                status=400
+            )
+
+        conflictos = validate_change(partido, instalacion_id, fecha, rest_days=max(descanso, 0))
+        return Response({'valido': not conflictos, 'conflictos': conflictos})
+
+
+class TablaCampeonatoView(APIView):
+    """
+    Tabla de posiciones de un campeonato. Sin parámetros es la tabla actual (Historial);
+    con ?jornada=N es la tabla al cierre de la jornada N, leída de HistorialJornada
+    (la última tabla guardada con Jornada <= N) sin recorrer los partidos.
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request, pk: int):
+        jornada_param = request.query_params.get('jornada')
+        try:
+            jornada = int(jornada_param) if jornada_param not in (None, '') else None
+        except ValueError:
+            return Response({'detail': 'jornada debe ser un número entero'}, status=400)
+
+        inscritos = list(
+            Historial.objects.filter(IDCampeonato_id=pk).select_related('IDEquipo')
+            .order_by('Posicion', '-Puntos', '-DG', '-GF', 'id')
+        )
+        if not inscritos and not Campeonato.objects.filter(pk=pk).exists():
+            return Response({'detail': 'Campeonato no encontrado'}, status=404)
+        nombres = {h.IDEquipo_id: h.IDEquipo.Nombre for h in inscritos}
+
+        if jornada is None:
+            filas = [
+                [h.IDEquipo_id] + [getattr(h, field) for field in STAT_FIELDS]
+                for h in inscritos
+            ]
+            jornada_tabla = None
+        else:
+            snapshot = (
+                HistorialJornada.objects.filter(IDCampeonato_id=pk, Jornada__lte=jornada)
+                .order_by('-Jornada').values_list('Jornada', 'Tabla').first()
+            )
+            jornada_tabla, filas = snapshot if snapshot else (None, [])
+            # Los inscritos que aún no jugaban quedan al final, en cero
+            jugados = {fila[0] for fila in filas}
+            filas = filas + [
+                [equipo_id] + [0] * len(STAT_FIELDS)
+                for equipo_id in sorted(nombres) if equipo_id not in jugados
+            ]
+            faltantes = [fila[0] for fila in filas if fila[0] not in nombres]
+            if faltantes:
+                nombres.update(Equipo.objects.filter(id__in=faltantes).values_list('id', 'Nombre'))
+
+        tabla = [
+            dict(
+                {'Posicion': posicion, 'Equipo': {'id': fila[0], 'Nombre': nombres.get(fila[0])}},
+                **dict(zip(STAT_FIELDS, fila[1:]))
+            )
+            for posicion, fila in enumerate(filas, start=1)
+        ]
+        return Response({
+            'campeonato': pk,
+            'jornada': jornada,
+            'jornada_tabla': jornada_tabla,
+            'tabla': tabla,
+        })
+
+
 class fixture_controllers(APIView):
     """Controlador para gestionar los fixtures (jornadas) del sistema."""
     permission_classes = [IsAuthenticatedOrReadOnly]  # Requiere autenticación para modificar.
@@ -209,8 +392,8 @@ class fixture_controllers(APIView):
                 campeonato_id = int(campeonato_param)
                 fixtures = fixtures.filter(IDCampeonato__id=campeonato_id)
             except ValueError:
-                # Buscar por nombre del campeonato
-                fixtures = fixtures.filter(IDCampeonato__Nombre__icontains=campeonato_param)
+                # Buscar por nombre del campeonato (índice de búsqueda)
+                fixtures = fixtures.filter(IDCampeonato__in=matching('campeonato', campeonato_param))
 
         # Filtrar por número de jornada.
         if numero_param:
@@ -229,12 +412,13 @@ class fixture_controllers(APIView):
             except ValueError:
                 pass  # Si el formato es inválido, ignorar el filtro.
 
-        # Ordenar por campeonato y número de jornada.
-        fixtures = fixtures.order_by('IDCampeonato', 'Numero')
+        # Paginar por cursor, ordenado por campeonato y número de jornada.
+        paginador = KeysetPagination(ordering=('IDCampeonato', 'Numero', 'id'))
+        pagina = paginador.paginate_queryset(fixtures, request, view=self)
 
         # Construcción de datos para la respuesta.
         datos = []
-        for fixture in fixtures:
+        for fixture in pagina:
             datos.append({
                 'id': fixture.id,
                 'IDFixture': fixture.id,
@@ -251,7 +435,8 @@ class fixture_controllers(APIView):
 
         # Retornar respuesta con datos y número total de registros.
         return Response({
-            'total': fixtures.count(),
+            'total': estimated_count(fixtures),
+            'siguiente': paginador.get_next_link(),
             'fixtures': datos
         })
 
@@ -398,15 +583,16 @@ class incidencia_controllers(APIView):
                 campeonato_id = int(campeonato_param)
                 incidencias = incidencias.filter(IDPartido__IDFixture__IDCampeonato__id=campeonato_id)
             except ValueError:
-                # Buscar por nombre del campeonato
-                incidencias = incidencias.filter(IDPartido__IDFixture__IDCampeonato__Nombre__icontains=campeonato_param)
+                # Buscar por nombre del campeonato (índice de búsqueda)
+                incidencias = incidencias.filter(IDPartido__IDFixture__IDCampeonato__in=matching('campeonato', campeonato_param))
 
-        # Ordenar las incidencias más recientes primero.
-        incidencias = incidencias.order_by('-Fecha')
+        # Paginar por cursor, las incidencias más recientes primero.
+        paginador = KeysetPagination(ordering=('-Fecha', '-id'))
+        pagina = paginador.paginate_queryset(incidencias, request, view=self)
 
         # Construcción de datos para la respuesta.
         datos = []
-        for incidencia in incidencias:
+        for incidencia in pagina:
             datos.append({
                 'id': incidencia.id,
                 'IDIncidencia': incidencia.id,
@@ -424,7 +610,8 @@ class incidencia_controllers(APIView):
 
         # Retornar respuesta con datos y número total de registros.
         return Response({
-            'total': incidencias.count(),
+            'total': estimated_count(incidencias),
+            'siguiente': paginador.get_next_link(),
             'incidencias': datos
         })
 
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AdmMlConfig(AppConfig):
     name = 'adm_ml'
+
+    def ready(self):
+        # Conecta las señales que mantienen el feature store actualizado
+        from . import signals
@@ -0,0 +1,39 @@
+"""
+Contadores de cambios de resultados (ResultadoVersion).
+
+- CORRECTIONS: se incrementa cuando cambia un resultado que un entrenamiento ya pudo
+  procesar (corrección o eliminación de un resultado, un partido jugado que cambia de
+  equipos, jornada o resultado, o una jornada con partidos jugados que cambia de fecha).
+  El entrenamiento incremental guarda su valor y re-entrena completo si cambió.
+- championship_key(id): se incrementa con cualquier cambio en los partidos o resultados
+  del campeonato (resultado cargado, corregido o eliminado, partido agregado, modificado
+  o eliminado). Es la clave de caché de la simulación del campeonato.
+
+Los incrementos se hacen al confirmar la transacción (`bump`), así un lector que ve
+el valor nuevo también ve los datos que lo provocaron.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from .models import ResultadoVersion
+
+CORRECTIONS = 'correcciones'
+
+
+def championship_key(campeonato_id):
+    return f'campeonato:{campeonato_id}'
+
+
+def version(clave):
+    """Valor actual del contador `clave` (0 si nunca se incrementó)."""
+    return ResultadoVersion.objects.filter(Clave=clave).values_list('Version', flat=True).first() or 0
+
+
+def _increment(clave):
+    if not ResultadoVersion.objects.filter(Clave=clave).update(Version=F('Version') + 1):
+        ResultadoVersion.objects.get_or_create(Clave=clave, defaults={'Version': 1})
+
+
+def bump(clave):
+    """Incrementa el contador `clave` al confirmar la transacción."""
+    transaction.on_commit(lambda: _increment(clave))
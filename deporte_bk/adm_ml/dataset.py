@@ -0,0 +1,227 @@
+"""
+Construcción del dataset de entrenamiento para MatchPredictor.
+
+Los partidos se leen como tuplas (`values_list(...).iterator()`) directamente en
+arrays de NumPy preasignados, y las features previas a cada partido (promedios
+acumulados por equipo) se calculan con sumas acumuladas agrupadas por equipo,
+sin instanciar modelos ni recorrer los partidos en Python.
+"""
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from deporte_bd.models import Partido
+
+FEATURE_COLUMNS = [
+    'local_avg_goals_scored',
+    'local_avg_goals_conceded',
+    'local_win_rate',
+    'visit_avg_goals_scored',
+    'visit_avg_goals_conceded',
+    'visit_win_rate',
+]
+
+# Columnas leídas por partido: local, visita, goles local, goles visita, id del resultado
+_MATCH_FIELDS = (
+    'IDEquipo_Local_id', 'IDEquipo_Visitante_id',
+    'IDResultado__Goles_Local', 'IDResultado__Goles_Visitante', 'IDResultado_id'
+)
+
+
+def played_matches_queryset():
+    """Partidos jugados con fecha, en orden cronológico (desempate por id)."""
+    return Partido.objects.filter(
+        IDResultado__isnull=False,
+        IDFixture__Fecha__isnull=False
+    ).order_by('IDFixture__Fecha', 'id')
+
+
+def load_match_arrays(queryset=None, chunk_size=10000):
+    """
+    Lee los partidos en un array int64 de forma (n, 5) sin crear instancias del ORM
+    (columnas: local, visita, goles local, goles visita, id del resultado).
+    La capacidad se preasigna con count() y sólo crece si entran partidos durante la lectura.
+    """
+    queryset = played_matches_queryset() if queryset is None else queryset
+    capacity = max(queryset.count(), 1)
+    data = np.empty((capacity, len(_MATCH_FIELDS)), dtype=np.int64)
+
+    rows = queryset.values_list(*_MATCH_FIELDS).iterator(chunk_size=chunk_size)
+    size = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        end = size + len(chunk)
+        if end > data.shape[0]:
+            data = np.resize(data, (max(end, data.shape[0] * 2), len(_MATCH_FIELDS)))
+        data[size:end] = chunk
+        size = end
+
+    return data[:size]
+
+
+def _exclusive_group_cumsum(sorted_values, group_start):
+    """Suma acumulada por grupo excluyendo la fila actual (valores ya ordenados por grupo)."""
+    cumulative = np.cumsum(sorted_values)
+    cumulative -= sorted_values
+    cumulative -= cumulative[group_start]
+    return cumulative
+
+
+def _argsort_by_team(teams):
+    """
+    argsort estable por equipo. Con menos de 2**15 equipos distintos se recodifican
+    los ids a int16 para que NumPy use radix sort (bastante más rápido que timsort).
+    """
+    if len(teams) and teams.min() >= 0 and teams.max() < 50_000_000:
+        present = np.zeros(teams.max() + 1, dtype=bool)
+        present[teams] = True
+        if present.sum() < 2 ** 15:
+            codes = (np.cumsum(present) - 1).astype(np.int16)[teams]
+            return np.argsort(codes, kind='stable')
+    return np.argsort(teams, kind='stable')
+
+
+def _initial_offsets(teams, initial_state):
+    """Estado previo [pj, gf, gc, pg] de cada aparición según `initial_state` {team_id: [...]}."""
+    unique, inverse = np.unique(teams, return_inverse=True)
+    table = np.array([initial_state.get(int(t), (0, 0, 0, 0)) for t in unique], dtype=np.int64).reshape(-1, 4)
+    return table[inverse]
+
+
+def compute_features(local, visit, g_local, g_visit, initial_state=None):
+    """
+    Features previas a cada partido, idénticas a las del recorrido secuencial:
+    promedio de goles a favor / en contra y tasa de victorias de cada equipo
+    considerando sólo sus partidos anteriores. Devuelve (X, y).
+    `initial_state` ({team_id: [pj, gf, gc, pg]}) permite continuar desde partidos
+    ya procesados en un entrenamiento anterior (modo incremental).
+    """
+    n = len(local)
+    # Una "aparición" por equipo y partido, intercaladas (local, visita) en orden cronológico
+    teams = np.column_stack([local, visit]).ravel()
+    scored = np.column_stack([g_local, g_visit]).ravel().astype(np.int64)
+    conceded = np.column_stack([g_visit, g_local]).ravel().astype(np.int64)
+    wins = (scored > conceded).astype(np.int64)
+
+    # Orden estable por equipo: dentro de cada equipo se conserva el orden cronológico
+    order = _argsort_by_team(teams)
+    sorted_teams = teams[order]
+    is_start = np.empty(len(order), dtype=bool)
+    is_start[:1] = True
+    is_start[1:] = sorted_teams[1:] != sorted_teams[:-1]
+    starts = np.flatnonzero(is_start)
+    group_start = starts[np.cumsum(is_start) - 1]
+
+    # Columnas: partidos previos, goles a favor, goles en contra y victorias acumuladas
+    sorted_stats = np.empty((len(order), 4), dtype=np.int64)
+    sorted_stats[:, 0] = np.arange(len(order)) - group_start
+    for col, values in enumerate((scored, conceded, wins), start=1):
+        sorted_stats[:, col] = _exclusive_group_cumsum(values[order], group_start)
+
+    # Volver al orden original de apariciones (pares = local, impares = visita).
+    # Se dispersan filas completas para tocar una sola línea de caché por aparición.
+    stats = np.empty_like(sorted_stats)
+    stats[order] = sorted_stats
+    if initial_state:
+        stats += _initial_offsets(teams, initial_state)
+    stats = stats.reshape(n, 2, 4)
+    played, goals_scored, goals_conceded, won = (stats[:, :, col] for col in range(4))
+
+    divisor = np.maximum(played, 1)
+    X = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float64)
+    X[:, 0] = goals_scored[:, 0] / divisor[:, 0]
+    X[:, 1] = goals_conceded[:, 0] / divisor[:, 0]
+    X[:, 2] = won[:, 0] / divisor[:, 0]
+    X[:, 3] = goals_scored[:, 1] / divisor[:, 1]
+    X[:, 4] = goals_conceded[:, 1] / divisor[:, 1]
+    X[:, 5] = won[:, 1] / divisor[:, 1]
+
+    # Target: 0 gana local, 1 empate, 2 gana visita
+    y = np.where(g_local > g_visit, 0, np.where(g_local == g_visit, 1, 2)).astype(np.int64)
+    return X, y
+
+
+def final_team_state(local, visit, g_local, g_visit, initial_state=None):
+    """
+    Totales [pj, gf, gc, pg] por equipo después de los partidos dados, partiendo de
+    `initial_state`. Es el estado que necesita el siguiente entrenamiento incremental.
+    """
+    state = {int(t): list(v) for t, v in (initial_state or {}).items()}
+    if len(local) == 0:
+        return state
+
+    teams = np.concatenate([local, visit])
+    scored = np.concatenate([g_local, g_visit])
+    conceded = np.concatenate([g_visit, g_local])
+    unique, inverse = np.unique(teams, return_inverse=True)
+    totals = np.stack([
+        np.bincount(inverse, minlength=len(unique)),
+        np.bincount(inverse, weights=scored, minlength=len(unique)),
+        np.bincount(inverse, weights=conceded, minlength=len(unique)),
+        np.bincount(inverse, weights=scored > conceded, minlength=len(unique)),
+    ], axis=1).astype(np.int64)
+
+    for team_id, values in zip(unique.tolist(), totals.tolist()):
+        previous = state.get(team_id, [0, 0, 0, 0])
+        state[team_id] = [a + b for a, b in zip(previous, values)]
+    return state
+
+
+def build_dataset(queryset=None, chunk_size=10000):
+    """DataFrame de entrenamiento (features + 'target') a partir de los partidos jugados."""
+    data = load_match_arrays(queryset, chunk_size=chunk_size)
+    X, y = compute_features(data[:, 0], data[:, 1], data[:, 2], data[:, 3])
+    df = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+    df['target'] = y
+    return df
+
+
+def rolling_features_loop(rows):
+    """
+    Implementación secuencial de referencia (la que usaba prepare_dataset).
+    `rows` son tuplas (local, visita, goles local, goles visita) en orden cronológico.
+    Se conserva para verificar equivalencia y para el benchmark (bench_dataset).
+    """
+    team_stats = {}
+    data = []
+    for local_id, visit_id, g_local, g_visit in rows:
+        if local_id not in team_stats: team_stats[local_id] = {'gs': 0, 'gc': 0, 'w': 0, 'gp': 0}
+        if visit_id not in team_stats: team_stats[visit_id] = {'gs': 0, 'gc': 0, 'w': 0, 'gp': 0}
+
+        l_stats = team_stats[local_id]
+        v_stats = team_stats[visit_id]
+        l_gp = l_stats['gp'] if l_stats['gp'] > 0 else 1
+        v_gp = v_stats['gp'] if v_stats['gp'] > 0 else 1
+
+        row = {
+            'local_avg_goals_scored': l_stats['gs'] / l_gp,
+            'local_avg_goals_conceded': l_stats['gc'] / l_gp,
+            'local_win_rate': l_stats['w'] / l_gp,
+            'visit_avg_goals_scored': v_stats['gs'] / v_gp,
+            'visit_avg_goals_conceded': v_stats['gc'] / v_gp,
+            'visit_win_rate': v_stats['w'] / v_gp,
+            'target': 0
+        }
+
+        if g_local > g_visit:
+            row['target'] = 0
+            l_stats['w'] += 1
+        elif g_local == g_visit:
+            row['target'] = 1
+        else:
+            row['target'] = 2
+            v_stats['w'] += 1
+
+        l_stats['gs'] += g_local
+        l_stats['gc'] += g_visit
+        l_stats['gp'] += 1
+        v_stats['gs'] += g_visit
+        v_stats['gc'] += g_local
+        v_stats['gp'] += 1
+
+        data.append(row)
+
+    return pd.DataFrame(data)
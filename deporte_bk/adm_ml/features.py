@@ -0,0 +1,198 @@
+"""
+Feature store por equipo para el modelo ML.
+
+Las predicciones leen una fila de TeamFeatures por equipo (clave primaria) en lugar
+de agregar todo el historial de partidos en cada request.
+
+Cada fila guarda los acumuladores (PJ, PG, PE, PP, GF, GC), los últimos partidos
+(Recientes) y el último partido acumulado, así un resultado nuevo se suma en O(1) sin
+releer el historial (`add_match`). Las correcciones y eliminaciones, y un resultado
+cargado tarde para un partido anterior al último acumulado, recalculan el equipo
+completo (`refresh_team_features`). El orden es el de `_played_matches`: fecha de la
+jornada (los partidos sin fecha primero) y id.
+"""
+from collections import deque
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from deporte_bd.models import Partido, Equipo
+from .models import TeamFeatures
+
+# Ventanas (en partidos) para la forma reciente
+FORM_WINDOWS = (5, 10)
+
+FEATURE_FIELDS = ['PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'Forma', 'Recientes', 'Ultimo_Partido', 'Ultimo_IDPartido']
+
+
+class _TeamAccumulator:
+    """Acumula los partidos de un equipo en orden cronológico."""
+
+    __slots__ = ('pj', 'pg', 'pe', 'pp', 'gf', 'gc', 'recent', 'last_date', 'last_id')
+
+    def __init__(self):
+        self.pj = self.pg = self.pe = self.pp = self.gf = self.gc = 0
+        self.recent = deque(maxlen=max(FORM_WINDOWS))
+        self.last_date = None
+        self.last_id = None
+
+    @classmethod
+    def from_model(cls, features):
+        acc = cls()
+        acc.pj, acc.pg, acc.pe, acc.pp = features.PJ, features.PG, features.PE, features.PP
+        acc.gf, acc.gc = features.GF, features.GC
+        acc.recent.extend(tuple(game) for game in features.Recientes or [])
+        acc.last_date = features.Ultimo_Partido
+        acc.last_id = features.Ultimo_IDPartido
+        return acc
+
+    def accepts(self, fecha, partido_id):
+        """
+        El partido va después de todos los acumulados (en el orden de _played_matches) y la
+        fila tiene su buffer de partidos recientes completo: se puede sumar sin recalcular.
+        """
+        if fecha is None or len(self.recent) != min(self.pj, self.recent.maxlen):
+            return False
+        if self.pj and self.last_id is None:
+            return False
+        return self.last_date is None or (fecha, partido_id) > (self.last_date, self.last_id)
+
+    def add(self, scored, conceded, fecha, partido_id=None):
+        self.pj += 1
+        self.gf += scored
+        self.gc += conceded
+        if scored > conceded:
+            self.pg += 1
+        elif scored == conceded:
+            self.pe += 1
+        else:
+            self.pp += 1
+        self.recent.append((scored, conceded))
+        if fecha is not None:
+            self.last_date = fecha
+        self.last_id = partido_id
+
+    def _form(self, window):
+        games = list(self.recent)[-window:]
+        won = sum(1 for s, c in games if s > c)
+        drawn = sum(1 for s, c in games if s == c)
+        return {
+            'PJ': len(games),
+            'PG': won,
+            'PE': drawn,
+            'PP': len(games) - won - drawn,
+            'GF': sum(s for s, _ in games),
+            'GC': sum(c for _, c in games),
+            'Puntos': won * 3 + drawn,
+        }
+
+    def to_model(self, team_id):
+        return TeamFeatures(
+            IDEquipo_id=team_id,
+            PJ=self.pj, PG=self.pg, PE=self.pe, PP=self.pp,
+            GF=self.gf, GC=self.gc,
+            Forma={str(w): self._form(w) for w in FORM_WINDOWS},
+            Recientes=[list(game) for game in self.recent],
+            Ultimo_Partido=self.last_date,
+            Ultimo_IDPartido=self.last_id,
+        )
+
+
+def _played_matches(team_ids=None):
+    """
+    Partidos con resultado en orden cronológico como tuplas (id, local, visita, gl, gv, fecha).
+    Los partidos sin fecha van primero en todos los motores (PostgreSQL los ordena al final).
+    """
+    qs = Partido.objects.filter(IDResultado__isnull=False)
+    if team_ids is not None:
+        qs = qs.filter(Q(IDEquipo_Local_id__in=team_ids) | Q(IDEquipo_Visitante_id__in=team_ids))
+    return qs.order_by(F('IDFixture__Fecha').asc(nulls_first=True), 'id').values_list(
+        'id', 'IDEquipo_Local_id', 'IDEquipo_Visitante_id',
+        'IDResultado__Goles_Local', 'IDResultado__Goles_Visitante',
+        'IDFixture__Fecha'
+    )
+
+
+def _accumulate(rows, team_ids=None):
+    acc = {team_id: _TeamAccumulator() for team_id in (team_ids or [])}
+    for partido_id, local_id, visit_id, g_local, g_visit, fecha in rows:
+        if team_ids is None or local_id in acc:
+            acc.setdefault(local_id, _TeamAccumulator()).add(g_local, g_visit, fecha, partido_id)
+        if team_ids is None or visit_id in acc:
+            acc.setdefault(visit_id, _TeamAccumulator()).add(g_visit, g_local, fecha, partido_id)
+    return acc
+
+
+def _upsert(rows):
+    # bulk_create asigna Actualizado (auto_now) también en las filas que actualiza
+    TeamFeatures.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['IDEquipo'],
+        update_fields=FEATURE_FIELDS + ['Actualizado'],
+    )
+
+
+def refresh_team_features(team_ids):
+    """
+    Recalcula las filas de los equipos indicados a partir de su propio historial.
+    Se llama al corregir o eliminar resultados, por lo que sólo toca los equipos afectados.
+    """
+    team_ids = {int(t) for t in team_ids if t is not None}
+    if not team_ids:
+        return {}
+    # Sólo equipos existentes (la FK no admite ids inválidos)
+    team_ids = set(Equipo.objects.filter(id__in=team_ids).values_list('id', flat=True))
+
+    acc = _accumulate(_played_matches(list(team_ids)).iterator(), team_ids)
+    rows = [acc[team_id].to_model(team_id) for team_id in team_ids]
+    _upsert(rows)
+    return {row.IDEquipo_id: row for row in rows}
+
+
+def add_match(partido_id, local_id, visit_id, goles_local, goles_visitante, fecha):
+    """
+    Suma un partido que acaba de recibir su primer resultado a las filas de sus dos equipos,
+    sin leer su historial. Un equipo sin fila, o para el que el partido no va después del
+    último acumulado (sin fecha o anterior), se recalcula completo.
+    """
+    with transaction.atomic():
+        existing = TeamFeatures.objects.select_for_update().in_bulk([local_id, visit_id])
+        rows, full = [], []
+        for team_id, scored, conceded in ((local_id, goles_local, goles_visitante), (visit_id, goles_visitante, goles_local)):
+            acc = _TeamAccumulator.from_model(existing[team_id]) if team_id in existing else None
+            if acc is None or not acc.accepts(fecha, partido_id):
+                full.append(team_id)
+                continue
+            acc.add(scored, conceded, fecha, partido_id)
+            rows.append(acc.to_model(team_id))
+        if rows:
+            _upsert(rows)
+        if full:
+            refresh_team_features(full)
+
+
+def rebuild_team_features(chunk_size=5000):
+    """Reconstruye todo el feature store en una sola pasada sobre el historial."""
+    acc = _accumulate(_played_matches().iterator(chunk_size=chunk_size))
+    rows = [a.to_model(team_id) for team_id, a in acc.items()]
+    with transaction.atomic():
+        TeamFeatures.objects.all().delete()
+        TeamFeatures.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def get_team_features(team_ids):
+    """
+    Devuelve {team_id: TeamFeatures}. Los equipos sin fila (p. ej. antes del primer
+    rebuild) se materializan en el momento.
+    """
+    team_ids = {int(t) for t in team_ids}
+    features = TeamFeatures.objects.in_bulk(list(team_ids))
+    missing = team_ids - set(features)
+    if missing:
+        features.update(refresh_team_features(missing))
+        # Equipos inexistentes: estadísticas vacías sin persistir
+        for team_id in team_ids - set(features):
+            features[team_id] = TeamFeatures(IDEquipo_id=team_id)
+    return features
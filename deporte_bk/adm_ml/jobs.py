@@ -0,0 +1,118 @@
+"""
+Cola de entrenamientos ML respaldada por la tabla TrainingJob.
+
+Los endpoints encolan trabajos y responden de inmediato; el comando
+`python manage.py ml_worker` los reclama y ejecuta en un proceso aparte,
+de modo que ningún worker de gunicorn ejecuta un fit de RandomForest.
+
+El modo RATINGS_MODE no entrena: re-procesa los ratings Elo de todo el historial
+(ver adm_ml/ratings.py) cuando se corrige o elimina un resultado ya aplicado.
+"""
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.utils import timezone
+
+from . import poisson
+from .models import TrainingJob
+from .ratings import rebuild_ratings
+
+RATINGS_MODE = 'ratings'
+
+
+def enqueue_training(modo='completo', usuario=None):
+    """
+    Encola un entrenamiento. Si ya hay uno pendiente del mismo modo se reutiliza,
+    así varios requests simultáneos no generan trabajos duplicados.
+    Devuelve (job, creado).
+    """
+    pendiente = TrainingJob.objects.filter(Estado='Pendiente', Modo=modo).order_by('id').first()
+    if pendiente:
+        return pendiente, False
+    job = TrainingJob.objects.create(Modo=modo, Solicitado_Por=usuario, Mensaje='En cola')
+    return job, True
+
+
+def enqueue_ratings_rebuild():
+    """
+    Encola el re-procesamiento de los ratings. Mientras haya uno pendiente no se crea
+    otro: una corrección masiva termina en una sola pasada sobre el historial.
+    """
+    job, _ = enqueue_training(RATINGS_MODE)
+    return job
+
+
+def _run_ratings(progress):
+    progress(10, 'Re-procesando ratings')
+    total = rebuild_ratings()
+    return {'status': 'success', 'message': f'Ratings recalculados para {total} equipos', 'teams': total}
+
+
+def active_job():
+    """Último trabajo pendiente o en curso, si existe."""
+    return TrainingJob.objects.filter(Estado__in=['Pendiente', 'En Curso']).order_by('-id').first()
+
+
+def claim_next_job():
+    """
+    Reclama el trabajo pendiente más antiguo. El UPDATE condicionado al estado
+    garantiza que dos workers no tomen el mismo trabajo.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    for job_id in TrainingJob.objects.filter(Estado='Pendiente').order_by('id').values_list('id', flat=True)[:5]:
+        claimed = TrainingJob.objects.filter(pk=job_id, Estado='Pendiente').update(
+            Estado='En Curso', Iniciado=timezone.now(), Worker=worker, Progreso=0, Mensaje='Iniciando'
+        )
+        if claimed:
+            return TrainingJob.objects.get(pk=job_id)
+    return None
+
+
+def fail_stale_jobs(minutes):
+    """Marca como error los trabajos 'En Curso' abandonados (p. ej. worker reiniciado)."""
+    limite = timezone.now() - timedelta(minutes=minutes)
+    return TrainingJob.objects.filter(Estado='En Curso', Iniciado__lt=limite).update(
+        Estado='Error', Finalizado=timezone.now(), Mensaje='Interrumpido: el worker no finalizó el entrenamiento'
+    )
+
+
+def run_job(job, predictor=None):
+    """Ejecuta un trabajo ya reclamado y registra su resultado."""
+    from .services import get_predictor
+
+    predictor = predictor or get_predictor()
+
+    def progress(porcentaje, mensaje):
+        TrainingJob.objects.filter(pk=job.pk).update(Progreso=porcentaje, Mensaje=mensaje)
+
+    try:
+        if job.Modo == RATINGS_MODE:
+            result = _run_ratings(progress)
+        else:
+            result = predictor.train(progress=progress, mode=job.Modo)
+    except Exception as e:
+        traceback.print_exc()
+        result = {'status': 'error', 'message': str(e)}
+
+    job.Finalizado = timezone.now()
+    job.Resultado = result
+    if result.get('status') == 'success':
+        job.Estado = 'Completado'
+        job.Progreso = 100
+        job.Accuracy = result.get('accuracy')
+        job.Muestras = result.get('samples')
+        job.Mensaje = result.get('message') or 'Modelo entrenado y publicado'
+        # El modelo de goles se ajusta en milisegundos: se actualiza junto con el principal
+        if job.Modo != RATINGS_MODE:
+            try:
+                result['poisson'] = poisson.train()
+            except Exception as e:
+                traceback.print_exc()
+                result['poisson'] = {'status': 'error', 'message': str(e)}
+    else:
+        job.Estado = 'Error'
+        job.Mensaje = result.get('message')
+    job.save(update_fields=['Estado', 'Progreso', 'Accuracy', 'Muestras', 'Mensaje', 'Resultado', 'Finalizado'])
+    return job
@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from adm_ml.dataset import (
+    FEATURE_COLUMNS, compute_features, rolling_features_loop,
+    load_match_arrays, played_matches_queryset
+)
+
+class Command(BaseCommand):
+    help = 'Compara el constructor de dataset secuencial contra el vectorizado con partidos sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                            help='Cantidades de partidos sintéticos a evaluar')
+        parser.add_argument('--teams', type=int, default=200, help='Cantidad de equipos sintéticos')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--db', action='store_true',
+                            help='Además mide ambos caminos de lectura sobre la base de datos actual')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        self.stdout.write(f"{'partidos':>10} {'secuencial (s)':>15} {'vectorizado (s)':>16} {'speedup':>8}  iguales")
+
+        for size in options['sizes']:
+            local = rng.integers(0, options['teams'], size)
+            # Visitante distinto del local
+            visit = (local + rng.integers(1, options['teams'], size)) % options['teams']
+            g_local = rng.poisson(1.5, size)
+            g_visit = rng.poisson(1.1, size)
+
+            rows = list(zip(local.tolist(), visit.tolist(), g_local.tolist(), g_visit.tolist()))
+            start = time.perf_counter()
+            df_loop = rolling_features_loop(rows)
+            loop_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            X, y = compute_features(local, visit, g_local, g_visit)
+            vector_time = time.perf_counter() - start
+
+            iguales = (
+                np.array_equal(df_loop[FEATURE_COLUMNS].to_numpy(), X)
+                and np.array_equal(df_loop['target'].to_numpy(), y)
+            )
+            self.stdout.write(
+                f"{size:>10} {loop_time:>15.3f} {vector_time:>16.3f} {loop_time / vector_time:>7.1f}x  {'sí' if iguales else 'NO'}"
+            )
+
+        if options['db']:
+            self._bench_db()
+
+    def _bench_db(self):
+        self.stdout.write("\nBase de datos actual:")
+        start = time.perf_counter()
+        rows = [
+            (p.IDEquipo_Local_id, p.IDEquipo_Visitante_id, p.IDResultado.Goles_Local, p.IDResultado.Goles_Visitante)
+            for p in played_matches_queryset().select_related('IDResultado', 'IDFixture')
+        ]
+        df_loop = rolling_features_loop(rows)
+        orm_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        data = load_match_arrays()
+        X, y = compute_features(data[:, 0], data[:, 1], data[:, 2], data[:, 3])
+        stream_time = time.perf_counter() - start
+
+        iguales = np.array_equal(df_loop[FEATURE_COLUMNS].to_numpy(), X)
+        self.stdout.write(
+            f"  {len(data)} partidos: ORM + bucle {orm_time:.3f}s, streaming + vectorizado {stream_time:.3f}s "
+            f"(iguales: {'sí' if iguales else 'NO'})"
+        )
@@ -0,0 +1,100 @@
+import gc
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from adm_ml.dataset import FEATURE_COLUMNS
+from adm_ml.registry import get_registry, load_artifact, process_memory
+
+class Command(BaseCommand):
+    help = ('Reporta tamaño en disco, tiempo de carga y memoria por proceso del modelo activo, '
+            'y simula N workers con y sin precarga compartida')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=0,
+                            help='Simula N workers (fork) y mide su memoria privada con y sin precarga')
+
+    def handle(self, *args, **options):
+        registry = get_registry()
+        path = registry.model_path
+        if not os.path.exists(path):
+            raise CommandError("No hay un modelo activo")
+
+        self.stdout.write(f"Modelo: {path}")
+        self.stdout.write(f"Tamaño en disco: {os.path.getsize(path) / 1e6:.2f} MB")
+
+        for label, loader in (('joblib.load', joblib.load), ('mmap_mode="r"', load_artifact)):
+            before = process_memory()
+            start = time.perf_counter()
+            model = loader(path)
+            elapsed = (time.perf_counter() - start) * 1000
+            after = process_memory()
+            self.stdout.write(
+                f"{label:<14} carga {elapsed:8.1f} ms   "
+                f"RSS +{after.get('rss_mb', 0) - before.get('rss_mb', 0):7.1f} MB   "
+                f"privada +{after.get('private_mb', 0) - before.get('private_mb', 0):7.1f} MB"
+            )
+            del model
+            gc.collect()
+
+        if options['workers'] > 0:
+            if not hasattr(os, 'fork'):
+                raise CommandError("--workers requiere os.fork (Linux)")
+            self.simulate(path, options['workers'])
+
+    def simulate(self, path, workers):
+        """
+        Compara la memoria privada de N procesos hijos cuando cada uno carga el modelo
+        (gunicorn sin --preload) contra cuando lo heredan ya cargado del padre (--preload).
+        """
+        def child(model):
+            if model is None:
+                model = load_artifact(path)
+            # Las columnas con las que se entrenó la versión (p. ej. con ratings)
+            columns = list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS))
+            sample = pd.DataFrame(np.random.default_rng(0).random((200, len(columns))), columns=columns)
+            model.predict_proba(sample)
+            return process_memory()
+
+        per_worker = self.run_children(workers, lambda: child(None))
+
+        model = load_artifact(path)
+        gc.freeze()
+        preloaded = self.run_children(workers, lambda: child(model))
+        gc.unfreeze()
+
+        for label, results in (('carga por worker', per_worker), ('precarga + fork', preloaded)):
+            private = sum(r.get('private_mb', 0) for r in results)
+            self.stdout.write(
+                f"{label:<17} {workers} workers: privada total {private:8.1f} MB "
+                f"(promedio {private / max(len(results), 1):7.1f} MB por worker)"
+            )
+
+    def run_children(self, workers, target):
+        results = []
+        for _ in range(workers):
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                try:
+                    try:
+                        payload = target()
+                    except Exception as e:
+                        payload = {'error': f'{type(e).__name__}: {e}'}
+                    os.write(write_fd, json.dumps(payload).encode())
+                finally:
+                    os._exit(0)
+            os.close(write_fd)
+            with os.fdopen(read_fd) as f:
+                payload = f.read()
+            os.waitpid(pid, 0)
+            result = json.loads(payload) if payload else {'error': 'el proceso terminó sin respuesta'}
+            if 'error' in result:
+                raise CommandError(f"Worker simulado falló: {result['error']}")
+            results.append(result)
+        return results
@@ -0,0 +1,68 @@
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from adm_ml.dataset import FEATURE_COLUMNS, load_match_arrays
+from adm_ml.ratings import RATING_COLUMNS
+from adm_ml.registry import get_registry, load_artifact
+from adm_ml.services import MatchPredictor
+
+class Command(BaseCommand):
+    help = 'Lista, activa o revierte versiones del modelo ML y compara su costo de carga e inferencia'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--activate', metavar='VERSION', help='Activa la versión indicada')
+        parser.add_argument('--rollback', action='store_true', help='Activa la versión anterior a la activa')
+        parser.add_argument('--bench', action='store_true',
+                            help='Mide tiempo de carga y latencia de predicción de cada versión')
+        parser.add_argument('--rows', type=int, default=500, help='Partidos usados para medir la latencia (--bench)')
+
+    def handle(self, *args, **options):
+        registry = get_registry()
+        try:
+            if options['activate']:
+                registry.activate(options['activate'])
+                self.stdout.write(self.style.SUCCESS(f"Versión {options['activate']} activada"))
+            elif options['rollback']:
+                version = registry.rollback()
+                self.stdout.write(self.style.SUCCESS(f"Versión {version} activada"))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        versions = registry.versions()
+        if not versions:
+            self.stdout.write("No hay versiones registradas")
+            return
+
+        sample = None
+        if options['bench']:
+            # Todas las columnas posibles; cada versión toma las suyas (feature_names_in_)
+            data = load_match_arrays()
+            if len(data):
+                sample = MatchPredictor()._features(data, with_ratings=True)[0].tail(options['rows'])
+            else:
+                columns = FEATURE_COLUMNS + RATING_COLUMNS
+                sample = pd.DataFrame([[0.0] * len(columns)], columns=columns)
+
+        header = f"  {'versión':<20} {'modo':<12} {'muestras':>8} {'accuracy':>8} {'árboles':>7} {'fit (s)':>8} {'MB':>7}"
+        if sample is not None:
+            header += f" {'carga (ms)':>10} {'pred (ms)':>9}"
+        self.stdout.write(header)
+
+        for meta in versions:
+            accuracy = meta.get('accuracy')
+            line = (
+                f"{'*' if meta['active'] else ' '} {meta['version']:<20} {meta.get('mode') or '-':<12} "
+                f"{meta.get('samples') or '-':>8} {f'{accuracy:.4f}' if accuracy is not None else '-':>8} "
+                f"{meta.get('n_estimators') or '-':>7} {meta.get('training_seconds', '-'):>8} "
+                f"{(meta.get('file_size_bytes') or 0) / 1e6:>7.2f}"
+            )
+            if sample is not None:
+                start = time.perf_counter()
+                model = load_artifact(registry.model_file(meta['version']))
+                load_ms = (time.perf_counter() - start) * 1000
+                start = time.perf_counter()
+                model.predict_proba(sample[list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS))])
+                predict_ms = (time.perf_counter() - start) * 1000
+                line += f" {load_ms:>10.1f} {predict_ms:>9.1f}"
+            self.stdout.write(line)
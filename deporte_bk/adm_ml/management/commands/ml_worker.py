@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from adm_ml.jobs import claim_next_job, run_job, fail_stale_jobs
+
+class Command(BaseCommand):
+    help = 'Worker que ejecuta los entrenamientos ML encolados (tabla TrainingJob)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll', type=float, default=5.0, help='Segundos de espera cuando no hay trabajos')
+        parser.add_argument('--once', action='store_true', help='Procesa los trabajos pendientes y termina')
+        parser.add_argument('--stale-minutes', type=int, default=60,
+                            help='Minutos tras los cuales un trabajo "En Curso" se considera abandonado')
+
+    def handle(self, *args, **options):
+        stale = fail_stale_jobs(options['stale_minutes'])
+        if stale:
+            self.stdout.write(self.style.WARNING(f"{stale} entrenamiento(s) abandonados marcados como error"))
+
+        self.stdout.write("Worker ML esperando entrenamientos...")
+        while True:
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
+                continue
+
+            self.stdout.write(f"Ejecutando entrenamiento {job.id} ({job.Modo})...")
+            job = run_job(job)
+            if job.Estado == 'Completado' and job.Accuracy is None:
+                self.stdout.write(self.style.SUCCESS(f"Trabajo {job.id} completado. {job.Mensaje}"))
+            elif job.Estado == 'Completado':
+                self.stdout.write(self.style.SUCCESS(f"Entrenamiento {job.id} completado. Accuracy: {job.Accuracy}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"Entrenamiento {job.id} falló: {job.Mensaje}"))
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+from adm_ml.ratings import rebuild_ratings
+
+class Command(BaseCommand):
+    help = 'Recalcula los ratings Elo de todos los equipos re-procesando el historial en orden cronológico'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Filas leídas por lote desde la base de datos')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Recalculando ratings...")
+        start = time.perf_counter()
+        total = rebuild_ratings(chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Ratings actualizados para {total} equipos en {elapsed:.2f}s"))
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+from adm_ml.features import rebuild_team_features
+
+class Command(BaseCommand):
+    help = 'Reconstruye el feature store de equipos (TeamFeatures) a partir del historial de partidos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Filas leídas por lote desde la base de datos')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Reconstruyendo features de equipos...")
+        start = time.perf_counter()
+        total = rebuild_team_features(chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Features actualizadas para {total} equipos en {elapsed:.2f}s"))
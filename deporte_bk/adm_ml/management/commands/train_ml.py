@@ -1,15 +1,91 @@
+import argparse
+import os
+
+import numpy as np
+
 from django.core.management.base import BaseCommand
 from adm_ml.services import MatchPredictor
+from adm_ml.jobs import enqueue_training
+from adm_ml.dataset import compute_features, load_match_arrays
+from adm_ml.search import build_estimator, run_search, select_best
+from adm_ml.ratings import replay
 
 class Command(BaseCommand):
     help = 'Entrena el modelo de Machine Learning y genera el archivo .pkl'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--enqueue', action='store_true',
+                            help='Encola el entrenamiento para el worker (ml_worker) en lugar de ejecutarlo aquí')
+        parser.add_argument('--full', action='store_true',
+                            help='Re-entrena con todo el historial (por defecto sólo se procesan los partidos nuevos)')
+        parser.add_argument('--ratings', action=argparse.BooleanOptionalAction, default=None,
+                            help='Incluye (o no) los ratings Elo como features en un entrenamiento completo; '
+                                 'por defecto se conserva lo que usaba la versión activa')
+        parser.add_argument('--search', action='store_true',
+                            help='Compara una grilla de estimadores con validación cruzada temporal y registra el mejor')
+        parser.add_argument('--n-jobs', type=int, default=os.cpu_count() or 1,
+                            help='Procesos usados por --search')
+        parser.add_argument('--folds', type=int, default=5, help='Particiones temporales de --search')
+        parser.add_argument('--max-latency-ms', type=float, default=None,
+                            help='Latencia máxima por predicción aceptada por --search')
+        parser.add_argument('--max-size-mb', type=float, default=None,
+                            help='Tamaño máximo del modelo aceptado por --search')
+        parser.add_argument('--tolerance', type=float, default=0.005,
+                            help='Diferencia de log-loss que se acepta a cambio de un modelo más rápido')
+        parser.add_argument('--dry-run', action='store_true', help='Con --search, sólo informa sin registrar el modelo')
+
     def handle(self, *args, **kwargs):
-        self.stdout.write("Iniciando entrenamiento del modelo...")
+        if kwargs['search']:
+            return self.search(kwargs)
+
+        modo = 'completo' if kwargs['full'] else 'incremental'
+        if kwargs['enqueue']:
+            job, creado = enqueue_training(modo=modo)
+            estado = "encolado" if creado else "ya estaba pendiente"
+            self.stdout.write(self.style.SUCCESS(f"Entrenamiento {job.id} ({modo}) {estado}"))
+            return
+
+        self.stdout.write(f"Iniciando entrenamiento del modelo ({modo})...")
         predictor = MatchPredictor()
-        result = predictor.train()
-        
+        result = predictor.train(mode=modo, with_ratings=kwargs['ratings'])
+        self.report(result)
+
+    def report(self, result):
         if result.get('status') == 'success':
-            self.stdout.write(self.style.SUCCESS(f"Modelo entrenado exitosamente! Accuracy: {result['accuracy']}"))
+            self.stdout.write(self.style.SUCCESS(f"{result.get('message', 'Modelo entrenado exitosamente!')} Accuracy: {result['accuracy']}"))
         else:
             self.stdout.write(self.style.ERROR(f"Error al entrenar: {result.get('message')}"))
+
+    def search(self, options):
+        data = load_match_arrays()
+        if len(data) < options['folds'] * 10:
+            self.stdout.write(self.style.ERROR(f"Insuficientes datos para la búsqueda ({len(data)} partidos jugados)"))
+            return
+        X, y = compute_features(data[:, 0], data[:, 1], data[:, 2], data[:, 3])
+        if options['ratings']:
+            pre, _, _ = replay(data[:, :4].tolist())
+            X = np.column_stack([X, pre])
+
+        self.stdout.write(f"Evaluando candidatos con {len(X)} partidos, {options['folds']} particiones temporales "
+                          f"y {options['n_jobs']} procesos...")
+        results = run_search(X, y, n_splits=options['folds'], n_jobs=options['n_jobs'])
+
+        self.stdout.write(f"{'estimador':<32} {'parámetros':<52} {'accuracy':>8} {'log-loss':>8} "
+                          f"{'fit (s)':>8} {'pred (ms)':>9} {'MB':>7}")
+        for r in results:
+            params = ', '.join(f"{k}={v}" for k, v in r['params'].items() if k != 'random_state')
+            self.stdout.write(f"{r['estimator']:<32} {params:<52} {r['accuracy']:>8.4f} {r['log_loss']:>8.4f} "
+                              f"{r['fit_seconds']:>8.3f} {r['predict_ms']:>9.2f} {r['size_bytes'] / 1e6:>7.2f}")
+
+        best = select_best(results, options['max_latency_ms'], options['max_size_mb'], options['tolerance'])
+        self.stdout.write(self.style.SUCCESS(f"Seleccionado: {best['estimator']} {best['params']}"))
+        if options['dry_run']:
+            return
+
+        result = MatchPredictor().train(
+            mode='completo',
+            estimator=build_estimator(best['estimator'], best['params']),
+            with_ratings=bool(options['ratings']),
+            extra_meta={'search': {k: best[k] for k in ('accuracy', 'log_loss', 'fit_seconds', 'predict_ms', 'size_bytes')}},
+        )
+        self.report(result)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from adm_ml.poisson import DEFAULT_XI, train
+
+class Command(BaseCommand):
+    help = 'Ajusta el modelo de goles Poisson (Dixon-Coles) y publica sus parámetros'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--xi', type=float, default=DEFAULT_XI,
+                            help='Decaimiento por día de antigüedad de los partidos (0 = todos pesan igual)')
+
+    def handle(self, *args, **options):
+        result = train(xi=options['xi'])
+        if result['status'] != 'success':
+            self.stdout.write(self.style.ERROR(result['message']))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Modelo de goles ajustado con {result['samples']} partidos en {result['iterations']} iteraciones "
+            f"({result['fit_seconds']} s). Ventaja local: {result['home']:.3f}, rho: {result['rho']:.4f}"
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 06:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('deporte_bd', '0004_fixture_fecha_fixture_numero_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamFeatures',
+            fields=[
+                ('IDEquipo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ml_features', serialize=False, to='deporte_bd.equipo')),
+                ('PJ', models.IntegerField(default=0)),
+                ('PG', models.IntegerField(default=0)),
+                ('PE', models.IntegerField(default=0)),
+                ('PP', models.IntegerField(default=0)),
+                ('GF', models.IntegerField(default=0)),
+                ('GC', models.IntegerField(default=0)),
+                ('Forma', models.JSONField(blank=True, default=dict)),
+                ('Ultimo_Partido', models.DateField(blank=True, null=True)),
+                ('Actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Features de Equipo (ML)',
+                'verbose_name_plural': 'Features de Equipos (ML)',
+            },
+        ),
+    ]
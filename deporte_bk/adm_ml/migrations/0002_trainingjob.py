@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-18 06:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adm_ml', '0001_initial'),
+        ('deporte_bd', '0004_fixture_fecha_fixture_numero_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('Estado', models.CharField(choices=[('Pendiente', 'Pendiente'), ('En Curso', 'En Curso'), ('Completado', 'Completado'), ('Error', 'Error')], default='Pendiente', max_length=20)),
+                ('Modo', models.CharField(default='completo', max_length=20)),
+                ('Progreso', models.SmallIntegerField(default=0)),
+                ('Mensaje', models.TextField(blank=True, null=True)),
+                ('Accuracy', models.FloatField(blank=True, null=True)),
+                ('Muestras', models.IntegerField(blank=True, null=True)),
+                ('Resultado', models.JSONField(blank=True, default=dict)),
+                ('Worker', models.CharField(blank=True, max_length=100, null=True)),
+                ('Creado', models.DateTimeField(auto_now_add=True)),
+                ('Iniciado', models.DateTimeField(blank=True, null=True)),
+                ('Finalizado', models.DateTimeField(blank=True, null=True)),
+                ('Solicitado_Por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='deporte_bd.usuario')),
+            ],
+            options={
+                'verbose_name': 'Entrenamiento ML',
+                'verbose_name_plural': 'Entrenamientos ML',
+                'indexes': [models.Index(fields=['Estado', 'id'], name='adm_ml_trai_Estado_6c5b92_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adm_ml', '0002_trainingjob'),
+        ('deporte_bd', '0004_fixture_fecha_fixture_numero_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamRating',
+            fields=[
+                ('IDEquipo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ml_rating', serialize=False, to='deporte_bd.equipo')),
+                ('Rating', models.FloatField(default=1500.0)),
+                ('PJ', models.IntegerField(default=0)),
+                ('Actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Rating de Equipo (ML)',
+                'verbose_name_plural': 'Ratings de Equipos (ML)',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adm_ml', '0003_teamrating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultadoVersion',
+            fields=[
+                ('Clave', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('Version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Versión de Resultados (ML)',
+                'verbose_name_plural': 'Versiones de Resultados (ML)',
+            },
+        ),
+    ]
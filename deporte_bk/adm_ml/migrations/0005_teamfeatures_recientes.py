@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adm_ml', '0004_resultadoversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teamfeatures',
+            name='Recientes',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='teamfeatures',
+            name='Ultimo_IDPartido',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,3 +1,115 @@
 from django.db import models
+from deporte_bd.models import Equipo, Usuario
 
-# Create your models here.
+
+class TeamFeatures(models.Model):
+    """
+    Estadísticas materializadas por equipo para la inferencia del modelo ML.
+    Un resultado nuevo suma su aporte a la fila (ver adm_ml/features.py); las correcciones
+    recalculan los equipos afectados. Se pueden reconstruir con
+    `python manage.py rebuild_team_features`.
+    """
+    IDEquipo = models.OneToOneField(Equipo, on_delete=models.CASCADE, primary_key=True, related_name='ml_features')
+    PJ = models.IntegerField(default=0) # Partidos Jugados
+    PG = models.IntegerField(default=0) # Partidos Ganados
+    PE = models.IntegerField(default=0) # Partidos Empatados
+    PP = models.IntegerField(default=0) # Partidos Perdidos
+    GF = models.IntegerField(default=0) # Goles a Favor
+    GC = models.IntegerField(default=0) # Goles en Contra
+    # Forma reciente: {"5": {"PJ", "PG", "PE", "PP", "GF", "GC", "Puntos"}, "10": {...}}
+    Forma = models.JSONField(default=dict, blank=True)
+    # Últimos partidos [[GF, GC], ...] (el más reciente al final) para actualizar Forma sin releer el historial
+    Recientes = models.JSONField(default=list, blank=True)
+    Ultimo_Partido = models.DateField(blank=True, null=True)
+    Ultimo_IDPartido = models.IntegerField(blank=True, null=True) # Último partido acumulado (orden: fecha, id)
+    Actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Features de Equipo (ML)"
+        verbose_name_plural = "Features de Equipos (ML)"
+
+    def __str__(self):
+        return f"Features: {self.IDEquipo_id} ({self.PJ} PJ)"
+
+    @property
+    def avg_goals_scored(self):
+        return self.GF / self.PJ if self.PJ else 0
+
+    @property
+    def avg_goals_conceded(self):
+        return self.GC / self.PJ if self.PJ else 0
+
+    @property
+    def win_rate(self):
+        return self.PG / self.PJ if self.PJ else 0
+
+
+class TeamRating(models.Model):
+    """
+    Rating Elo por equipo. Cada resultado nuevo lo actualiza en O(1) (ver adm_ml/ratings.py);
+    si se corrige o elimina un resultado se re-procesa el historial completo en orden
+    cronológico (`python manage.py rebuild_ratings`).
+    """
+    IDEquipo = models.OneToOneField(Equipo, on_delete=models.CASCADE, primary_key=True, related_name='ml_rating')
+    Rating = models.FloatField(default=1500.0)
+    PJ = models.IntegerField(default=0) # Partidos procesados
+    Actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Rating de Equipo (ML)"
+        verbose_name_plural = "Ratings de Equipos (ML)"
+
+    def __str__(self):
+        return f"Rating: {self.IDEquipo_id} ({self.Rating:.0f})"
+
+
+class TrainingJob(models.Model):
+    """
+    Trabajo de entrenamiento del modelo ML. Los requests sólo lo encolan;
+    lo ejecuta el worker `python manage.py ml_worker` fuera del ciclo request/response.
+    """
+    ESTADO_CHOICES = [
+        ('Pendiente', 'Pendiente'),
+        ('En Curso', 'En Curso'),
+        ('Completado', 'Completado'),
+        ('Error', 'Error'),
+    ]
+    Estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='Pendiente')
+    Modo = models.CharField(max_length=20, default='completo')
+    Progreso = models.SmallIntegerField(default=0) # 0-100
+    Mensaje = models.TextField(blank=True, null=True)
+    Accuracy = models.FloatField(blank=True, null=True)
+    Muestras = models.IntegerField(blank=True, null=True)
+    Resultado = models.JSONField(default=dict, blank=True)
+    Worker = models.CharField(max_length=100, blank=True, null=True)
+    Solicitado_Por = models.ForeignKey(Usuario, on_delete=models.SET_NULL, blank=True, null=True)
+    Creado = models.DateTimeField(auto_now_add=True)
+    Iniciado = models.DateTimeField(blank=True, null=True)
+    Finalizado = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Entrenamiento ML"
+        verbose_name_plural = "Entrenamientos ML"
+        indexes = [
+            models.Index(fields=['Estado', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Entrenamiento {self.id} ({self.Modo}) - {self.Estado}"
+
+
+class ResultadoVersion(models.Model):
+    """
+    Contadores de cambios en los resultados (ver adm_ml/changes.py). Las señales de
+    adm_ml/signals.py los incrementan al confirmar la transacción; quien guardó el valor
+    de un contador sabe si desde entonces cambió algo de lo que éste cubre.
+    """
+    Clave = models.CharField(max_length=50, primary_key=True) # 'correcciones', ...
+    Version = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Versión de Resultados (ML)"
+        verbose_name_plural = "Versiones de Resultados (ML)"
+
+    def __str__(self):
+        return f"{self.Clave}: {self.Version}"
@@ -0,0 +1,310 @@
+"""
+Modelo de goles Poisson (Dixon-Coles) como segundo predictor de adm_ml.
+
+Cada equipo tiene una fuerza de ataque `a` y una debilidad defensiva `b`, y los goles
+de un partido son Poisson con medias
+
+    goles local     ~ Poisson(a_local  * b_visita * h)
+    goles visitante ~ Poisson(a_visita * b_local)
+
+donde `h` es la ventaja de local. El ajuste maximiza la verosimilitud con actualizaciones
+alternadas de punto fijo en forma cerrada (cada una es un par de np.bincount sobre todos
+los partidos), sin SciPy. Luego se ajusta el parámetro `rho` de Dixon-Coles, que corrige
+la frecuencia de los marcadores bajos (0-0, 1-0, 0-1, 1-1), con una búsqueda de sección
+áurea. Los partidos pueden ponderarse con un decaimiento exponencial por antigüedad.
+
+Predecir es calcular dos vectores de probabilidades Poisson y su producto exterior, así
+que la matriz completa de marcadores de una temporada entera sale de unas pocas
+operaciones vectorizadas.
+"""
+import json
+import math
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.utils import timezone
+
+from .dataset import played_matches_queryset
+from .registry import get_registry
+
+PARAMS_FILE = 'poisson.json'
+# Marcadores de 0 a MAX_GOALS goles por equipo; la masa restante es despreciable y se renormaliza
+MAX_GOALS = 10
+# Decaimiento por día de antigüedad (0.0019 ≈ vida media de un año, como Dixon-Coles)
+DEFAULT_XI = 0.0019
+# Goles "virtuales" de un equipo promedio con que arranca cada equipo: evita fuerzas
+# extremas en equipos con pocos partidos
+PRIOR_GOALS = 2.0
+MAX_ITERATIONS = 500
+TOLERANCE = 1e-9
+RHO_BOUNDS = (-0.3, 0.3)
+
+_LOG_FACTORIAL = np.array([math.lgamma(k + 1) for k in range(MAX_GOALS + 1)])
+_GOALS = np.arange(MAX_GOALS + 1)
+_LOCAL_WINS = _GOALS[:, None] > _GOALS[None, :]
+_DRAWS = _GOALS[:, None] == _GOALS[None, :]
+
+
+def _tau(g_local, g_visit, mu_local, mu_visit, rho):
+    """Factor de corrección de Dixon-Coles para cada partido (1 fuera de los marcadores bajos)."""
+    tau = np.ones(len(g_local))
+    tau = np.where((g_local == 0) & (g_visit == 0), 1.0 - mu_local * mu_visit * rho, tau)
+    tau = np.where((g_local == 0) & (g_visit == 1), 1.0 + mu_local * rho, tau)
+    tau = np.where((g_local == 1) & (g_visit == 0), 1.0 + mu_visit * rho, tau)
+    tau = np.where((g_local == 1) & (g_visit == 1), 1.0 - rho, tau)
+    return tau
+
+
+def _rho_log_likelihood(rho, g_local, g_visit, mu_local, mu_visit, weights):
+    tau = _tau(g_local, g_visit, mu_local, mu_visit, rho)
+    if (tau <= 0).any():
+        return -np.inf
+    return float(np.dot(weights, np.log(tau)))
+
+
+def _fit_rho(g_local, g_visit, mu_local, mu_visit, weights, iterations=60):
+    """
+    Maximiza la verosimilitud en rho (cóncava) por sección áurea, dentro del intervalo
+    en que los cuatro factores de corrección son positivos para todos los partidos.
+    """
+    low_scores = (g_local <= 1) & (g_visit <= 1)
+    args = (g_local[low_scores], g_visit[low_scores], mu_local[low_scores], mu_visit[low_scores], weights[low_scores])
+    if not low_scores.any():
+        return 0.0
+    margin = 1.0 - 1e-6
+    lo = max(RHO_BOUNDS[0], -margin / max(mu_local.max(), mu_visit.max()))
+    hi = min(RHO_BOUNDS[1], margin / (mu_local * mu_visit).max())
+    ratio = (math.sqrt(5) - 1) / 2
+    x1, x2 = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+    f1, f2 = _rho_log_likelihood(x1, *args), _rho_log_likelihood(x2, *args)
+    for _ in range(iterations):
+        if f1 < f2:
+            lo, x1, f1 = x1, x2, f2
+            x2 = lo + ratio * (hi - lo)
+            f2 = _rho_log_likelihood(x2, *args)
+        else:
+            hi, x2, f2 = x2, x1, f1
+            x1 = hi - ratio * (hi - lo)
+            f1 = _rho_log_likelihood(x1, *args)
+    return (lo + hi) / 2
+
+
+def fit(local, visit, g_local, g_visit, weights=None, prior=PRIOR_GOALS,
+        max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """
+    Ajusta el modelo a arrays de partidos (ids de local y visita, goles de cada uno).
+    Devuelve un dict serializable a JSON con las fuerzas por equipo y los parámetros globales.
+    """
+    local, visit = np.asarray(local, dtype=np.int64), np.asarray(visit, dtype=np.int64)
+    g_local, g_visit = np.asarray(g_local, dtype=np.float64), np.asarray(g_visit, dtype=np.float64)
+    weights = np.ones(len(local)) if weights is None else np.asarray(weights, dtype=np.float64)
+    if len(local) == 0:
+        raise ValueError("No hay partidos para ajustar el modelo de goles")
+
+    team_ids, index = np.unique(np.concatenate([local, visit]), return_inverse=True)
+    li, vi = index[:len(local)], index[len(local):]
+    n_teams = len(team_ids)
+
+    # Goles ponderados a favor y en contra de cada equipo (fijos durante el ajuste)
+    goals_for = np.bincount(li, weights * g_local, n_teams) + np.bincount(vi, weights * g_visit, n_teams)
+    goals_against = np.bincount(li, weights * g_visit, n_teams) + np.bincount(vi, weights * g_local, n_teams)
+    home_goals = float(np.dot(weights, g_local))
+    away_goals = float(np.dot(weights, g_visit))
+
+    attack = np.ones(n_teams)
+    defence = np.full(n_teams, max(away_goals, 1e-9) / weights.sum())
+    home = max(home_goals, 1e-9) / max(away_goals, 1e-9)
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        previous = np.concatenate([attack, defence, [home]])
+        # Cada paso es el máximo exacto de la verosimilitud en ese bloque de parámetros
+        expected_for = (np.bincount(li, weights * defence[vi] * home, n_teams)
+                        + np.bincount(vi, weights * defence[li], n_teams))
+        attack = (goals_for + prior) / (expected_for + prior)
+        expected_against = (np.bincount(vi, weights * attack[li] * home, n_teams)
+                            + np.bincount(li, weights * attack[vi], n_teams))
+        defence = (goals_against + prior) / (expected_against + prior / defence.mean())
+        home = home_goals / max(float(np.dot(weights, attack[li] * defence[vi])), 1e-12)
+        # Sólo el producto ataque * defensa está identificado: media geométrica de ataque = 1
+        scale = np.exp(np.log(attack).mean())
+        attack /= scale
+        defence *= scale
+        current = np.concatenate([attack, defence, [home]])
+        if np.max(np.abs(np.log(current / previous))) < tolerance:
+            break
+
+    mu_local = attack[li] * defence[vi] * home
+    mu_visit = attack[vi] * defence[li]
+    rho = _fit_rho(g_local, g_visit, mu_local, mu_visit, weights)
+
+    log_likelihood = float(np.dot(weights, (
+        g_local * np.log(mu_local) - mu_local
+        + g_visit * np.log(mu_visit) - mu_visit
+        + np.log(_tau(g_local, g_visit, mu_local, mu_visit, rho))
+    )))
+    return {
+        'teams': {str(int(t)): [float(a), float(d)] for t, a, d in zip(team_ids, attack, defence)},
+        'home': float(home),
+        'rho': float(rho),
+        'base_defence': float(np.exp(np.log(defence).mean())),
+        'iterations': iterations,
+        'samples': int(len(local)),
+        'log_likelihood': log_likelihood,
+    }
+
+
+def time_weights(dates, reference=None, xi=DEFAULT_XI):
+    """Pesos exp(-xi * días de antigüedad) respecto de `reference` (por defecto la fecha más reciente)."""
+    days = np.array([d.toordinal() for d in dates], dtype=np.float64)
+    if not len(days):
+        return days
+    reference = days.max() if reference is None else reference.toordinal()
+    return np.exp(-xi * np.maximum(reference - days, 0.0))
+
+
+def scoreline_matrices(mu_local, mu_visit, rho=0.0):
+    """
+    Matrices de probabilidad de marcadores, forma (n, MAX_GOALS + 1, MAX_GOALS + 1):
+    [i, x, y] = P(local x goles, visitante y goles) del partido i.
+    """
+    mu_local = np.atleast_1d(np.asarray(mu_local, dtype=np.float64))
+    mu_visit = np.atleast_1d(np.asarray(mu_visit, dtype=np.float64))
+    pmf_local = np.exp(_GOALS * np.log(mu_local)[:, None] - mu_local[:, None] - _LOG_FACTORIAL)
+    pmf_visit = np.exp(_GOALS * np.log(mu_visit)[:, None] - mu_visit[:, None] - _LOG_FACTORIAL)
+    matrices = pmf_local[:, :, None] * pmf_visit[:, None, :]
+    matrices[:, 0, 0] *= 1.0 - mu_local * mu_visit * rho
+    matrices[:, 0, 1] *= 1.0 + mu_local * rho
+    matrices[:, 1, 0] *= 1.0 + mu_visit * rho
+    matrices[:, 1, 1] *= 1.0 - rho
+    np.clip(matrices, 0.0, None, out=matrices)
+    matrices /= matrices.sum(axis=(1, 2), keepdims=True)
+    return matrices
+
+
+class PoissonModel:
+    """Parámetros ajustados por `fit`, con predicción vectorizada por pares de equipos."""
+
+    def __init__(self, params):
+        self.params = params
+        self.home = params['home']
+        self.rho = params['rho']
+        # Equipos sin partidos: ataque promedio (1) y defensa promedio
+        self.default = (1.0, params.get('base_defence', 1.0))
+        self.teams = {int(team_id): tuple(values) for team_id, values in params['teams'].items()}
+
+    def expected_goals(self, pairs):
+        """Goles esperados (local, visitante) para una lista de (local_id, visit_id)."""
+        strengths = np.array(
+            [self.teams.get(int(team_id), self.default) for pair in pairs for team_id in pair],
+            dtype=np.float64
+        ).reshape(-1, 2, 2)
+        mu_local = strengths[:, 0, 0] * strengths[:, 1, 1] * self.home
+        mu_visit = strengths[:, 1, 0] * strengths[:, 0, 1]
+        return mu_local, mu_visit
+
+    def predict_matrices(self, pairs):
+        mu_local, mu_visit = self.expected_goals(pairs)
+        return mu_local, mu_visit, scoreline_matrices(mu_local, mu_visit, self.rho)
+
+    def predict_batch(self, pairs, top=5, matrix=False):
+        """
+        Predicciones con el formato de MatchPredictor más los goles esperados,
+        los `top` marcadores más probables y, opcionalmente, la matriz completa (en %).
+        """
+        pairs = [(int(local_id), int(visit_id)) for local_id, visit_id in pairs]
+        if not pairs:
+            return []
+        mu_local, mu_visit, matrices = self.predict_matrices(pairs)
+        local_win = matrices[:, _LOCAL_WINS].sum(axis=1)
+        draw = matrices[:, _DRAWS].sum(axis=1)
+        flat = matrices.reshape(len(pairs), -1)
+        best = np.argsort(-flat, axis=1)[:, :top]
+        size = MAX_GOALS + 1
+
+        predictions = []
+        for i in range(len(pairs)):
+            prediction = {
+                'local_win_prob': round(float(local_win[i]) * 100, 1),
+                'draw_prob': round(float(draw[i]) * 100, 1),
+                'visit_win_prob': round(float(1.0 - local_win[i] - draw[i]) * 100, 1),
+                'goles_esperados': {'local': round(float(mu_local[i]), 2), 'visitante': round(float(mu_visit[i]), 2)},
+                'marcadores': [
+                    {'marcador': f"{k // size}-{k % size}", 'prob': round(float(flat[i, k]) * 100, 2)}
+                    for k in best[i].tolist()
+                ],
+            }
+            if matrix:
+                prediction['matriz'] = np.round(matrices[i] * 100, 3).tolist()
+            predictions.append(prediction)
+        return predictions
+
+
+def params_path():
+    return os.path.join(get_registry().base_dir, PARAMS_FILE)
+
+
+def train(xi=DEFAULT_XI, reference=None):
+    """Ajusta el modelo con todo el historial y publica los parámetros (JSON, rename atómico)."""
+    start = time.perf_counter()
+    rows = list(played_matches_queryset().values_list(
+        'IDEquipo_Local_id', 'IDEquipo_Visitante_id',
+        'IDResultado__Goles_Local', 'IDResultado__Goles_Visitante', 'IDFixture__Fecha'
+    ))
+    if not rows:
+        return {'status': 'error', 'message': 'No hay partidos jugados para ajustar el modelo de goles'}
+    local, visit, g_local, g_visit, dates = zip(*rows)
+    weights = time_weights(dates, reference=reference, xi=xi) if xi else None
+    params = fit(local, visit, g_local, g_visit, weights=weights)
+    params.update(
+        xi=xi,
+        reference_date=str(reference or max(dates)),
+        fit_seconds=round(time.perf_counter() - start, 4),
+        trained_at=timezone.now().isoformat(),
+    )
+
+    path = params_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(params, f)
+    os.replace(tmp_path, path)
+    return {
+        'status': 'success',
+        'samples': params['samples'],
+        'iterations': params['iterations'],
+        'home': params['home'],
+        'rho': params['rho'],
+        'fit_seconds': params['fit_seconds'],
+    }
+
+
+_model = None
+_signature = None
+_lock = threading.Lock()
+
+
+def get_poisson_model():
+    """
+    Modelo de goles publicado, en memoria por proceso; se vuelve a leer sólo cuando
+    cambia el archivo (os.replace crea un inodo nuevo). None si aún no se ajustó.
+    """
+    global _model, _signature
+    path = params_path()
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return _model
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if signature != _signature:
+        with _lock:
+            if signature != _signature:
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        _model = PoissonModel(json.load(f))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Error loading poisson model: {e}")
+                _signature = signature
+    return _model
@@ -0,0 +1,152 @@
+"""
+Motor de ratings Elo por equipo.
+
+Es un predictor barato que complementa al RandomForest: cada resultado nuevo
+actualiza dos filas de TeamRating en O(1), el historial completo se puede
+re-procesar en una sola pasada ordenada y las probabilidades local/empate/visita
+salen directamente de la diferencia de ratings, sin modelo entrenado.
+"""
+import numpy as np
+from django.db import transaction
+
+from deporte_bd.models import Equipo
+from .dataset import played_matches_queryset
+from .models import TeamRating
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+# Puntos de rating que vale jugar de local
+HOME_ADVANTAGE = 60.0
+# Probabilidad de empate entre equipos parejos (decrece a medida que se separan los ratings)
+DRAW_PROBABILITY = 0.28
+
+# Columnas opcionales para el RandomForest (ver MatchPredictor.train)
+RATING_COLUMNS = ['local_rating', 'visit_rating']
+
+
+def expected_score(local_rating, visit_rating):
+    """Puntaje esperado del local (1 gana, 0.5 empata) según la fórmula Elo."""
+    diff = np.asarray(local_rating, dtype=float) + HOME_ADVANTAGE - np.asarray(visit_rating, dtype=float)
+    return 1.0 / (1.0 + 10.0 ** (-diff / 400.0))
+
+
+def outcome_probabilities(local_rating, visit_rating):
+    """
+    Probabilidades (local, empate, visita). La probabilidad de empate es máxima cuando
+    el puntaje esperado es 0.5 y se reparte de modo que local + empate / 2 = esperado.
+    Acepta escalares o arrays.
+    """
+    expected = expected_score(local_rating, visit_rating)
+    draw = DRAW_PROBABILITY * (1.0 - np.abs(2.0 * expected - 1.0))
+    return expected - draw / 2.0, draw, 1.0 - expected - draw / 2.0
+
+
+def _goal_multiplier(goal_diff):
+    """Multiplicador por diferencia de gol (como el World Football Elo)."""
+    goal_diff = abs(goal_diff)
+    if goal_diff <= 1:
+        return 1.0
+    if goal_diff == 2:
+        return 1.5
+    return (11.0 + goal_diff) / 8.0
+
+
+def rating_delta(local_rating, visit_rating, goles_local, goles_visitante):
+    """Puntos que gana el local (y pierde la visita) con un resultado."""
+    if goles_local > goles_visitante:
+        score = 1.0
+    elif goles_local == goles_visitante:
+        score = 0.5
+    else:
+        score = 0.0
+    expected = float(expected_score(local_rating, visit_rating))
+    return K_FACTOR * _goal_multiplier(goles_local - goles_visitante) * (score - expected)
+
+
+def replay(rows, initial=None):
+    """
+    Recorre partidos (local, visita, goles local, goles visita) en orden cronológico.
+    Devuelve (pre, ratings, played): `pre` es un array (n, 2) con los ratings de ambos
+    equipos antes de cada partido, y `ratings`/`played` el estado final por equipo.
+    `initial` ({team_id: rating}) permite continuar desde un estado previo.
+    """
+    ratings = {int(team_id): float(value) for team_id, value in (initial or {}).items()}
+    played = {}
+    pre = []
+    for local_id, visit_id, goles_local, goles_visitante in rows:
+        local_rating = ratings.get(local_id, INITIAL_RATING)
+        visit_rating = ratings.get(visit_id, INITIAL_RATING)
+        pre.append((local_rating, visit_rating))
+        delta = rating_delta(local_rating, visit_rating, goles_local, goles_visitante)
+        ratings[local_id] = local_rating + delta
+        ratings[visit_id] = visit_rating - delta
+        played[local_id] = played.get(local_id, 0) + 1
+        played[visit_id] = played.get(visit_id, 0) + 1
+    return np.array(pre, dtype=np.float64).reshape(-1, 2), ratings, played
+
+
+def apply_result(local_id, visit_id, goles_local, goles_visitante):
+    """
+    Actualización O(1) al registrarse un resultado nuevo: bloquea y actualiza las dos
+    filas involucradas. Los resultados se aplican en el orden en que se cargan;
+    rebuild_ratings re-procesa en orden cronológico.
+    """
+    with transaction.atomic():
+        for team_id in sorted({local_id, visit_id}):
+            TeamRating.objects.get_or_create(IDEquipo_id=team_id)
+        rows = TeamRating.objects.select_for_update().in_bulk([local_id, visit_id])
+        local, visit = rows[local_id], rows[visit_id]
+        delta = rating_delta(local.Rating, visit.Rating, goles_local, goles_visitante)
+        local.Rating += delta
+        visit.Rating -= delta
+        local.PJ += 1
+        visit.PJ += 1
+        local.save(update_fields=['Rating', 'PJ', 'Actualizado'])
+        visit.save(update_fields=['Rating', 'PJ', 'Actualizado'])
+    return delta
+
+
+def rebuild_ratings(chunk_size=5000):
+    """Re-procesa todo el historial en orden cronológico y reemplaza la tabla de ratings."""
+    rows = played_matches_queryset().values_list(
+        'IDEquipo_Local_id', 'IDEquipo_Visitante_id',
+        'IDResultado__Goles_Local', 'IDResultado__Goles_Visitante'
+    ).iterator(chunk_size=chunk_size)
+    _, ratings, played = replay(rows)
+    existing = set(Equipo.objects.filter(id__in=list(ratings)).values_list('id', flat=True))
+    objs = [
+        TeamRating(IDEquipo_id=team_id, Rating=rating, PJ=played[team_id])
+        for team_id, rating in ratings.items() if team_id in existing
+    ]
+    with transaction.atomic():
+        TeamRating.objects.all().delete()
+        TeamRating.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+def get_ratings(team_ids):
+    """Devuelve {team_id: rating}; los equipos sin partidos procesados tienen el rating inicial."""
+    team_ids = {int(t) for t in team_ids}
+    ratings = dict(TeamRating.objects.filter(IDEquipo_id__in=team_ids).values_list('IDEquipo_id', 'Rating'))
+    return {team_id: ratings.get(team_id, INITIAL_RATING) for team_id in team_ids}
+
+
+def predict_pairs(pairs):
+    """Predicciones Elo para una lista de (local_id, visit_id), con el formato de MatchPredictor."""
+    pairs = [(int(local_id), int(visit_id)) for local_id, visit_id in pairs]
+    if not pairs:
+        return []
+    ratings = get_ratings([team for pair in pairs for team in pair])
+    local = np.array([ratings[local_id] for local_id, _ in pairs])
+    visit = np.array([ratings[visit_id] for _, visit_id in pairs])
+    probs = np.column_stack(outcome_probabilities(local, visit))
+    return [
+        {
+            'local_win_prob': round(float(p[0]) * 100, 1),
+            'draw_prob': round(float(p[1]) * 100, 1),
+            'visit_win_prob': round(float(p[2]) * 100, 1),
+            'local_rating': round(float(l), 1),
+            'visit_rating': round(float(v), 1),
+        }
+        for p, l, v in zip(probs, local, visit)
+    ]
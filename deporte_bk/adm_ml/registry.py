@@ -0,0 +1,322 @@
+import gc
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import joblib
+from django.conf import settings
+from django.utils import timezone
+
+ACTIVE_FILE = 'ACTIVE'
+VERSIONS_DIR = 'versions'
+MODEL_FILE = 'model.pkl'
+META_FILE = 'meta.json'
+# Archivo único usado antes de versionar los modelos; se sigue leyendo si no hay versión activa
+LEGACY_MODEL_FILE = 'match_predictor.pkl'
+# Versiones que se conservan en disco (la activa nunca se elimina)
+KEEP_VERSIONS = 10
+
+
+def load_artifact(path):
+    """
+    Carga un modelo guardado sin compresión con mmap_mode='r': los arrays de NumPy del
+    modelo (coeficientes, predictores de HistGradientBoosting) quedan respaldados por el
+    page cache y se comparten entre procesos. Los árboles de sklearn copian sus nodos al
+    deserializarse, por eso además se precarga el modelo antes del fork (ver warm_up).
+    """
+    return joblib.load(path, mmap_mode='r')
+
+
+def process_memory():
+    """
+    Memoria del proceso actual en MB según /proc (Linux): rss total, y la parte privada
+    y compartida. Devuelve {} si /proc no está disponible.
+    """
+    values = {}
+    try:
+        with open('/proc/self/smaps_rollup', encoding='ascii') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'):
+                    values[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        return {}
+    return {
+        'rss_mb': round(values.get('Rss', 0), 1),
+        'pss_mb': round(values.get('Pss', 0), 1),
+        'private_mb': round(values.get('Private_Clean', 0) + values.get('Private_Dirty', 0), 1),
+        'shared_mb': round(values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0), 1),
+    }
+
+
+class ModelRegistry:
+    """
+    Registro versionado de modelos, con un único modelo cargado por proceso (worker).
+
+        models_ml/
+            ACTIVE                      nombre de la versión activa
+            versions/<version>/model.pkl
+            versions/<version>/meta.json
+
+    Cada versión se escribe en un directorio temporal y se publica con un rename atómico;
+    activar una versión reemplaza el puntero ACTIVE con os.replace. Así ningún worker lee
+    un .pkl a medio escribir. Las predicciones trabajan sobre el modelo en memoria y el
+    archivo sólo se vuelve a leer cuando cambia el puntero (o el .pkl heredado).
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.versions_dir = os.path.join(base_dir, VERSIONS_DIR)
+        self.pointer_path = os.path.join(base_dir, ACTIVE_FILE)
+        self.legacy_path = os.path.join(base_dir, LEGACY_MODEL_FILE)
+        self._lock = threading.Lock()
+        self._model = None
+        self._version = None
+        self._meta = None
+        self._signature = None
+        self._loaded_at = None
+        self._load_seconds = None
+        self._loads = 0
+        self._errors = 0
+        self._last_error = None
+
+    # --- Versiones en disco ---
+
+    def model_file(self, version):
+        return os.path.join(self.versions_dir, version, MODEL_FILE)
+
+    def read_active_version(self):
+        try:
+            with open(self.pointer_path, encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def read_meta(self, version):
+        """Metadatos de una versión (None si no existe o el archivo es ilegible)."""
+        if not version:
+            return None
+        try:
+            with open(os.path.join(self.versions_dir, version, META_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def active_meta(self):
+        """Metadatos de la versión activa según el puntero en disco."""
+        return self.read_meta(self.read_active_version())
+
+    def version_names(self):
+        try:
+            names = os.listdir(self.versions_dir)
+        except OSError:
+            return []
+        return sorted(
+            name for name in names
+            if not name.startswith('.') and os.path.isfile(self.model_file(name))
+        )
+
+    def versions(self):
+        """Versiones disponibles (más reciente primero) con sus metadatos resumidos."""
+        active = self.read_active_version()
+        result = []
+        for version in reversed(self.version_names()):
+            meta = self.read_meta(version) or {}
+            meta.pop('team_state', None)
+            meta.update(version=version, active=version == active)
+            result.append(meta)
+        return result
+
+    def register(self, model, meta, activate=True):
+        """
+        Guarda un modelo como nueva versión y, por defecto, la activa.
+        Devuelve el nombre de la versión.
+        """
+        version = timezone.now().strftime('%Y%m%d%H%M%S%f')
+        os.makedirs(self.versions_dir, exist_ok=True)
+        tmp_dir = os.path.join(self.versions_dir, f'.tmp-{version}-{uuid.uuid4().hex[:8]}')
+        os.makedirs(tmp_dir)
+        try:
+            # Sin compresión para poder abrirlo con mmap_mode (ver load_artifact)
+            joblib.dump(model, os.path.join(tmp_dir, MODEL_FILE), compress=0)
+            meta = dict(
+                meta,
+                version=version,
+                created_at=timezone.now().isoformat(),
+                file_size_bytes=os.path.getsize(os.path.join(tmp_dir, MODEL_FILE)),
+            )
+            with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, default=str)
+            os.rename(tmp_dir, os.path.join(self.versions_dir, version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version, model=model, meta=meta)
+        self.prune()
+        return version
+
+    def activate(self, version, model=None, meta=None):
+        """
+        Activa una versión existente reemplazando el puntero de forma atómica.
+        Los demás workers la cargan en su siguiente request. Si se pasa `model`
+        (recién entrenado en este proceso) se publica sin volver a leer el archivo.
+        """
+        if version not in self.version_names():
+            raise ValueError(f"La versión {version} no existe")
+
+        tmp_path = f'{self.pointer_path}.{uuid.uuid4().hex[:8]}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(tmp_path, self.pointer_path)
+
+        if model is not None:
+            with self._lock:
+                self._model = model
+                self._version = version
+                self._meta = meta
+                self._signature = self._disk_signature()
+                self._loaded_at = time.time()
+                self._load_seconds = 0.0
+        return version
+
+    def rollback(self):
+        """Activa la versión anterior a la activa. Devuelve la versión activada."""
+        names = self.version_names()
+        active = self.read_active_version()
+        previous = [name for name in names if active is None or name < active]
+        if not previous:
+            raise ValueError("No hay una versión anterior a la activa")
+        return self.activate(previous[-1])
+
+    def prune(self, keep=KEEP_VERSIONS):
+        """Elimina las versiones más antiguas, conservando `keep` y siempre la activa."""
+        active = self.read_active_version()
+        names = self.version_names()
+        removed = []
+        for version in names[:max(len(names) - keep, 0)]:
+            if version != active:
+                shutil.rmtree(os.path.join(self.versions_dir, version), ignore_errors=True)
+                removed.append(version)
+        return removed
+
+    # --- Modelo en memoria ---
+
+    def _disk_signature(self):
+        """
+        Firma del puntero ACTIVE (o del .pkl heredado si no hay versiones).
+        os.replace crea un inodo nuevo, así que cada activación cambia la firma.
+        """
+        for path in (self.pointer_path, self.legacy_path):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            return (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        return None
+
+    @property
+    def model_path(self):
+        """Archivo del modelo que corresponde cargar según el estado actual en disco."""
+        version = self.read_active_version()
+        return self.model_file(version) if version else self.legacy_path
+
+    def get_model(self):
+        """
+        Devuelve el modelo en memoria, recargándolo si cambió la versión activa.
+        Si no hay archivo se conserva el último modelo cargado (o None).
+        """
+        signature = self._disk_signature()
+        if signature is None or signature == self._signature:
+            return self._model
+
+        with self._lock:
+            # Otro hilo pudo haber recargado mientras esperábamos el lock
+            if signature != self._signature:
+                self._load(signature)
+            return self._model
+
+    def _load(self, signature):
+        version = self.read_active_version() if signature[0] == self.pointer_path else None
+        if version is not None and version == self._version and self._model is not None:
+            # Se reescribió el puntero con la misma versión: no hace falta recargar
+            self._signature = signature
+            return
+
+        path = self.model_file(version) if version else self.legacy_path
+        start = time.perf_counter()
+        try:
+            model = load_artifact(path)
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            self._errors += 1
+            self._last_error = str(e)
+            # Se marca la firma para no reintentar en cada request un archivo corrupto
+            self._signature = signature
+            return
+
+        self._model = model
+        self._version = version
+        self._meta = self.read_meta(version)
+        self._signature = signature
+        self._load_seconds = time.perf_counter() - start
+        self._loaded_at = time.time()
+        self._loads += 1
+        self._last_error = None
+
+    def warm_up(self):
+        """
+        Carga el modelo activo en el proceso maestro de gunicorn (--preload) y congela los
+        objetos existentes para el recolector de basura (gc.freeze). Así los workers creados
+        por fork comparten las páginas del modelo (copy-on-write) en lugar de cargar una
+        copia cada uno. Un worker que luego recarga una versión nueva vuelve a tener la suya
+        hasta el siguiente reinicio.
+        """
+        model = self.get_model()
+        gc.freeze()
+        return model
+
+    def metrics(self):
+        """Métricas de carga y antigüedad del modelo activo en este proceso."""
+        now = time.time()
+        signature = self._disk_signature()
+        model_path = self.model_path
+        try:
+            stat = os.stat(model_path)
+        except OSError:
+            stat = None
+        return {
+            'model_path': str(model_path),
+            'version': self._version,
+            'active_version': self.read_active_version(),
+            'loaded': self._model is not None,
+            'pid': os.getpid(),
+            'loads': self._loads,
+            'load_errors': self._errors,
+            'last_error': self._last_error,
+            'load_time_ms': round(self._load_seconds * 1000, 2) if self._load_seconds is not None else None,
+            'loaded_at': self._loaded_at,
+            'in_memory_age_s': round(now - self._loaded_at, 1) if self._loaded_at else None,
+            'model_age_s': round(now - stat.st_mtime, 1) if stat else None,
+            'file_size_bytes': stat.st_size if stat else None,
+            'stale': signature is not None and signature != self._signature,
+            'memory': process_memory(),
+        }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Registro compartido por todo el proceso."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry(os.path.join(settings.BASE_DIR, 'adm_ml', 'models_ml'))
+    return _registry
@@ -0,0 +1,123 @@
+"""
+Búsqueda de hiperparámetros para MatchPredictor.
+
+Cada candidato se evalúa con validación cruzada respetando el orden temporal
+(TimeSeriesSplit: siempre se entrena con el pasado y se evalúa con el futuro) y se
+mide, además de la calidad (accuracy, log-loss), lo que cuesta servirlo: tiempo de
+entrenamiento, latencia de una predicción y tamaño serializado. Los candidatos se
+reparten en un pool de procesos; este módulo no usa el ORM para que los procesos
+hijos no necesiten Django.
+"""
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import TimeSeriesSplit
+
+CLASSES = [0, 1, 2]
+
+ESTIMATORS = {
+    cls.__name__: cls
+    for cls in (RandomForestClassifier, ExtraTreesClassifier, HistGradientBoostingClassifier, LogisticRegression)
+}
+
+DEFAULT_GRID = (
+    [('RandomForestClassifier', {'n_estimators': n, 'max_depth': depth, 'min_samples_leaf': leaf, 'random_state': 42})
+     for n, depth, leaf in product((50, 100, 200), (None, 8), (1, 5))]
+    + [('ExtraTreesClassifier', {'n_estimators': n, 'max_depth': depth, 'min_samples_leaf': 5, 'random_state': 42})
+       for n, depth in product((100, 200), (None, 8))]
+    + [('HistGradientBoostingClassifier', {'learning_rate': rate, 'max_iter': 100, 'max_depth': 3, 'random_state': 42})
+       for rate in (0.05, 0.1)]
+    + [('LogisticRegression', {'C': c, 'max_iter': 1000}) for c in (0.1, 1.0)]
+)
+
+
+def build_estimator(name, params):
+    """Instancia un estimador del catálogo a partir de su nombre y parámetros."""
+    if name not in ESTIMATORS:
+        raise ValueError(f"Estimador no soportado: {name}")
+    return ESTIMATORS[name](**params)
+
+
+def _full_proba(model, X):
+    """predict_proba con una columna por cada clase, aunque el fold no las haya visto todas."""
+    proba = np.zeros((len(X), len(CLASSES)))
+    proba[:, [CLASSES.index(c) for c in model.classes_]] = model.predict_proba(X)
+    return proba
+
+
+def _predict_latency_ms(model, row, repeats=30):
+    """Mediana de la latencia de predict_proba para un solo partido (caso de un request)."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1000)
+
+
+def evaluate_candidate(task):
+    """Evalúa un candidato (nombre, params, X, y, n_splits). Se ejecuta en un proceso del pool."""
+    name, params, X, y, n_splits = task
+    accuracies, losses, fit_times = [], [], []
+    model = None
+    for train_idx, test_idx in TimeSeriesSplit(n_splits=n_splits).split(X):
+        model = build_estimator(name, params)
+        start = time.perf_counter()
+        model.fit(X[train_idx], y[train_idx])
+        fit_times.append(time.perf_counter() - start)
+
+        proba = _full_proba(model, X[test_idx])
+        accuracies.append(accuracy_score(y[test_idx], np.asarray(CLASSES)[proba.argmax(axis=1)]))
+        losses.append(log_loss(y[test_idx], np.clip(proba, 1e-15, 1), labels=CLASSES))
+
+    return {
+        'estimator': name,
+        'params': params,
+        'accuracy': float(np.mean(accuracies)),
+        'log_loss': float(np.mean(losses)),
+        'fit_seconds': float(np.mean(fit_times)),
+        'predict_ms': _predict_latency_ms(model, X[-1:]),
+        'size_bytes': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+
+def run_search(X, y, grid=None, n_splits=5, n_jobs=1):
+    """
+    Evalúa todos los candidatos de `grid` (por defecto DEFAULT_GRID) y devuelve los
+    resultados ordenados por log-loss. Con n_jobs > 1 los candidatos se reparten en procesos.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    tasks = [(name, params, X, y, n_splits) for name, params in (grid or DEFAULT_GRID)]
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(evaluate_candidate, tasks))
+    else:
+        results = [evaluate_candidate(task) for task in tasks]
+    return sorted(results, key=lambda r: r['log_loss'])
+
+
+def select_best(results, max_predict_ms=None, max_size_mb=None, tolerance=0.005):
+    """
+    Elige el mejor compromiso: entre los candidatos que cumplen los límites de latencia y
+    tamaño, y cuyo log-loss está a menos de `tolerance` del mejor, el de menor latencia.
+    Si ninguno cumple los límites se devuelve el más rápido.
+    """
+    if not results:
+        return None
+    eligible = [
+        r for r in results
+        if (max_predict_ms is None or r['predict_ms'] <= max_predict_ms)
+        and (max_size_mb is None or r['size_bytes'] <= max_size_mb * 1e6)
+    ]
+    if not eligible:
+        return min(results, key=lambda r: r['predict_ms'])
+    best_loss = min(r['log_loss'] for r in eligible)
+    close = [r for r in eligible if r['log_loss'] <= best_loss + tolerance]
+    return min(close, key=lambda r: (r['predict_ms'], r['log_loss']))
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+from .models import TrainingJob
+
+
+class TrainingJobSerializer(serializers.ModelSerializer):
+    """Serializer for TrainingJob (estado de entrenamientos ML)"""
+    IDTrainingJob = serializers.IntegerField(source='id', read_only=True)
+
+    class Meta:
+        model = TrainingJob
+        fields = [
+            'id', 'IDTrainingJob', 'Estado', 'Modo', 'Progreso', 'Mensaje',
+            'Accuracy', 'Muestras', 'Resultado', 'Worker', 'Solicitado_Por',
+            'Creado', 'Iniciado', 'Finalizado'
+        ]
+        read_only_fields = fields
@@ -1,207 +1,334 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
-import joblib
-import os
-from django.conf import settings
-from django.db.models import Q, Avg, Count, Sum, F, Case, When, IntegerField
-from deporte_bd.models import Partido, Equipo
+import copy
+import time
+from django.utils import timezone
+from django.db.models import Q
+from deporte_bd.models import Partido
+from .changes import CORRECTIONS, version as changes_version
+from .registry import get_registry
+from .search import build_estimator
+from .ratings import RATING_COLUMNS, get_ratings, predict_pairs, replay
+from .features import get_team_features
+from .dataset import (
+    FEATURE_COLUMNS, build_dataset, compute_features, final_team_state, load_match_arrays, played_matches_queryset
+)
+
+MODOS_ENTRENAMIENTO = ('completo', 'incremental')
+# Árboles agregados por cada entrenamiento incremental y tope antes de forzar un re-entrenamiento completo
+INCREMENTAL_TREES = 10
+MAX_TREES = 300
+MIN_INCREMENTAL_SAMPLES = 10
+# Estimadores que admiten agregar árboles con warm_start
+WARM_START_FORESTS = (RandomForestClassifier, ExtraTreesClassifier)
+
+
+def _last_match(data):
+    """[fecha ISO, id] del último partido de `data` (en el orden de played_matches_queryset), o None."""
+    last = Partido.objects.filter(IDResultado_id=int(data[-1, 4])).values_list('IDFixture__Fecha', 'id').first()
+    return [last[0].isoformat(), last[1]] if last and last[0] else None
+
 
 class MatchPredictor:
-    def __init__(self):
-        self.model_path = os.path.join(settings.BASE_DIR, 'adm_ml', 'models_ml', 'match_predictor.pkl')
-        self.model = None
-        self._load_model()
+    def __init__(self, registry=None):
+        # El modelo vive en el registro del proceso; construir un MatchPredictor no lee el .pkl
+        self.registry = registry or get_registry()
 
-    def _load_model(self):
-        if os.path.exists(self.model_path):
-            try:
-                self.model = joblib.load(self.model_path)
-            except Exception as e:
-                print(f"Error loading model: {e}")
-                self.model = None
-
-    def _get_team_stats(self, team_id, date_limit=None):
-        """
-        Calcula estadísticas históricas de un equipo hasta una fecha dada (opcional).
-        Optimizado usando agregación de base de datos.
-        """
-        # Filter matches where the team played
-        query = Q(IDEquipo_Local_id=team_id) | Q(IDEquipo_Visitante_id=team_id)
-        
-        # Base queryset: Matches with results
-        qs = Partido.objects.filter(query, IDResultado__isnull=False).select_related('IDResultado', 'IDFixture')
-        
-        if date_limit:
-            qs = qs.filter(IDFixture__Fecha__lt=date_limit)
-            
-        # Aggregate stats in DB
-        stats = qs.aggregate(
-            total_matches=Count('id'),
-            goals_scored=Sum(
-                Case(
-                    When(IDEquipo_Local_id=team_id, then=F('IDResultado__Goles_Local')),
-                    When(IDEquipo_Visitante_id=team_id, then=F('IDResultado__Goles_Visitante')),
-                    default=0,
-                    output_field=IntegerField()
-                )
-            ),
-            goals_conceded=Sum(
-                Case(
-                    When(IDEquipo_Local_id=team_id, then=F('IDResultado__Goles_Visitante')),
-                    When(IDEquipo_Visitante_id=team_id, then=F('IDResultado__Goles_Local')),
-                    default=0,
-                    output_field=IntegerField()
-                )
-            ),
-            wins=Sum(
-                Case(
-                    When(IDEquipo_Local_id=team_id, IDResultado__Goles_Local__gt=F('IDResultado__Goles_Visitante'), then=1),
-                    When(IDEquipo_Visitante_id=team_id, IDResultado__Goles_Visitante__gt=F('IDResultado__Goles_Local'), then=1),
-                    default=0,
-                    output_field=IntegerField()
-                )
-            )
-        )
-        
-        total = stats['total_matches'] or 0
-        if total == 0:
-            return {
-                'avg_goals_scored': 0,
-                'avg_goals_conceded': 0,
-                'win_rate': 0
-            }
-            
-        return {
-            'avg_goals_scored': (stats['goals_scored'] or 0) / total,
-            'avg_goals_conceded': (stats['goals_conceded'] or 0) / total,
-            'win_rate': (stats['wins'] or 0) / total
-        }
+    @property
+    def model(self):
+        return self.registry.get_model()
 
     def prepare_dataset(self):
         """
         Construye el dataset de entrenamiento basado en todos los partidos jugados.
-        Optimizado para O(N) en lugar de O(N^2).
-        """
-        # Fetch all matches with results, ordered by date
-        partidos = Partido.objects.select_related('IDResultado', 'IDFixture').filter(
-            IDResultado__isnull=False,
-            IDFixture__Fecha__isnull=False
-        ).order_by('IDFixture__Fecha')
-
-        team_stats = {} # {team_id: {gs, gc, w, gp}}
-        data = []
-
-        for p in partidos:
-            local_id = p.IDEquipo_Local_id
-            visit_id = p.IDEquipo_Visitante_id
-            
-            # Initialize if not exists
-            if local_id not in team_stats: team_stats[local_id] = {'gs': 0, 'gc': 0, 'w': 0, 'gp': 0}
-            if visit_id not in team_stats: team_stats[visit_id] = {'gs': 0, 'gc': 0, 'w': 0, 'gp': 0}
-            
-            # Get current stats (features) BEFORE this match
-            l_stats = team_stats[local_id]
-            v_stats = team_stats[visit_id]
-            
-            l_gp = l_stats['gp'] if l_stats['gp'] > 0 else 1
-            v_gp = v_stats['gp'] if v_stats['gp'] > 0 else 1
-            
-            row = {
-                'local_avg_goals_scored': l_stats['gs'] / l_gp,
-                'local_avg_goals_conceded': l_stats['gc'] / l_gp,
-                'local_win_rate': l_stats['w'] / l_gp,
-                'visit_avg_goals_scored': v_stats['gs'] / v_gp,
-                'visit_avg_goals_conceded': v_stats['gc'] / v_gp,
-                'visit_win_rate': v_stats['w'] / v_gp,
-                'target': 0 # Placeholder
-            }
-            
-            # Determine target and update stats
-            g_local = p.IDResultado.Goles_Local
-            g_visit = p.IDResultado.Goles_Visitante
-            
-            if g_local > g_visit:
-                row['target'] = 0
-                team_stats[local_id]['w'] += 1
-            elif g_local == g_visit:
-                row['target'] = 1
-            else:
-                row['target'] = 2
-                team_stats[visit_id]['w'] += 1
-                
-            # Update goals and games played
-            team_stats[local_id]['gs'] += g_local
-            team_stats[local_id]['gc'] += g_visit
-            team_stats[local_id]['gp'] += 1
-            
-            team_stats[visit_id]['gs'] += g_visit
-            team_stats[visit_id]['gc'] += g_local
-            team_stats[visit_id]['gp'] += 1
-            
-            data.append(row)
-
-        return pd.DataFrame(data)
-
-    def train(self):
+        Lee tuplas en streaming y calcula las features de forma vectorizada (ver adm_ml/dataset.py).
+        """
+        return build_dataset()
+
+    def load_metadata(self):
+        """Metadatos de la versión activa (último partido, estado acumulado por equipo), o None."""
+        meta = self.registry.active_meta()
+        if meta is None or not meta.get('last_match'):
+            return None
+        meta['team_state'] = {int(team_id): values for team_id, values in meta.get('team_state', {}).items()}
+        return meta
+
+    def _save(self, model, meta):
+        """Registra el modelo como nueva versión activa junto a sus metadatos."""
+        meta = dict(
+            meta,
+            features=meta.get('features', FEATURE_COLUMNS),
+            estimator=type(model).__name__,
+            params=model.get_params(),
+            team_state={str(team_id): values for team_id, values in meta['team_state'].items()},
+        )
+        return self.registry.register(model, meta)
+
+    def train(self, progress=None, mode='completo', estimator=None, extra_meta=None, with_ratings=None):
         """
         Entrena el modelo y lo guarda.
+        `mode` es 'completo' (re-entrena con todo el historial) o 'incremental'
+        (sólo procesa los partidos con resultado posterior al último entrenamiento).
+        `estimator` (sólo modo completo) reemplaza la configuración del modelo activo,
+        p. ej. la elegida por `train_ml --search`; `extra_meta` se guarda con la versión.
+        `with_ratings` agrega los ratings Elo previos al partido como features; por defecto
+        se conserva lo que usaba la versión activa.
+        `progress(porcentaje, mensaje)` es opcional y permite reportar el avance (ver adm_ml/jobs.py).
+        """
+        progress = progress or (lambda porcentaje, mensaje: None)
+        if mode == 'incremental':
+            return self._train_incremental(progress)
+        return self._train_full(progress, estimator=estimator, extra_meta=extra_meta, with_ratings=with_ratings)
+
+    def _features(self, data, team_state=None, rating_state=None, with_ratings=False):
+        """
+        Matriz de features (DataFrame) y target para los partidos de `data`, partiendo del
+        estado acumulado indicado. Devuelve (X, y, rating_state final o None).
+        """
+        features, target = compute_features(
+            data[:, 0], data[:, 1], data[:, 2], data[:, 3], initial_state=team_state
+        )
+        columns = FEATURE_COLUMNS
+        ratings = None
+        if with_ratings:
+            pre, ratings, _ = replay(data[:, :4].tolist(), initial=rating_state)
+            features = np.column_stack([features, pre])
+            columns = FEATURE_COLUMNS + RATING_COLUMNS
+        return pd.DataFrame(features, columns=columns), target, ratings
+
+    def _base_estimator(self):
+        """
+        Estimador sin entrenar para un re-entrenamiento completo: conserva el tipo y los
+        parámetros de la versión activa (los de su último entrenamiento completo).
         """
+        meta = self.registry.active_meta() or {}
+        if meta.get('estimator') and meta.get('base_params'):
+            try:
+                return build_estimator(meta['estimator'], meta['base_params'])
+            except (TypeError, ValueError) as e:
+                print(f"No se pudo reconstruir el estimador activo: {e}")
+        return RandomForestClassifier(n_estimators=100, random_state=42)
+
+    def _train_full(self, progress, motivo=None, estimator=None, extra_meta=None, with_ratings=None):
         print("Iniciando entrenamiento del modelo ML...")
-        df = self.prepare_dataset()
-        
-        if df.empty or len(df) < 10: # Mínimo de datos requeridos
+        progress(5, 'Construyendo dataset')
+        # El contador se lee antes que los datos: una corrección confirmada durante la
+        # lectura hace que el próximo incremental re-entrene completo
+        corrections = changes_version(CORRECTIONS)
+        data = load_match_arrays()
+
+        if len(data) < 10: # Mínimo de datos requeridos
             print("Insuficientes datos para entrenar.")
             return {"status": "error", "message": "Insuficientes datos para entrenar (mínimo 10 partidos jugados)."}
 
-        X = df.drop('target', axis=1)
-        y = df['target']
+        if with_ratings is None:
+            with_ratings = RATING_COLUMNS[0] in ((self.registry.active_meta() or {}).get('features') or [])
+        X, target, rating_state = self._features(data, with_ratings=with_ratings)
+        y = pd.Series(target, name='target')
 
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.model.fit(X_train, y_train)
+        progress(30, f'Entrenando con {len(X_train)} partidos')
+        model = estimator if estimator is not None else self._base_estimator()
+        base_params = model.get_params()
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        training_seconds = time.perf_counter() - start
 
         # Evaluar
-        predictions = self.model.predict(X_test)
+        progress(80, 'Evaluando')
+        predictions = model.predict(X_test)
         accuracy = accuracy_score(y_test, predictions)
 
         # Guardar
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        joblib.dump(self.model, self.model_path)
+        progress(90, 'Guardando modelo')
+        version = self._save(model, {
+            **(extra_meta or {}),
+            'mode': 'completo',
+            'features': list(X.columns),
+            'base_params': base_params,
+            'training_seconds': round(training_seconds, 3),
+            'trained_at': timezone.now().isoformat(),
+            'last_match': _last_match(data),
+            'corrections': corrections,
+            'samples': len(data),
+            'n_estimators': getattr(model, 'n_estimators', None),
+            'accuracy': accuracy,
+            'team_state': final_team_state(data[:, 0], data[:, 1], data[:, 2], data[:, 3]),
+            'rating_state': rating_state,
+        })
         print(f"Modelo entrenado y guardado. Accuracy: {accuracy}")
 
-        return {"status": "success", "accuracy": accuracy, "samples": len(df)}
+        message = 'Modelo re-entrenado completo' + (f' ({motivo})' if motivo else '')
+        return {
+            "status": "success", "mode": "completo", "version": version,
+            "accuracy": accuracy, "samples": len(data), "message": message,
+        }
 
-    def predict(self, local_team_id, visit_team_id):
+    def _train_incremental(self, progress):
         """
-        Predice el resultado entre dos equipos.
+        Agrega árboles al bosque existente (warm_start) entrenados sólo con los partidos nuevos.
+        Los partidos nuevos son los posteriores (en el orden cronológico del dataset) al último
+        que procesó la versión activa, y sus features parten del estado acumulado por equipo
+        guardado en los metadatos, por lo que son las mismas que produciría un recorrido completo.
+        Re-entrena completo si no hay modelo o metadatos, si desde la versión activa se corrigió
+        un resultado ya procesado (contador CORRECTIONS) o si hay resultados nuevos en partidos
+        anteriores a su último partido; también si hay suficientes partidos nuevos pero el
+        estimador no es un bosque o llegó al máximo de árboles (misma configuración).
+        """
+        meta = self.load_metadata()
+        model = self.model
+        if meta is None or model is None:
+            return self._train_full(progress, motivo='sin modelo previo')
+
+        progress(5, 'Buscando partidos nuevos')
+        corrections = changes_version(CORRECTIONS)
+        if meta.get('corrections') != corrections:
+            return self._train_full(progress, motivo='se corrigieron resultados ya procesados')
+        fecha, partido_id = meta['last_match']
+        processed = Q(IDFixture__Fecha__lt=fecha) | Q(IDFixture__Fecha=fecha, id__lte=partido_id)
+        if played_matches_queryset().filter(processed).count() != meta.get('samples'):
+            return self._train_full(progress, motivo='hay resultados nuevos en partidos anteriores al último procesado')
+        data = load_match_arrays(played_matches_queryset().exclude(processed))
+        skipped = {
+            "status": "success", "mode": "incremental", "skipped": True, "new_samples": len(data),
+            "accuracy": meta.get('accuracy'), "samples": meta.get('samples'),
+        }
+        if len(data) < MIN_INCREMENTAL_SAMPLES:
+            return dict(skipped, message=f"Sin cambios: {len(data)} partidos nuevos (mínimo {MIN_INCREMENTAL_SAMPLES})")
+        if not isinstance(model, WARM_START_FORESTS):
+            return self._train_full(progress, motivo=f'{type(model).__name__} no admite agregar árboles')
+        if model.n_estimators + INCREMENTAL_TREES > MAX_TREES:
+            return self._train_full(progress, motivo=f'el bosque alcanzó {MAX_TREES} árboles')
+
+        with_ratings = RATING_COLUMNS[0] in (meta.get('features') or [])
+        if with_ratings and not meta.get('rating_state'):
+            return self._train_full(progress, motivo='la versión activa no guardó el estado de los ratings')
+        X, target, rating_state = self._features(
+            data, team_state=meta['team_state'], rating_state=meta.get('rating_state'), with_ratings=with_ratings
+        )
+        # Con warm_start sklearn recalcula classes_ con el lote nuevo: debe contener las tres clases
+        if len(np.unique(target)) < len(model.classes_):
+            return dict(skipped, message="Sin cambios: los partidos nuevos no incluyen los tres resultados posibles")
+
+        # Evaluación prequential: el modelo actual predice los partidos antes de aprender de ellos
+        progress(20, f'Evaluando con {len(X)} partidos nuevos')
+        accuracy = accuracy_score(target, model.predict(X))
+
+        # Se copia para no modificar el modelo que está sirviendo predicciones en este proceso
+        progress(40, f'Agregando {INCREMENTAL_TREES} árboles')
+        model = copy.deepcopy(model)
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + INCREMENTAL_TREES)
+        start = time.perf_counter()
+        model.fit(X, target)
+        training_seconds = time.perf_counter() - start
+
+        progress(90, 'Guardando modelo')
+        samples = meta.get('samples', 0) + len(data)
+        version = self._save(model, {
+            'mode': 'incremental',
+            'features': list(X.columns),
+            'parent_version': meta.get('version'),
+            'base_params': meta.get('base_params'),
+            'training_seconds': round(training_seconds, 3),
+            'trained_at': timezone.now().isoformat(),
+            'last_match': _last_match(data),
+            'corrections': corrections,
+            'samples': samples,
+            'n_estimators': model.n_estimators,
+            'accuracy': accuracy,
+            'team_state': final_team_state(
+                data[:, 0], data[:, 1], data[:, 2], data[:, 3], initial_state=meta['team_state']
+            ),
+            'rating_state': rating_state,
+        })
+        print(f"Modelo actualizado con {len(data)} partidos nuevos. Accuracy (prequential): {accuracy}")
+
+        return {
+            "status": "success", "mode": "incremental", "version": version, "accuracy": accuracy, "samples": samples,
+            "new_samples": len(data), "n_estimators": model.n_estimators,
+            "message": f"Modelo actualizado con {len(data)} partidos nuevos",
+        }
+
+    def _get_teams_stats(self, team_ids):
+        """
+        Estadísticas de varios equipos leídas del feature store (una fila por equipo).
+        Devuelve {team_id: {'avg_goals_scored', 'avg_goals_conceded', 'win_rate'}}.
+        """
+        features = get_team_features(team_ids)
+        return {
+            team_id: {
+                'avg_goals_scored': f.avg_goals_scored,
+                'avg_goals_conceded': f.avg_goals_conceded,
+                'win_rate': f.win_rate
+            }
+            for team_id, f in features.items()
+        }
+
+    def predict_batch(self, pairs, fallback=True):
         """
-        if not self.model:
-            # Intentar entrenar si no hay modelo cargado
-            result = self.train()
-            if result['status'] == 'error':
+        Predice varios partidos a la vez. `pairs` es una lista de (local_id, visit_id).
+        Las estadísticas se obtienen con una sola consulta y se llama a predict_proba una vez.
+        Si no hay modelo cargado (nunca entrena dentro del request; ver adm_ml/jobs.py) se
+        responde con los ratings Elo, o None si `fallback` es False.
+        """
+        if not pairs:
+            return []
+
+        model = self.model
+        if not model:
+            if not fallback:
                 return None
+            return [dict(p, modelo='elo') for p in predict_pairs(pairs)]
 
-        local_stats = self._get_team_stats(local_team_id)
-        visit_stats = self._get_team_stats(visit_team_id)
+        pairs = [(int(local_id), int(visit_id)) for local_id, visit_id in pairs]
+        team_ids = [team for pair in pairs for team in pair]
+        team_stats = self._get_teams_stats(team_ids)
+        columns = list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS))
+        ratings = get_ratings(team_ids) if RATING_COLUMNS[0] in columns else {}
 
         features = pd.DataFrame([{
-            'local_avg_goals_scored': local_stats['avg_goals_scored'],
-            'local_avg_goals_conceded': local_stats['avg_goals_conceded'],
-            'local_win_rate': local_stats['win_rate'],
-            'visit_avg_goals_scored': visit_stats['avg_goals_scored'],
-            'visit_avg_goals_conceded': visit_stats['avg_goals_conceded'],
-            'visit_win_rate': visit_stats['win_rate']
-        }])
+            'local_avg_goals_scored': team_stats[local_id]['avg_goals_scored'],
+            'local_avg_goals_conceded': team_stats[local_id]['avg_goals_conceded'],
+            'local_win_rate': team_stats[local_id]['win_rate'],
+            'visit_avg_goals_scored': team_stats[visit_id]['avg_goals_scored'],
+            'visit_avg_goals_conceded': team_stats[visit_id]['avg_goals_conceded'],
+            'visit_win_rate': team_stats[visit_id]['win_rate'],
+            'local_rating': ratings.get(local_id),
+            'visit_rating': ratings.get(visit_id),
+        } for local_id, visit_id in pairs], columns=columns)
 
         # Probabilidades: [Local, Empate, Visitante]
-        probs = self.model.predict_proba(features)[0]
-        
-        return {
-            'local_win_prob': round(probs[0] * 100, 1),
-            'draw_prob': round(probs[1] * 100, 1),
-            'visit_win_prob': round(probs[2] * 100, 1)
-        }
+        probs = model.predict_proba(features)
+
+        return [
+            {
+                'local_win_prob': round(float(p[0]) * 100, 1),
+                'draw_prob': round(float(p[1]) * 100, 1),
+                'visit_win_prob': round(float(p[2]) * 100, 1),
+                'modelo': type(model).__name__
+            }
+            for p in probs
+        ]
+
+    def predict(self, local_team_id, visit_team_id):
+        """
+        Predice el resultado entre dos equipos.
+        """
+        predictions = self.predict_batch([(local_team_id, visit_team_id)])
+        if not predictions:
+            return None
+        return predictions[0]
+
+_predictor = None
+
+
+def get_predictor():
+    """MatchPredictor compartido por el proceso (usa el modelo ya cargado en memoria)."""
+    global _predictor
+    if _predictor is None:
+        _predictor = MatchPredictor()
+    return _predictor
@@ -0,0 +1,157 @@
+"""
+Mantiene el feature store (TeamFeatures) y los ratings Elo (TeamRating)
+sincronizados con los resultados.
+
+Un partido que recibe su primer resultado suma su aporte a las filas de sus equipos
+(features.add_match); se recalculan sólo los equipos afectados cuando:
+- se corrige o elimina un Resultado asociado a un Partido,
+- un Partido jugado cambia o pierde su IDResultado (o cambia de equipos/jornada),
+- se elimina un Partido con resultado.
+
+Un partido que recibe su primer resultado actualiza los ratings en O(1); una
+corrección o eliminación encola, al confirmar la transacción, el re-procesamiento
+del historial en la cola del worker ML (adm_ml/jobs.py), nunca en el request.
+Las correcciones hechas mientras hay uno pendiente se resuelven con esa misma pasada.
+También lo encola una jornada con partidos jugados que cambia de fecha (cambia el
+orden cronológico). Las correcciones incrementan el contador CORRECTIONS
+(adm_ml/changes.py), que hace re-entrenar completo al entrenamiento incremental.
+
+Cualquier cambio en los partidos o resultados de un campeonato incrementa además su
+contador (championship_key), la clave de caché de la simulación.
+"""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from deporte_bd.models import Fixture, Partido, Resultado
+from .changes import CORRECTIONS, bump, championship_key
+from .features import add_match, refresh_team_features
+from .jobs import enqueue_ratings_rebuild
+from .ratings import apply_result
+
+_PARTIDO_FIELDS = ('IDEquipo_Local_id', 'IDEquipo_Visitante_id', 'IDResultado_id', 'IDFixture_id')
+
+
+def _correccion():
+    """Un resultado ya procesado cambió: re-procesar ratings y marcar la corrección."""
+    transaction.on_commit(enqueue_ratings_rebuild)
+    bump(CORRECTIONS)
+
+
+def _cambio_campeonato(*fixture_ids):
+    """Marca como cambiados los campeonatos de las jornadas indicadas."""
+    campeonatos = Fixture.objects.filter(pk__in=[f for f in fixture_ids if f]).values_list('IDCampeonato_id', flat=True)
+    for campeonato_id in set(campeonatos):
+        bump(championship_key(campeonato_id))
+
+
+@receiver(pre_save, sender=Partido)
+def partido_pre_save(sender, instance, raw=False, **kwargs):
+    instance._ml_previo = None
+    if raw or instance.pk is None:
+        return
+    instance._ml_previo = Partido.objects.filter(pk=instance.pk).values_list(*_PARTIDO_FIELDS).first()
+
+
+@receiver(post_save, sender=Partido)
+def partido_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    actual = tuple(getattr(instance, f) for f in _PARTIDO_FIELDS)
+    previo = getattr(instance, '_ml_previo', None)
+    if actual == previo:
+        return
+    _cambio_campeonato(actual[3], previo and previo[3])
+
+    if instance.IDResultado_id and (previo is None or previo[2] is None):
+        # Primer resultado del partido: actualización incremental de features y rating
+        resultado = instance.IDResultado
+        fecha = Fixture.objects.filter(pk=instance.IDFixture_id).values_list('Fecha', flat=True).first()
+        add_match(instance.pk, instance.IDEquipo_Local_id, instance.IDEquipo_Visitante_id,
+                  resultado.Goles_Local, resultado.Goles_Visitante, fecha)
+        apply_result(instance.IDEquipo_Local_id, instance.IDEquipo_Visitante_id,
+                     resultado.Goles_Local, resultado.Goles_Visitante)
+    elif previo and previo[2]:
+        equipos = set(previo[:2])
+        if instance.IDResultado_id:
+            equipos.update(actual[:2])
+        refresh_team_features(equipos)
+        _correccion()
+
+
+@receiver(pre_delete, sender=Partido)
+def partido_pre_delete(sender, instance, **kwargs):
+    # Al borrar una jornada sus partidos se eliminan junto con ella; leemos el campeonato ahora
+    instance._ml_campeonato = Fixture.objects.filter(pk=instance.IDFixture_id).values_list('IDCampeonato_id', flat=True).first()
+
+
+@receiver(post_delete, sender=Partido)
+def partido_post_delete(sender, instance, **kwargs):
+    campeonato_id = getattr(instance, '_ml_campeonato', None)
+    if campeonato_id:
+        bump(championship_key(campeonato_id))
+    if instance.IDResultado_id:
+        refresh_team_features([instance.IDEquipo_Local_id, instance.IDEquipo_Visitante_id])
+        _correccion()
+
+
+@receiver(pre_save, sender=Resultado)
+def resultado_pre_save(sender, instance, raw=False, **kwargs):
+    instance._ml_previo = None
+    if raw or instance.pk is None:
+        return
+    instance._ml_previo = Resultado.objects.filter(pk=instance.pk).values_list('Goles_Local', 'Goles_Visitante').first()
+
+
+@receiver(post_save, sender=Resultado)
+def resultado_post_save(sender, instance, created=False, raw=False, **kwargs):
+    # Un resultado nuevo aún no está asociado a ningún partido
+    if raw or created:
+        return
+    if getattr(instance, '_ml_previo', None) == (instance.Goles_Local, instance.Goles_Visitante):
+        return
+    partido = Partido.objects.filter(IDResultado_id=instance.pk).values_list(
+        'IDEquipo_Local_id', 'IDEquipo_Visitante_id', 'IDFixture_id'
+    ).first()
+    if partido:
+        refresh_team_features(partido[:2])
+        _correccion()
+        _cambio_campeonato(partido[2])
+
+
+@receiver(pre_delete, sender=Resultado)
+def resultado_pre_delete(sender, instance, **kwargs):
+    # El partido pierde la referencia (SET_NULL) antes de post_delete; guardamos los equipos ahora
+    instance._ml_partido = Partido.objects.filter(IDResultado_id=instance.pk).values_list(
+        'IDEquipo_Local_id', 'IDEquipo_Visitante_id', 'IDFixture_id'
+    ).first()
+
+
+@receiver(post_delete, sender=Resultado)
+def resultado_post_delete(sender, instance, **kwargs):
+    partido = getattr(instance, '_ml_partido', None)
+    if partido:
+        refresh_team_features(partido[:2])
+        _correccion()
+        _cambio_campeonato(partido[2])
+
+
+
+@receiver(pre_save, sender=Fixture)
+def fixture_pre_save(sender, instance, raw=False, **kwargs):
+    instance._ml_previo = None
+    if raw or instance.pk is None:
+        return
+    instance._ml_previo = Fixture.objects.filter(pk=instance.pk).values_list('Fecha', 'IDCampeonato_id').first()
+
+
+@receiver(post_save, sender=Fixture)
+def fixture_post_save(sender, instance, created=False, raw=False, **kwargs):
+    previo = getattr(instance, '_ml_previo', None)
+    if raw or created or previo is None:
+        return
+    if previo[1] != instance.IDCampeonato_id and Partido.objects.filter(IDFixture_id=instance.pk).exists():
+        bump(championship_key(previo[1]))
+        bump(championship_key(instance.IDCampeonato_id))
+    if previo[0] != instance.Fecha and Partido.objects.filter(IDFixture_id=instance.pk, IDResultado__isnull=False).exists():
+        _correccion()
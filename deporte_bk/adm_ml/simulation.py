@@ -0,0 +1,245 @@
+"""
+Simulación Monte Carlo del resto de un campeonato.
+
+Los partidos pendientes (IDResultado nulo) se juegan `n_sims` veces a la vez: para cada
+partido se sortea el resultado de todas las simulaciones con un único vector de NumPy,
+usando las probabilidades de MatchPredictor, y el marcador se toma de la distribución
+histórica de marcadores para ese resultado (así la diferencia de gol y los goles a favor
+también sirven de desempate). La tabla se ordena como Historial: puntos (3/1/0),
+diferencia de gol y goles a favor.
+"""
+import time
+
+import numpy as np
+
+from django.db.models import Max
+
+from deporte_bd.models import Equipo, Historial, Partido
+from .changes import CORRECTIONS, championship_key, version as changes_version
+from .models import TeamRating
+
+WIN_POINTS, DRAW_POINTS = 3, 1
+
+
+# Resolución de las tablas de muestreo: las probabilidades del predictor vienen con 0.1 %
+# de precisión, así que 4096 niveles alcanzan y cada tabla cabe en caché L1.
+LUT_SIZE = 4096
+# Simulaciones procesadas por bloque
+SIM_BLOCK = 16384
+
+
+def _scoreline_tables(goles_local, goles_visitante):
+    """
+    Distribución empírica de marcadores condicionada al resultado, a partir del historial.
+    Devuelve (marcadores (K, 2), resultado de cada marcador (K,), P(marcador | resultado) (K,)).
+    Sin historial de algún resultado se usan 1-0, 1-1 y 0-1.
+    """
+    history = np.column_stack([goles_local, goles_visitante]).astype(np.int64).reshape(-1, 2)
+    history = np.vstack([history, [(1, 0), (1, 1), (0, 1)]]) if len(history) == 0 else history
+    scores, counts = np.unique(history, axis=0, return_counts=True)
+    outcome = np.where(scores[:, 0] > scores[:, 1], 0, np.where(scores[:, 0] == scores[:, 1], 1, 2))
+    defaults = {0: (1, 0), 1: (1, 1), 2: (0, 1)}
+    missing = [defaults[r] for r in range(3) if not (outcome == r).any()]
+    if missing:
+        scores = np.vstack([scores, missing])
+        counts = np.concatenate([counts, np.ones(len(missing), dtype=counts.dtype)])
+        outcome = np.where(scores[:, 0] > scores[:, 1], 0, np.where(scores[:, 0] == scores[:, 1], 1, 2))
+    conditional = counts / np.bincount(outcome, weights=counts, minlength=3)[outcome]
+    return scores, outcome, conditional
+
+
+# Cada equipo acumula un único int64 que ya es su clave de orden en la tabla:
+#   clave = puntos * 2**42 + diferencia_de_gol * 2**21 + goles_a_favor
+# Mientras |DG| < 2**19 y GF < 2**21 el orden de la clave coincide con el de
+# (puntos, DG, GF), y cada partido simulado cuesta una lectura de tabla y una suma.
+POINTS_SHIFT = 42
+GD_SHIFT = 21
+
+
+def _encode(points, goal_diff, goals_for):
+    return (np.asarray(points, dtype=np.int64) << POINTS_SHIFT) \
+        + (np.asarray(goal_diff, dtype=np.int64) << GD_SHIFT) \
+        + np.asarray(goals_for, dtype=np.int64)
+
+
+def _decode_points(key):
+    return (key + (1 << (POINTS_SHIFT - 1))) >> POINTS_SHIFT
+
+
+def _sampling_tables(probabilities, scorelines):
+    """
+    Tablas de muestreo por partido pendiente: para un entero uniforme u en [0, LUT_SIZE)
+    dan el aporte (codificado con _encode) del marcador sorteado al local y a la visita.
+    Cada marcador recibe la probabilidad P(resultado del partido) * P(marcador | resultado)
+    y se invierte la CDF una sola vez por partido.
+    """
+    scores, outcome, conditional = scorelines
+    weights = probabilities[:, outcome] * conditional  # (m, K)
+    cdf = np.cumsum(weights, axis=1)
+    cdf /= cdf[:, -1:]
+    levels = (np.arange(LUT_SIZE) + 0.5) / LUT_SIZE
+    picks = np.empty((len(probabilities), LUT_SIZE), dtype=np.intp)
+    for m in range(len(probabilities)):
+        picks[m] = np.searchsorted(cdf[m], levels)
+    picks = np.minimum(picks, len(scores) - 1)
+
+    g_local, g_visit = scores[:, 0], scores[:, 1]
+    local_points = np.where(outcome == 0, WIN_POINTS, np.where(outcome == 1, DRAW_POINTS, 0))
+    visit_points = np.where(outcome == 2, WIN_POINTS, np.where(outcome == 1, DRAW_POINTS, 0))
+    local_value = _encode(local_points, g_local - g_visit, g_local)
+    visit_value = _encode(visit_points, g_visit - g_local, g_visit)
+    return local_value[picks], visit_value[picks]
+
+
+def simulate(team_ids, played, pending, probabilities, scorelines, n_sims=10000, seed=None):
+    """
+    Núcleo vectorizado, sin acceso a la base de datos.
+
+    - team_ids: ids de los equipos del campeonato.
+    - played: array (n, 4) de partidos jugados (local, visita, goles local, goles visita).
+    - pending: array (m, 2) de partidos pendientes (local, visita).
+    - probabilities: array (m, 3) con P(local), P(empate), P(visita) de cada pendiente.
+    - scorelines: resultado de _scoreline_tables.
+
+    Devuelve (position_counts (T, T), mean_points (T,), current_points (T,)).
+    """
+    rng = np.random.default_rng(seed)
+    team_ids = np.asarray(team_ids)
+    n_teams = len(team_ids)
+    index = {int(team_id): i for i, team_id in enumerate(team_ids.tolist())}
+
+    # Tabla actual
+    points0 = np.zeros(n_teams, dtype=np.int64)
+    gd0 = np.zeros(n_teams, dtype=np.int64)
+    gf0 = np.zeros(n_teams, dtype=np.int64)
+    if len(played):
+        local = np.array([index[t] for t in played[:, 0].tolist()])
+        visit = np.array([index[t] for t in played[:, 1].tolist()])
+        g_local, g_visit = played[:, 2], played[:, 3]
+        local_pts = np.where(g_local > g_visit, WIN_POINTS, np.where(g_local == g_visit, DRAW_POINTS, 0))
+        visit_pts = np.where(g_visit > g_local, WIN_POINTS, np.where(g_local == g_visit, DRAW_POINTS, 0))
+        for team, pts, scored, conceded in ((local, local_pts, g_local, g_visit), (visit, visit_pts, g_visit, g_local)):
+            points0 += np.bincount(team, pts, n_teams).astype(np.int64)
+            gd0 += np.bincount(team, scored - conceded, n_teams).astype(np.int64)
+            gf0 += np.bincount(team, scored, n_teams).astype(np.int64)
+
+    # Una fila por equipo: cada suma toca memoria contigua
+    keys = np.repeat(_encode(points0, gd0, gf0)[:, None], n_sims, axis=1)
+
+    if len(pending):
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        probabilities = probabilities / probabilities.sum(axis=1, keepdims=True)
+        local_lut, visit_lut = _sampling_tables(probabilities, scorelines)
+        rows = [(index[local_id], index[visit_id]) for local_id, visit_id in pending.tolist()]
+        # Por bloques de simulaciones para que claves, sorteos y temporales queden en caché
+        for start in range(0, n_sims, SIM_BLOCK):
+            block = keys[:, start:start + SIM_BLOCK]
+            draws = rng.integers(0, LUT_SIZE, size=(len(rows), block.shape[1]), dtype=np.int16)
+            value = np.empty(block.shape[1], dtype=np.int64)
+            for m, (li, vi) in enumerate(rows):
+                local_lut[m].take(draws[m], out=value)
+                block[li] += value
+                visit_lut[m].take(draws[m], out=value)
+                block[vi] += value
+
+    mean_points = _decode_points(keys).mean(axis=1)
+
+    # Sorteo en los 6 bits bajos para desempatar igualdades exactas
+    keys = np.ascontiguousarray(keys.T) << 6
+    keys += rng.integers(0, 64, size=keys.shape)
+    order = np.argsort(-keys, axis=1)
+
+    # order[s, p] = equipo en la posición p de la simulación s
+    position_counts = np.bincount(
+        (order * n_teams + np.arange(n_teams)).ravel(), minlength=n_teams * n_teams
+    ).reshape(n_teams, n_teams)
+    return position_counts, mean_points, points0
+
+
+def championship_stamp(campeonato_id):
+    """
+    Marca de cambios de un campeonato: el contador que las señales de adm_ml/signals.py
+    incrementan con cada resultado o partido del campeonato que se carga, corrige o
+    elimina (ver adm_ml/changes.py), por lo que sirve como clave de caché de la simulación.
+    """
+    return changes_version(championship_key(campeonato_id))
+
+
+def results_stamp():
+    """
+    Marca global de resultados y ratings: la simulación también depende de los ratings de
+    los equipos y de la distribución histórica de marcadores, que cambian con resultados
+    de cualquier campeonato. Combina el contador de correcciones (que también se mueve
+    mientras el re-procesamiento de ratings está pendiente) con la última actualización
+    de TeamRating (cada resultado nuevo y cada rebuild_ratings la mueven).
+    """
+    actualizado = TeamRating.objects.aggregate(ultimo=Max('Actualizado'))['ultimo']
+    return '{}-{}'.format(changes_version(CORRECTIONS), actualizado.timestamp() if actualizado else 0)
+
+
+def simulate_championship(campeonato_id, n_sims=10000, seed=None, predictor=None):
+    """
+    Simula el resto del campeonato y devuelve, por equipo, la probabilidad de terminar
+    en cada posición, ordenado por posición esperada.
+    """
+    from .services import get_predictor
+
+    start = time.perf_counter()
+    partidos = Partido.objects.filter(IDFixture__IDCampeonato_id=campeonato_id)
+    played = np.array(
+        list(partidos.filter(IDResultado__isnull=False).values_list(
+            'IDEquipo_Local_id', 'IDEquipo_Visitante_id', 'IDResultado__Goles_Local', 'IDResultado__Goles_Visitante'
+        )),
+        dtype=np.int64
+    ).reshape(-1, 4)
+    pending = np.array(
+        list(partidos.filter(IDResultado__isnull=True).values_list('IDEquipo_Local_id', 'IDEquipo_Visitante_id')),
+        dtype=np.int64
+    ).reshape(-1, 2)
+
+    team_ids = set(Historial.objects.filter(IDCampeonato_id=campeonato_id).values_list('IDEquipo_id', flat=True))
+    team_ids.update(played[:, :2].ravel().tolist())
+    team_ids.update(pending.ravel().tolist())
+    team_ids = sorted(team_ids)
+    if not team_ids:
+        return {"simulaciones": n_sims, "pendientes": 0, "equipos": []}
+
+    probabilities = np.empty((len(pending), 3))
+    if len(pending):
+        predictions = (predictor or get_predictor()).predict_batch([tuple(p) for p in pending.tolist()])
+        probabilities[:] = [(p['local_win_prob'], p['draw_prob'], p['visit_win_prob']) for p in predictions]
+
+    # Marcadores históricos de todas las ligas: más estable que sólo los del campeonato
+    history = np.array(
+        list(Partido.objects.filter(IDResultado__isnull=False).values_list(
+            'IDResultado__Goles_Local', 'IDResultado__Goles_Visitante'
+        )),
+        dtype=np.int64
+    ).reshape(-1, 2)
+    scorelines = _scoreline_tables(history[:, 0], history[:, 1])
+
+    counts, mean_points, current_points = simulate(
+        team_ids, played, pending, probabilities, scorelines, n_sims=n_sims, seed=seed
+    )
+    probs = counts / n_sims
+    expected_position = (probs * np.arange(1, len(team_ids) + 1)).sum(axis=1)
+
+    nombres = dict(Equipo.objects.filter(id__in=team_ids).values_list('id', 'Nombre'))
+    equipos = [
+        {
+            "equipo": {"id": team_id, "nombre": nombres.get(team_id)},
+            "puntos_actuales": int(current_points[i]),
+            "puntos_esperados": round(float(mean_points[i]), 2),
+            "posicion_esperada": round(float(expected_position[i]), 2),
+            "campeon": round(float(probs[i, 0]) * 100, 2),
+            "posiciones": [round(float(p) * 100, 2) for p in probs[i]],
+        }
+        for i, team_id in enumerate(team_ids)
+    ]
+    equipos.sort(key=lambda e: e["posicion_esperada"])
+    return {
+        "simulaciones": n_sims,
+        "pendientes": len(pending),
+        "tiempo_ms": round((time.perf_counter() - start) * 1000, 1),
+        "equipos": equipos,
+    }
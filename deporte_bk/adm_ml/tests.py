@@ -1,3 +1,309 @@
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from adm_deportiva.tests import crear_campeonato
+from deporte_bd.models import Fixture, Partido, Resultado
+from . import features, poisson
+from .ratings import rebuild_ratings
+from .changes import CORRECTIONS, bump, version
+from .features import FEATURE_FIELDS, rebuild_team_features
+from .models import TeamFeatures, TeamRating, TrainingJob
+from .jobs import RATINGS_MODE
+from .simulation import championship_stamp, results_stamp
+
+
+class CorrectionsCounterTests(TestCase):
+    """Cambios que obligan al entrenamiento incremental a re-entrenar completo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.campeonato, cls.equipos, cls.instalacion = crear_campeonato()
+        cls.fixture = Fixture.objects.create(IDCampeonato=cls.campeonato, Numero=1, Fecha=date(2026, 3, 1))
+
+    def partido(self, goles=None):
+        resultado = Resultado.objects.create(Goles_Local=goles[0], Goles_Visitante=goles[1]) if goles else None
+        return Partido.objects.create(
+            IDFixture=self.fixture, IDInstalacion=self.instalacion, IDResultado=resultado,
+            IDEquipo_Local=self.equipos[0], IDEquipo_Visitante=self.equipos[1]
+        )
+
+    def cambio(self, accion):
+        """Valor de CORRECTIONS luego de ejecutar `accion` y confirmar la transacción."""
+        with self.captureOnCommitCallbacks(execute=True):
+            accion()
+        return version(CORRECTIONS)
+
+    def test_new_results_are_not_corrections(self):
+        partido = self.partido()
+        self.assertEqual(self.cambio(lambda: self.partido((1, 0))), 0)
+
+        def cargar():
+            partido.IDResultado = Resultado.objects.create(Goles_Local=2, Goles_Visitante=2)
+            partido.save()
+        self.assertEqual(self.cambio(cargar), 0)
+
+    def test_processed_results_that_change_are_corrections(self):
+        partido = self.partido((1, 0))
+        resultado = partido.IDResultado
+
+        def corregir():
+            resultado.Goles_Visitante = 3
+            resultado.save()
+        self.assertEqual(self.cambio(corregir), 1)
+        self.assertTrue(TrainingJob.objects.filter(Modo=RATINGS_MODE, Estado='Pendiente').exists())
+
+        def mover_jornada():
+            self.fixture.Fecha = date(2026, 2, 1)
+            self.fixture.save()
+        self.assertEqual(self.cambio(mover_jornada), 2)
+        self.assertEqual(self.cambio(resultado.delete), 3)
+        self.assertEqual(self.cambio(self.partido((0, 0)).delete), 4)
+
+
+class ChampionshipStampTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.campeonato, cls.equipos, cls.instalacion = crear_campeonato()
+        cls.fixture = Fixture.objects.create(IDCampeonato=cls.campeonato, Numero=1, Fecha=date(2026, 3, 1))
+
+    def stamp(self, accion):
+        with self.captureOnCommitCallbacks(execute=True):
+            accion()
+        return championship_stamp(self.campeonato.pk)
+
+    def test_every_change_moves_the_stamp(self):
+        a, b, c, d = self.equipos
+        crear = lambda local, visita, goles: Partido.objects.create(
+            IDFixture=self.fixture, IDInstalacion=self.instalacion, IDEquipo_Local=local, IDEquipo_Visitante=visita,
+            IDResultado=Resultado.objects.create(Goles_Local=goles[0], Goles_Visitante=goles[1])
+        )
+        stamps = [championship_stamp(self.campeonato.pk)]
+        with self.captureOnCommitCallbacks(execute=True):
+            primero = crear(a, b, (1, 0))
+            segundo = crear(c, d, (2, 1))
+        stamps.append(championship_stamp(self.campeonato.pk))
+
+        def compensar():
+            # Las sumas de goles del campeonato no cambian
+            primero.IDResultado.Goles_Local = 2
+            primero.IDResultado.save()
+            segundo.IDResultado.Goles_Local = 1
+            segundo.IDResultado.save()
+        stamps.append(self.stamp(compensar))
+        stamps.append(self.stamp(segundo.IDResultado.delete))
+        stamps.append(self.stamp(self.fixture.delete))
+        self.assertEqual(len(set(stamps)), len(stamps))
+
+
+    def test_simulation_cache_key_follows_ratings_and_corrections(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        url = f'/api/ml/campeonatos/{self.campeonato.pk}/simulacion/'
+        client = APIClient()
+        with mock.patch('adm_ml.views.simulate_championship', return_value={'equipos': []}) as simular:
+            self.assertFalse(client.get(url, {'simulaciones': 10}).data['cache'])
+            self.assertTrue(client.get(url, {'simulaciones': 10}).data['cache'])
+            self.assertEqual(simular.call_count, 1)
+            marcas = [results_stamp()]
+
+            # Un resultado de otro campeonato sólo mueve los ratings, no la marca de éste
+            TeamRating.objects.create(IDEquipo=self.equipos[0], Rating=1510, PJ=1)
+            marcas.append(results_stamp())
+            self.assertFalse(client.get(url, {'simulaciones': 10}).data['cache'])
+
+            # Una corrección en otro campeonato, antes de que se re-procesen los ratings
+            with self.captureOnCommitCallbacks(execute=True):
+                bump(CORRECTIONS)
+            marcas.append(results_stamp())
+            self.assertFalse(client.get(url, {'simulaciones': 10}).data['cache'])
+            self.assertEqual(simular.call_count, 3)
+        self.assertEqual(len(set(marcas)), len(marcas))
+
+
+class TeamFeaturesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.campeonato, cls.equipos, cls.instalacion = crear_campeonato()
+        cls.jornadas = [
+            Fixture.objects.create(IDCampeonato=cls.campeonato, Numero=n, Fecha=date(2026, 3, 1) + timedelta(days=7 * n))
+            for n in range(1, 7)
+        ]
+
+    def jugar(self, jornada, local, visita, goles):
+        return Partido.objects.create(
+            IDFixture=self.jornadas[jornada], IDInstalacion=self.instalacion,
+            IDEquipo_Local=self.equipos[local], IDEquipo_Visitante=self.equipos[visita],
+            IDResultado=Resultado.objects.create(Goles_Local=goles[0], Goles_Visitante=goles[1])
+        )
+
+    def filas(self):
+        return {fila.pop('IDEquipo_id'): fila for fila in TeamFeatures.objects.values('IDEquipo_id', *FEATURE_FIELDS)}
+
+    def assertMatchesRebuild(self):
+        incremental = self.filas()
+        rebuild_team_features()
+        self.assertEqual(incremental, self.filas())
+
+    def test_incremental_rows_match_rebuild(self):
+        resultados = [(0, 1, (2, 0)), (2, 3, (1, 1)), (0, 2, (0, 3)), (1, 3, (2, 2)), (3, 0, (1, 0)), (1, 2, (4, 1))]
+        for jornada, (local, visita, goles) in enumerate(resultados):
+            self.jugar(jornada, local, visita, goles)
+        self.assertMatchesRebuild()
+
+        # En orden cronológico un resultado nuevo no relee el historial de los equipos
+        with mock.patch.object(features, '_played_matches', wraps=features._played_matches) as historial:
+            self.jugar(5, 0, 1, (3, 2))
+        historial.assert_not_called()
+        self.assertMatchesRebuild()
+
+        # Resultado cargado tarde para una jornada anterior: recalcula esos equipos
+        tardio = self.jugar(0, 2, 0, (0, 0))
+        self.assertMatchesRebuild()
+
+        # Correcciones y eliminaciones
+        resultado = tardio.IDResultado
+        resultado.Goles_Local = 5
+        resultado.save()
+        self.assertMatchesRebuild()
+        Partido.objects.filter(IDFixture=self.jornadas[2]).first().delete()
+        self.assertMatchesRebuild()
+        resultado.delete()
+        self.assertMatchesRebuild()
+
+    def test_upsert_refreshes_actualizado(self):
+        self.jugar(0, 0, 1, (1, 0))
+        antes = TeamFeatures.objects.get(pk=self.equipos[0].pk).Actualizado
+        self.jugar(1, 0, 2, (1, 0))
+        fila = TeamFeatures.objects.get(pk=self.equipos[0].pk)
+        self.assertEqual(fila.PJ, 2)
+        self.assertGreater(fila.Actualizado, antes)
+
+
+class PoissonTests(TestCase):
+    """Modelo de goles: recupera fuerzas conocidas y se publica/lee como JSON."""
+
+    def test_fit_recovers_known_strengths(self):
+        rng = np.random.default_rng(7)
+        attack = np.array([0.6, 0.8, 1.0, 1.25, 1.5, 1.8])
+        defence = np.array([1.5, 1.3, 1.1, 0.9, 0.75, 0.6])
+        home = 1.3
+        equipos = np.arange(len(attack)) + 10
+        local, visit = [a.ravel() for a in np.meshgrid(np.arange(6), np.arange(6))]
+        distintos = local != visit
+        local, visit = np.tile(local[distintos], 60), np.tile(visit[distintos], 60)
+        g_local = rng.poisson(attack[local] * defence[visit] * home)
+        g_visit = rng.poisson(attack[visit] * defence[local])
+
+        params = poisson.fit(equipos[local], equipos[visit], g_local, g_visit)
+        ajustado = np.array([params['teams'][str(equipo)] for equipo in equipos])
+        self.assertEqual(list(np.argsort(ajustado[:, 0])), list(np.argsort(attack)))
+        self.assertEqual(list(np.argsort(ajustado[:, 1])), list(np.argsort(defence)))
+        self.assertAlmostEqual(params['home'], home, delta=0.1)
+        self.assertLessEqual(abs(params['rho']), poisson.RHO_BOUNDS[1])
+
+        modelo = poisson.PoissonModel(params)
+        pares = [(10, 15), (15, 10), (12, 12), (10, 99)]
+        _, _, matrices = modelo.predict_matrices(pares)
+        np.testing.assert_allclose(matrices.sum(axis=(1, 2)), 1.0)
+        for prediccion in modelo.predict_batch(pares):
+            total = prediccion['local_win_prob'] + prediccion['draw_prob'] + prediccion['visit_win_prob']
+            self.assertAlmostEqual(total, 100.0, delta=0.2)
+        mas_fuerte, mas_debil = modelo.predict_batch([(15, 10)])[0], modelo.predict_batch([(10, 15)])[0]
+        self.assertGreater(mas_fuerte['local_win_prob'], mas_debil['local_win_prob'])
+
+    def test_train_publishes_params_that_load_back(self):
+        campeonato, equipos, instalacion = crear_campeonato()
+        resultados = [(0, 1, 3, 0), (2, 3, 1, 1), (1, 2, 0, 2), (3, 0, 1, 4), (0, 2, 2, 1), (1, 3, 2, 2)]
+        for n, (local, visita, goles_local, goles_visita) in enumerate(resultados, start=1):
+            fixture = Fixture.objects.create(IDCampeonato=campeonato, Numero=n, Fecha=date(2026, 3, 1) + timedelta(days=7 * n))
+            Partido.objects.create(
+                IDFixture=fixture, IDInstalacion=instalacion, IDEquipo_Local=equipos[local], IDEquipo_Visitante=equipos[visita],
+                IDResultado=Resultado.objects.create(Goles_Local=goles_local, Goles_Visitante=goles_visita)
+            )
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ruta = os.path.join(directorio.name, poisson.PARAMS_FILE)
+        with mock.patch.object(poisson, 'params_path', lambda: ruta), \
+                mock.patch.object(poisson, '_model', None), mock.patch.object(poisson, '_signature', None):
+            self.assertIsNone(poisson.get_poisson_model())
+            self.assertEqual(poisson.train()['status'], 'success')
+            self.assertEqual(os.listdir(directorio.name), [poisson.PARAMS_FILE])
+            with open(ruta, encoding='utf-8') as archivo:
+                guardado = json.load(archivo)
+            modelo = poisson.get_poisson_model()
+            self.assertEqual(modelo.params, guardado)
+            self.assertEqual(set(modelo.teams), {equipo.pk for equipo in equipos})
+            self.assertIs(poisson.get_poisson_model(), modelo)
+
+            # Un nuevo ajuste reemplaza el archivo y se vuelve a leer
+            poisson.train(xi=0)
+            nuevo = poisson.get_poisson_model()
+            self.assertIsNot(nuevo, modelo)
+            self.assertEqual(nuevo.params['xi'], 0)
+            par = [(equipos[0].pk, equipos[1].pk)]
+            self.assertEqual(nuevo.predict_batch(par), poisson.PoissonModel(nuevo.params).predict_batch(par))
+
+
+class RatingsTests(TestCase):
+    """Ratings Elo: la actualización por resultado coincide con re-procesar el historial."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.campeonato, cls.equipos, cls.instalacion = crear_campeonato()
+        cls.jornadas = [
+            Fixture.objects.create(IDCampeonato=cls.campeonato, Numero=n, Fecha=date(2026, 3, 1) + timedelta(days=7 * n))
+            for n in range(1, 7)
+        ]
+
+    def jugar(self, jornada, local, visita, goles):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Partido.objects.create(
+                IDFixture=self.jornadas[jornada], IDInstalacion=self.instalacion,
+                IDEquipo_Local=self.equipos[local], IDEquipo_Visitante=self.equipos[visita],
+                IDResultado=Resultado.objects.create(Goles_Local=goles[0], Goles_Visitante=goles[1])
+            )
+
+    def ratings(self):
+        return {fila[0]: fila[1:] for fila in TeamRating.objects.values_list('IDEquipo_id', 'Rating', 'PJ')}
+
+    def assertMatchesRebuild(self):
+        incremental = self.ratings()
+        rebuild_ratings()
+        completo = self.ratings()
+        self.assertEqual(set(incremental), set(completo))
+        for equipo, (rating, jugados) in completo.items():
+            self.assertAlmostEqual(incremental[equipo][0], rating, places=9)
+            self.assertEqual(incremental[equipo][1], jugados)
+
+    def rebuilds(self):
+        return TrainingJob.objects.filter(Modo=RATINGS_MODE, Estado='Pendiente').count()
+
+    def test_incremental_matches_rebuild_in_date_order(self):
+        resultados = [(0, 1, (3, 0)), (2, 3, (1, 1)), (1, 2, (0, 2)), (3, 0, (1, 4)), (0, 2, (2, 1)), (1, 3, (5, 2))]
+        for jornada, (local, visita, goles) in enumerate(resultados):
+            self.jugar(jornada, local, visita, goles)
+        self.assertEqual(self.rebuilds(), 0)
+        self.assertMatchesRebuild()
+
+    def test_correction_enqueues_one_rebuild(self):
+        primero = self.jugar(0, 0, 1, (1, 0))
+        segundo = self.jugar(1, 2, 3, (2, 2))
+        with self.captureOnCommitCallbacks(execute=True):
+            for partido, goles_visitante in ((primero, 3), (segundo, 0)):
+                partido.IDResultado.Goles_Visitante = goles_visitante
+                partido.IDResultado.save()
+        self.assertEqual(self.rebuilds(), 1)
 
-# Create your tests here.
+        # Otra corrección con el re-procesamiento todavía pendiente lo reutiliza
+        with self.captureOnCommitCallbacks(execute=True):
+            primero.IDResultado.Goles_Local = 2
+            primero.IDResultado.save()
+        self.assertEqual(self.rebuilds(), 1)
@@ -1,7 +1,22 @@
 from django.urls import path
-from .views import PredictMatchView, TrainModelView
+from .views import (
+    PredictMatchView, BatchPredictView, TrainModelView, ModelStatusView,
+    TrainingJobListView, TrainingJobDetailView,
+    ModelVersionListView, ModelVersionActivateView, ModelRollbackView, RatingListView,
+    SimulacionCampeonatoView, PoissonPredictView
+)
 
 urlpatterns = [
     path('predecir/', PredictMatchView.as_view(), name='predecir_partido'),
+    path('predecir/lote/', BatchPredictView.as_view(), name='predecir_lote'),
+    path('predecir/poisson/', PoissonPredictView.as_view(), name='predecir_poisson'),
     path('entrenar/', TrainModelView.as_view(), name='entrenar_modelo'),
+    path('entrenamientos/', TrainingJobListView.as_view(), name='entrenamientos'),
+    path('entrenamientos/<int:pk>/', TrainingJobDetailView.as_view(), name='entrenamiento_detalle'),
+    path('estado/', ModelStatusView.as_view(), name='estado_modelo'),
+    path('ratings/', RatingListView.as_view(), name='ratings'),
+    path('campeonatos/<int:pk>/simulacion/', SimulacionCampeonatoView.as_view(), name='simulacion_campeonato'),
+    path('modelos/', ModelVersionListView.as_view(), name='modelos'),
+    path('modelos/rollback/', ModelRollbackView.as_view(), name='modelo_rollback'),
+    path('modelos/<str:version>/activar/', ModelVersionActivateView.as_view(), name='modelo_activar'),
 ]
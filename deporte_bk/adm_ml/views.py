@@ -2,8 +2,62 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from .services import MatchPredictor
-from deporte_bd.models import Equipo
+from django.core.cache import cache
+from .services import get_predictor, MODOS_ENTRENAMIENTO
+from .registry import get_registry
+from .jobs import enqueue_training
+from .models import TrainingJob, TeamRating
+from .ratings import INITIAL_RATING, predict_pairs
+from .simulation import championship_stamp, results_stamp, simulate_championship
+from .poisson import get_poisson_model
+from .serializers import TrainingJobSerializer
+from deporte_bd.models import Campeonato, Equipo, Partido, Usuario
+
+
+def _encolar_si_falta_modelo(request):
+    """
+    Si aún no hay un modelo entrenado se encola un entrenamiento (si no hay uno pendiente)
+    en lugar de entrenar dentro del request; mientras tanto se predice con los ratings Elo.
+    Devuelve el trabajo serializado, o None si el modelo ya está cargado.
+    """
+    if get_registry().get_model() is not None:
+        return None
+    usuario = request.user if isinstance(request.user, Usuario) else None
+    job, _ = enqueue_training(usuario=usuario)
+    return TrainingJobSerializer(job).data
+
+def _partidos_solicitados(data, limite):
+    """
+    Partidos a predecir según el request, como filas (partido_id, local_id, visit_id):
+    todos los de una jornada (fixture_id) o de un campeonato (campeonato_id), o una lista
+    explícita de pares en `partidos` [{local_id, visit_id}]. Por defecto sólo se incluyen
+    los partidos pendientes (sin resultado). Devuelve None si no se indicó ninguno.
+    """
+    fixture_id = data.get('fixture_id')
+    campeonato_id = data.get('campeonato_id')
+    pares = data.get('partidos')
+    if fixture_id or campeonato_id:
+        partidos = Partido.objects.all()
+        if fixture_id:
+            partidos = partidos.filter(IDFixture_id=int(fixture_id))
+        if campeonato_id:
+            partidos = partidos.filter(IDFixture__IDCampeonato_id=int(campeonato_id))
+        if data.get('solo_pendientes', True):
+            partidos = partidos.filter(IDResultado__isnull=True)
+        return list(
+            partidos.order_by('IDFixture__Numero', 'id')
+            .values_list('id', 'IDEquipo_Local_id', 'IDEquipo_Visitante_id')[:limite]
+        )
+    if isinstance(pares, list) and pares:
+        return [(None, int(p['local_id']), int(p['visit_id'])) for p in pares[:limite]]
+    return None
+
+
+def _nombres_equipos(filas):
+    """{id: nombre} de los equipos de las filas, o None si alguno no existe."""
+    equipos_ids = {team for _, local, visit in filas for team in (local, visit)}
+    nombres = dict(Equipo.objects.filter(id__in=equipos_ids).values_list('id', 'Nombre'))
+    return nombres if len(nombres) == len(equipos_ids) else None
 
 class PredictMatchView(APIView):
     permission_classes = [AllowAny]
@@ -19,37 +73,294 @@ class PredictMatchView(APIView):
             )
 
         try:
-            predictor = MatchPredictor()
-            prediction = predictor.predict(local_id, visit_id)
-
-            if not prediction:
-                return Response(
-                    {"error": "No hay suficientes datos históricos para realizar una predicción confiable."},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            
-            # Obtener nombres para respuesta más amigable
+            # Obtener nombres para respuesta más amigable (y validar que existan)
             local_name = Equipo.objects.get(pk=local_id).Nombre
             visit_name = Equipo.objects.get(pk=visit_id).Nombre
 
-            return Response({
+            prediction = get_predictor().predict(local_id, visit_id)
+
+            data = {
                 "match": f"{local_name} vs {visit_name}",
-                "prediction": prediction
-            })
+                "prediction": prediction,
+                "elo": predict_pairs([(local_id, visit_id)])[0]
+            }
+            entrenamiento = _encolar_si_falta_modelo(request)
+            if entrenamiento:
+                data["entrenamiento"] = entrenamiento
+            return Response(data)
 
         except Equipo.DoesNotExist:
             return Response({"error": "Equipo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class TrainModelView(APIView):
+class BatchPredictView(APIView):
     """
-    Endpoint para forzar el re-entrenamiento del modelo manualmente.
+    Predicción por lotes: todos los partidos de una jornada (fixture_id), de un campeonato
+    (campeonato_id) o una lista explícita de pares en `partidos` [{local_id, visit_id}].
+    Por defecto sólo se incluyen los partidos pendientes (sin resultado).
     """
+    permission_classes = [AllowAny]
+    MAX_PARTIDOS = 500
+
     def post(self, request):
         try:
-            predictor = MatchPredictor()
-            result = predictor.train()
-            return Response(result)
+            filas = _partidos_solicitados(request.data, self.MAX_PARTIDOS)
+        except (KeyError, TypeError, ValueError):
+            return Response(
+                {"error": "Parámetros inválidos: los identificadores deben ser enteros"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if filas is None:
+            return Response(
+                {"error": "Se requiere fixture_id, campeonato_id o una lista de partidos [{local_id, visit_id}]"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not filas:
+            return Response({"total": 0, "predicciones": []})
+
+        try:
+            nombres = _nombres_equipos(filas)
+            if nombres is None:
+                return Response({"error": "Equipo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+            pairs = [(local, visit) for _, local, visit in filas]
+            predictions = get_predictor().predict_batch(pairs)
+            elo = predict_pairs(pairs)
+
+            data = {
+                "total": len(filas),
+                "predicciones": [
+                    {
+                        "partido_id": partido_id,
+                        "local": {"id": local, "nombre": nombres[local]},
+                        "visitante": {"id": visit, "nombre": nombres[visit]},
+                        "match": f"{nombres[local]} vs {nombres[visit]}",
+                        "prediction": prediction,
+                        "elo": elo_prediction
+                    }
+                    for (partido_id, local, visit), prediction, elo_prediction in zip(filas, predictions, elo)
+                ]
+            }
+            entrenamiento = _encolar_si_falta_modelo(request)
+            if entrenamiento:
+                data["entrenamiento"] = entrenamiento
+            return Response(data)
+
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class TrainModelView(APIView):
+    """
+    Endpoint para forzar el re-entrenamiento del modelo manualmente.
+    Encola el trabajo y responde de inmediato; el avance se consulta en /api/ml/entrenamientos/<id>/.
+    `modo`: 'incremental' (por defecto, sólo partidos nuevos) o 'completo' (todo el historial).
+    """
+    def post(self, request):
+        modo = request.data.get('modo', 'incremental')
+        if modo not in MODOS_ENTRENAMIENTO:
+            return Response(
+                {"error": f"modo debe ser uno de: {', '.join(MODOS_ENTRENAMIENTO)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        usuario = request.user if isinstance(request.user, Usuario) else None
+        job, creado = enqueue_training(modo=modo, usuario=usuario)
+        return Response(
+            {
+                "detail": "Entrenamiento encolado" if creado else "Ya existe un entrenamiento pendiente",
+                "entrenamiento": TrainingJobSerializer(job).data
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class TrainingJobListView(APIView):
+    """Últimos trabajos de entrenamiento con su estado, progreso y accuracy."""
+    def get(self, request):
+        jobs = TrainingJob.objects.order_by('-id')[:20]
+        return Response(TrainingJobSerializer(jobs, many=True).data)
+
+
+class TrainingJobDetailView(APIView):
+    """Estado de un trabajo de entrenamiento."""
+    def get(self, request, pk: int):
+        try:
+            job = TrainingJob.objects.get(pk=pk)
+        except TrainingJob.DoesNotExist:
+            return Response({"error": "Entrenamiento no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(TrainingJobSerializer(job).data)
+
+
+class ModelStatusView(APIView):
+    """
+    Métricas del modelo cargado en este worker: tiempo de carga, antigüedad y recargas.
+    """
+    def get(self, request):
+        return Response(get_registry().metrics())
+
+
+class ModelVersionListView(APIView):
+    """
+    Versiones del modelo guardadas en el registro, con sus metadatos
+    (muestras, accuracy, features, duración del entrenamiento, tamaño).
+    """
+    def get(self, request):
+        registry = get_registry()
+        return Response({
+            "activa": registry.read_active_version(),
+            "versiones": registry.versions()
+        })
+
+
+class ModelVersionActivateView(APIView):
+    """
+    Activa una versión existente. Los workers la cargan en su siguiente request, sin reinicio.
+    """
+    def post(self, request, version):
+        try:
+            get_registry().activate(version)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"detail": f"Versión {version} activada", "activa": version})
+
+
+class ModelRollbackView(APIView):
+    """
+    Vuelve a la versión anterior a la activa.
+    """
+    def post(self, request):
+        try:
+            version = get_registry().rollback()
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"detail": f"Versión {version} activada", "activa": version})
+
+
+class RatingListView(APIView):
+    """
+    Ranking Elo de los equipos (los equipos sin partidos procesados tienen el rating inicial).
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        ratings = {r.IDEquipo_id: r for r in TeamRating.objects.all()}
+        equipos = [
+            {
+                "equipo": {"id": equipo_id, "nombre": nombre},
+                "rating": round(ratings[equipo_id].Rating, 1) if equipo_id in ratings else INITIAL_RATING,
+                "partidos": ratings[equipo_id].PJ if equipo_id in ratings else 0
+            }
+            for equipo_id, nombre in Equipo.objects.values_list('id', 'Nombre')
+        ]
+        equipos.sort(key=lambda e: e["rating"], reverse=True)
+        return Response(equipos)
+
+
+class SimulacionCampeonatoView(APIView):
+    """
+    Simulación Monte Carlo de los partidos pendientes de un campeonato: probabilidad de
+    cada equipo de terminar en cada posición. El resultado se guarda en caché con una
+    clave que cambia al cargar o corregir un resultado del campeonato, al cambiar los
+    ratings o corregirse un resultado de cualquier campeonato, o al activar otro modelo.
+    Parámetros: ?simulaciones=N (por defecto 20000) y ?seed=S opcional.
+    """
+    permission_classes = [AllowAny]
+    DEFAULT_SIMULACIONES = 20000
+    MAX_SIMULACIONES = 200000
+    CACHE_TIMEOUT = 60 * 60
+
+    def get(self, request, pk):
+        try:
+            n_sims = int(request.query_params.get('simulaciones', self.DEFAULT_SIMULACIONES))
+            seed = request.query_params.get('seed')
+            seed = int(seed) if seed not in (None, '') else None
+        except (TypeError, ValueError):
+            return Response({"error": "simulaciones y seed deben ser enteros"}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= n_sims <= self.MAX_SIMULACIONES:
+            return Response(
+                {"error": f"simulaciones debe estar entre 1 y {self.MAX_SIMULACIONES}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        campeonato = Campeonato.objects.filter(pk=pk).values('id', 'Nombre').first()
+        if not campeonato:
+            return Response({"error": "Campeonato no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        cache_key = 'ml:simulacion:{}:{}:{}:{}:{}:{}'.format(
+            pk, n_sims, seed, championship_stamp(pk), results_stamp(), get_registry().read_active_version()
+        )
+        data = cache.get(cache_key)
+        en_cache = data is not None
+        if data is None:
+            data = simulate_championship(pk, n_sims=n_sims, seed=seed)
+            cache.set(cache_key, data, self.CACHE_TIMEOUT)
+
+        return Response(dict(
+            data,
+            campeonato={"id": campeonato['id'], "nombre": campeonato['Nombre']},
+            cache=en_cache
+        ))
+
+
+class PoissonPredictView(APIView):
+    """
+    Predicciones del modelo de goles Poisson (Dixon-Coles): goles esperados, probabilidades
+    local/empate/visita y los marcadores más probables. Acepta un partido (local_id y
+    visit_id) o los mismos parámetros que predecir/lote/; con campeonato_id se predice la
+    temporada completa en un solo cálculo. `matriz: true` agrega la matriz de marcadores.
+    """
+    permission_classes = [AllowAny]
+    MAX_PARTIDOS = 2000
+
+    def post(self, request):
+        modelo = get_poisson_model()
+        if modelo is None:
+            return Response(
+                {"error": "El modelo de goles aún no fue ajustado (python manage.py train_poisson)"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        try:
+            local_id = request.data.get('local_id')
+            visit_id = request.data.get('visit_id')
+            if local_id and visit_id:
+                filas = [(None, int(local_id), int(visit_id))]
+            else:
+                filas = _partidos_solicitados(request.data, self.MAX_PARTIDOS)
+            top = int(request.data.get('marcadores', 5))
+        except (KeyError, TypeError, ValueError):
+            return Response(
+                {"error": "Parámetros inválidos: los identificadores deben ser enteros"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if filas is None:
+            return Response(
+                {"error": "Se requiere local_id y visit_id, fixture_id, campeonato_id o una lista de partidos"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        nombres = _nombres_equipos(filas)
+        if nombres is None:
+            return Response({"error": "Equipo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        predictions = modelo.predict_batch(
+            [(local, visit) for _, local, visit in filas],
+            top=max(top, 0),
+            matrix=bool(request.data.get('matriz', False))
+        )
+        return Response({
+            "total": len(filas),
+            "modelo": {k: modelo.params.get(k) for k in ('trained_at', 'samples', 'home', 'rho', 'xi')},
+            "predicciones": [
+                {
+                    "partido_id": partido_id,
+                    "local": {"id": local, "nombre": nombres[local]},
+                    "visitante": {"id": visit, "nombre": nombres[visit]},
+                    "match": f"{nombres[local]} vs {nombres[visit]}",
+                    "prediction": prediction
+                }
+                for (partido_id, local, visit), prediction in zip(filas, predictions)
+            ]
+        })
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AdmRecursosConfig(AppConfig):
     name = 'adm_recursos'
+
+    def ready(self):
+        # Conecta las señales que mantienen el calendario desnormalizado
+        from . import signals
@@ -0,0 +1,92 @@
+"""
+Calendario de partidos desnormalizado (CalendarioPartido).
+
+Cada partido tiene una fila con fecha, jornada, campeonato, deporte, equipos, instalación
+y marcador ya resueltos, de modo que el calendario se lee con un rango sobre los índices
+de fecha/equipo/instalación sin unir Partido con sus seis tablas relacionadas.
+
+Las filas se recalculan desde Partido (`refresh`) al guardar partidos, resultados y
+jornadas; los cambios de nombre en campeonatos, deportes, equipos e instalaciones se
+copian con un UPDATE (ver signals). Las escrituras masivas (bulk_create/bulk_update) no
+disparan señales: quien las hace llama a `refresh`. `rebuild` regenera toda la tabla.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from deporte_bd.models import CalendarioPartido, Partido
+
+# Campo de CalendarioPartido -> valor leído desde Partido
+SOURCE_FIELDS = {
+    'IDPartido_id': 'id',
+    'Fecha': 'Fecha',
+    'IDFixture': 'IDFixture_id',
+    'Jornada': 'IDFixture__Numero',
+    'IDCampeonato': 'IDFixture__IDCampeonato_id',
+    'Campeonato': 'IDFixture__IDCampeonato__Nombre',
+    'Campeonato_Estado': 'IDFixture__IDCampeonato__Estado',
+    'Deporte': 'IDFixture__IDCampeonato__IDDeporte__Nombre',
+    'IDEquipo_Local': 'IDEquipo_Local_id',
+    'Equipo_Local': 'IDEquipo_Local__Nombre',
+    'Logo_Local': 'IDEquipo_Local__Logo',
+    'IDEquipo_Visitante': 'IDEquipo_Visitante_id',
+    'Equipo_Visitante': 'IDEquipo_Visitante__Nombre',
+    'Logo_Visitante': 'IDEquipo_Visitante__Logo',
+    'IDInstalacion': 'IDInstalacion_id',
+    'Instalacion': 'IDInstalacion__Nombre',
+    'Ubicacion': 'IDInstalacion__Ubicacion',
+    'Goles_Local': 'IDResultado__Goles_Local',
+    'Goles_Visitante': 'IDResultado__Goles_Visitante',
+}
+UPDATE_FIELDS = [field for field in SOURCE_FIELDS if field != 'IDPartido_id']
+
+_state = threading.local()
+
+
+@contextmanager
+def calendario_suspended():
+    """
+    Desactiva la sincronización en el hilo actual (cargas masivas como `poblacion`).
+    Regenerar luego con rebuild_calendario.
+    """
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def _rows(partidos):
+    fields = list(SOURCE_FIELDS)
+    lookups = list(SOURCE_FIELDS.values()) + ['IDFixture__Fecha']
+    for values in partidos.order_by().values_list(*lookups).iterator(chunk_size=2000):
+        row = dict(zip(fields, values))
+        row['Fecha'] = row['Fecha'] or values[-1]
+        yield CalendarioPartido(**row)
+
+
+def refresh(partidos):
+    """
+    Recalcula (insert o update) las filas de los partidos del queryset con una consulta
+    de lectura y un upsert por lote. Devuelve la cantidad de filas escritas.
+    """
+    rows = list(_rows(partidos))
+    if rows:
+        CalendarioPartido.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['IDPartido'],
+            update_fields=UPDATE_FIELDS, batch_size=1000
+        )
+    return len(rows)
+
+
+def rebuild():
+    """Regenera todo el calendario desde Partido."""
+    with transaction.atomic():
+        CalendarioPartido.objects.all().delete()
+        return refresh(Partido.objects.all())
@@ -0,0 +1,14 @@
+import time
+
+from django.core.management.base import BaseCommand
+from adm_recursos.calendario import rebuild
+
+class Command(BaseCommand):
+    help = 'Regenera el calendario desnormalizado (CalendarioPartido) desde los partidos'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Calendario regenerado: {total} partidos en {time.perf_counter() - started:.2f} s"
+        ))
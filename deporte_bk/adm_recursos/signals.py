@@ -0,0 +1,91 @@
+"""
+Mantiene el calendario desnormalizado (CalendarioPartido) al día con las escrituras:
+- Partido, Resultado y Fixture recalculan las filas de sus partidos,
+- Campeonato, Deporte, Equipo e Instalacion copian sus nombres con un UPDATE.
+Eliminar un Partido elimina su fila en cascada.
+"""
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from deporte_bd.models import (
+    CalendarioPartido, Campeonato, Deporte, Equipo, Fixture, Instalacion, Partido, Resultado
+)
+from .calendario import is_suspended, refresh
+
+
+@receiver(post_save, sender=Partido)
+def partido_post_save(sender, instance, raw=False, **kwargs):
+    if raw or is_suspended():
+        return
+    refresh(Partido.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Resultado)
+def resultado_post_save(sender, instance, created=False, raw=False, **kwargs):
+    # Un resultado nuevo aún no está asociado a ningún partido
+    if raw or created or is_suspended():
+        return
+    refresh(Partido.objects.filter(IDResultado_id=instance.pk))
+
+
+@receiver(pre_delete, sender=Resultado)
+def resultado_pre_delete(sender, instance, **kwargs):
+    # El partido pierde la referencia (SET_NULL) sin disparar sus señales
+    instance._partidos_calendario = list(
+        Partido.objects.filter(IDResultado_id=instance.pk).values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Resultado)
+def resultado_post_delete(sender, instance, **kwargs):
+    partidos = getattr(instance, '_partidos_calendario', None)
+    if partidos and not is_suspended():
+        refresh(Partido.objects.filter(pk__in=partidos))
+
+
+@receiver(post_save, sender=Fixture)
+def fixture_post_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created or is_suspended():
+        return
+    refresh(Partido.objects.filter(IDFixture=instance))
+
+
+@receiver(post_save, sender=Campeonato)
+def campeonato_post_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created or is_suspended():
+        return
+    CalendarioPartido.objects.filter(IDCampeonato=instance.pk).update(
+        Campeonato=instance.Nombre,
+        Campeonato_Estado=instance.Estado,
+        Deporte=Deporte.objects.filter(pk=instance.IDDeporte_id).values_list('Nombre', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Deporte)
+def deporte_post_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created or is_suspended():
+        return
+    CalendarioPartido.objects.filter(
+        IDCampeonato__in=Campeonato.objects.filter(IDDeporte=instance).values('id')
+    ).update(Deporte=instance.Nombre)
+
+
+@receiver(post_save, sender=Equipo)
+def equipo_post_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created or is_suspended():
+        return
+    CalendarioPartido.objects.filter(IDEquipo_Local=instance.pk).update(
+        Equipo_Local=instance.Nombre, Logo_Local=instance.Logo
+    )
+    CalendarioPartido.objects.filter(IDEquipo_Visitante=instance.pk).update(
+        Equipo_Visitante=instance.Nombre, Logo_Visitante=instance.Logo
+    )
+
+
+@receiver(post_save, sender=Instalacion)
+def instalacion_post_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created or is_suspended():
+        return
+    CalendarioPartido.objects.filter(IDInstalacion=instance.pk).update(
+        Instalacion=instance.Nombre, Ubicacion=instance.Ubicacion
+    )
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import CategoriaViewSet, InstalacionViewSet, DeporteViewSet
+from .views import CategoriaViewSet, InstalacionViewSet, DeporteViewSet, calendario_controllers
 
 # Explicit routes to avoid DRF router registering the same converter multiple times
 categoria_list = CategoriaViewSet.as_view({'get': 'list', 'post': 'create'})
@@ -18,4 +18,5 @@ urlpatterns = [
     path('instalaciones/<int:pk>/', instalacion_detail, name='instalacion-detail'),
     path('deportes/', deporte_list, name='deporte-list'),
     path('deportes/<int:pk>/', deporte_detail, name='deporte-detail'),
+    path('calendario/', calendario_controllers.as_view(), name='calendario'),
 ]
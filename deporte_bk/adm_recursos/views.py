@@ -1,8 +1,11 @@
 from rest_framework import viewsets, permissions
 from deporte_bd.models import Categoria, Instalacion, Deporte
 from .serializers import CategoriaSerializer, InstalacionSerializer, DeporteSerializer
-from deporte_bd.models import Partido
+from deporte_bd.models import CalendarioPartido
+from deporte_bd.pagination import KeysetPagination, estimated_count
+from deporte_bd.search import matching
 from rest_framework.views import APIView
+from rest_framework.response import Response
 
 class IsAuthenticatedOrReadOnly(permissions.BasePermission):
     """
@@ -40,7 +43,11 @@ class calendario_controllers(APIView):
     permission_classes = [IsAuthenticatedOrReadOnly]  # Requiere autenticación para modificar.
 
     def get(self, request):
-        """Obtener calendario de partidos con filtros opcionales."""
+        """
+        Obtener calendario de partidos con filtros opcionales.
+        Se lee del calendario desnormalizado (CalendarioPartido): un rango sobre sus índices, sin joins.
+        Paginado por cursor con limite / cursor (ver deporte_bd.pagination).
+        """
         from datetime import datetime
         from django.db.models import Q
         
@@ -51,28 +58,21 @@ class calendario_controllers(APIView):
         equipo_param = request.query_params.get('equipo', None)
         instalacion_param = request.query_params.get('instalacion', None)
         
-        # Inicializar consulta de partidos con fixtures que tienen fecha.
-        partidos = Partido.objects.select_related(
-            'IDFixture', 
-            'IDFixture__IDCampeonato',
-            'IDInstalacion', 
-            'IDResultado',
-            'IDEquipo_Local', 
-            'IDEquipo_Visitante'
-        ).filter(IDFixture__Fecha__isnull=False)
+        # Inicializar consulta de partidos con fecha.
+        partidos = CalendarioPartido.objects.filter(Fecha__isnull=False)
 
         # Filtrar por rango de fechas.
         if fecha_inicio_param:
             try:
                 fecha_inicio = datetime.strptime(fecha_inicio_param, '%Y-%m-%d').date()
-                partidos = partidos.filter(IDFixture__Fecha__gte=fecha_inicio)
+                partidos = partidos.filter(Fecha__gte=fecha_inicio)
             except ValueError:
                 pass  # Si el formato es inválido, ignorar el filtro.
 
         if fecha_fin_param:
             try:
                 fecha_fin = datetime.strptime(fecha_fin_param, '%Y-%m-%d').date()
-                partidos = partidos.filter(IDFixture__Fecha__lte=fecha_fin)
+                partidos = partidos.filter(Fecha__lte=fecha_fin)
             except ValueError:
                 pass  # Si el formato es inválido, ignorar el filtro.
 
@@ -80,77 +80,75 @@ class calendario_controllers(APIView):
         if campeonato_param:
             try:
                 campeonato_id = int(campeonato_param)
-                partidos = partidos.filter(IDFixture__IDCampeonato__id=campeonato_id)
+                partidos = partidos.filter(IDCampeonato=campeonato_id)
             except ValueError:
-                # Buscar por nombre del campeonato
-                partidos = partidos.filter(IDFixture__IDCampeonato__Nombre__icontains=campeonato_param)
+                # Buscar por nombre del campeonato (índice de búsqueda)
+                partidos = partidos.filter(IDCampeonato__in=matching('campeonato', campeonato_param))
 
         # Filtrar por equipo (local o visitante).
         if equipo_param:
             try:
                 equipo_id = int(equipo_param)
-                partidos = partidos.filter(
-                    Q(IDEquipo_Local__id=equipo_id) | Q(IDEquipo_Visitante__id=equipo_id)
-                )
+                partidos = partidos.filter(Q(IDEquipo_Local=equipo_id) | Q(IDEquipo_Visitante=equipo_id))
             except ValueError:
-                # Buscar por nombre del equipo
-                partidos = partidos.filter(
-                    Q(IDEquipo_Local__Nombre__icontains=equipo_param) | 
-                    Q(IDEquipo_Visitante__Nombre__icontains=equipo_param)
-                )
+                # Buscar por nombre del equipo (índice de búsqueda)
+                equipos = matching('equipo', equipo_param)
+                partidos = partidos.filter(Q(IDEquipo_Local__in=equipos) | Q(IDEquipo_Visitante__in=equipos))
 
         # Filtrar por instalación.
         if instalacion_param:
             try:
                 instalacion_id = int(instalacion_param)
-                partidos = partidos.filter(IDInstalacion__id=instalacion_id)
+                partidos = partidos.filter(IDInstalacion=instalacion_id)
             except ValueError:
-                # Buscar por nombre de la instalación
-                partidos = partidos.filter(IDInstalacion__Nombre__icontains=instalacion_param)
+                # Buscar por nombre de la instalación (índice de búsqueda)
+                partidos = partidos.filter(IDInstalacion__in=matching('instalacion', instalacion_param))
 
-        # Ordenar por fecha del fixture.
-        partidos = partidos.order_by('IDFixture__Fecha', 'IDFixture__Numero', 'id')
+        # Paginar por cursor, ordenado por fecha y jornada.
+        paginador = KeysetPagination(ordering=('Fecha', 'Jornada', 'IDPartido'))
+        pagina = paginador.paginate_queryset(partidos, request, view=self)
 
         # Construcción de datos para la respuesta.
         datos = []
-        for partido in partidos:
+        for partido in pagina:
             datos.append({
-                'id': partido.id,
-                'IDPartido': partido.id,
-                'fecha': partido.IDFixture.Fecha.isoformat() if partido.IDFixture.Fecha else None,
+                'id': partido.IDPartido_id,
+                'IDPartido': partido.IDPartido_id,
+                'fecha': partido.Fecha.isoformat(),
                 'fixture': {
-                    'id': partido.IDFixture.id,
-                    'numero': partido.IDFixture.Numero,
+                    'id': partido.IDFixture,
+                    'numero': partido.Jornada,
                 },
                 'campeonato': {
-                    'id': partido.IDFixture.IDCampeonato.id,
-                    'nombre': partido.IDFixture.IDCampeonato.Nombre,
-                    'estado': partido.IDFixture.IDCampeonato.Estado,
-                    'deporte': partido.IDFixture.IDCampeonato.IDDeporte.Nombre if partido.IDFixture.IDCampeonato.IDDeporte else None,
+                    'id': partido.IDCampeonato,
+                    'nombre': partido.Campeonato,
+                    'estado': partido.Campeonato_Estado,
+                    'deporte': partido.Deporte,
                 },
                 'equipo_local': {
-                    'id': partido.IDEquipo_Local.id,
-                    'nombre': partido.IDEquipo_Local.Nombre,
-                    'logo': partido.IDEquipo_Local.Logo,
+                    'id': partido.IDEquipo_Local,
+                    'nombre': partido.Equipo_Local,
+                    'logo': partido.Logo_Local,
                 },
                 'equipo_visitante': {
-                    'id': partido.IDEquipo_Visitante.id,
-                    'nombre': partido.IDEquipo_Visitante.Nombre,
-                    'logo': partido.IDEquipo_Visitante.Logo,
+                    'id': partido.IDEquipo_Visitante,
+                    'nombre': partido.Equipo_Visitante,
+                    'logo': partido.Logo_Visitante,
                 },
                 'instalacion': {
-                    'id': partido.IDInstalacion.id,
-                    'nombre': partido.IDInstalacion.Nombre,
-                    'ubicacion': partido.IDInstalacion.Ubicacion,
+                    'id': partido.IDInstalacion,
+                    'nombre': partido.Instalacion,
+                    'ubicacion': partido.Ubicacion,
                 } if partido.IDInstalacion else None,
                 'resultado': {
-                    'goles_local': partido.IDResultado.Goles_Local,
-                    'goles_visitante': partido.IDResultado.Goles_Visitante,
-                } if partido.IDResultado else None,
+                    'goles_local': partido.Goles_Local,
+                    'goles_visitante': partido.Goles_Visitante,
+                } if partido.Goles_Local is not None else None,
             })
 
         # Retornar respuesta con datos y número total de registros.
         return Response({
-            'total': partidos.count(),
+            'total': estimated_count(partidos),
+            'siguiente': paginador.get_next_link(),
             'partidos': datos
         })
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class DeporteBdConfig(AppConfig):
     name = 'deporte_bd'
+
+    def ready(self):
+        # Conecta las señales que invalidan los índices de búsqueda en memoria
+        from . import search
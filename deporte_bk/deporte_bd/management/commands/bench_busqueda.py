@@ -0,0 +1,106 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
+
+from deporte_bd import search
+from deporte_bd.models import Bitacora, Rol, Usuario
+
+NOMBRES = ['Ana', 'Luis', 'María', 'Jorge', 'Lucía', 'Carlos', 'Sofía', 'Diego', 'Valeria', 'Mateo']
+APELLIDOS = ['Gutiérrez', 'Rojas', 'Vargas', 'Mendoza', 'Flores', 'Quispe', 'Mamani', 'Torrez', 'Suárez', 'Aguilera']
+ACCIONES = ['login', 'logout', 'crear', 'editar', 'eliminar']
+PAGINA = 100
+
+
+class Command(BaseCommand):
+    help = 'Mide el filtro por nombre de usuario de la bitácora (icontains con join contra índice de búsqueda) con datos sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=100_000, help='Usuarios sintéticos')
+        parser.add_argument('--bitacora', type=int, default=1_000_000, help='Registros de bitácora sintéticos')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Repeticiones por texto buscado')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Los datos sintéticos se descartan al final (rollback)
+        with transaction.atomic():
+            self._poblar(rng, options['usuarios'], options['bitacora'])
+            try:
+                self._medir(options['repeticiones'])
+            finally:
+                transaction.set_rollback(True)
+                search.reset()
+
+    def _poblar(self, rng, usuarios, registros):
+        rol = Rol.objects.first() or Rol.objects.create(Nombre='Bench')
+        start = time.perf_counter()
+        for inicio in range(0, usuarios, 10_000):
+            Usuario.objects.bulk_create([
+                Usuario(
+                    IDRol=rol,
+                    Nombre=rng.choice(NOMBRES),
+                    Apellido=f'{rng.choice(APELLIDOS)} {i:06d}',
+                    Correo=f'bench{i}@bench.local',
+                    Contrasena='-',
+                )
+                for i in range(inicio, min(inicio + 10_000, usuarios))
+            ])
+        ids = list(Usuario.objects.filter(Correo__endswith='@bench.local').values_list('id', flat=True))
+        ahora = timezone.now()
+        for inicio in range(0, registros, 20_000):
+            Bitacora.objects.bulk_create([
+                Bitacora(
+                    IDUsuario_id=rng.choice(ids),
+                    Accion=rng.choice(ACCIONES),
+                    Fecha=ahora - timedelta(minutes=rng.randrange(365 * 24 * 60)),
+                )
+                for _ in range(inicio, min(inicio + 20_000, registros))
+            ])
+        self.stdout.write(
+            f"{connection.vendor}: {usuarios} usuarios y {registros} registros sintéticos en {time.perf_counter() - start:.1f} s"
+        )
+
+    def _medir(self, repeticiones):
+        search.reset()
+        start = time.perf_counter()
+        if connection.vendor != 'postgresql':
+            search.build_index('usuario')
+            self.stdout.write(f"Índice en memoria de usuarios: {time.perf_counter() - start:.2f} s")
+
+        # Muy selectivo, selectivo y poco selectivo (cae en la subconsulta icontains)
+        terminos = ['012345', 'quispe 00', 'ana']
+        self.stdout.write(f"\n{'texto':>12} {'usuarios':>9} {'icontains (ms)':>15} {'índice (ms)':>12} {'speedup':>8}  iguales")
+        for termino in terminos:
+            antes = Bitacora.objects.filter(
+                Q(IDUsuario__Nombre__icontains=termino) |
+                Q(IDUsuario__Apellido__icontains=termino) |
+                Q(IDUsuario__Correo__icontains=termino)
+            )
+            old_time, old_page = self._pagina(antes, repeticiones)
+
+            start = time.perf_counter()
+            for _ in range(repeticiones):
+                coincidencias = search.matching('usuario', termino)
+                new_page = list(self._ordenar(Bitacora.objects.filter(IDUsuario__in=coincidencias)))
+            new_time = (time.perf_counter() - start) / repeticiones
+
+            cantidad = search._icontains('usuario', termino).count()
+            self.stdout.write(
+                f"{termino:>12} {cantidad:>9} {old_time * 1000:>15.1f} {new_time * 1000:>12.1f} "
+                f"{old_time / new_time:>7.1f}x  {'sí' if old_page == new_page else 'NO'}"
+            )
+
+    def _ordenar(self, queryset):
+        # Primera página de la bitácora, como la devuelve el listado
+        return queryset.order_by('-Fecha', '-id').values_list('id', flat=True)[:PAGINA]
+
+    def _pagina(self, queryset, repeticiones):
+        start = time.perf_counter()
+        for _ in range(repeticiones):
+            pagina = list(self._ordenar(queryset))
+        return (time.perf_counter() - start) / repeticiones, pagina
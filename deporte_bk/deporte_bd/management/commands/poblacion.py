@@ -12,6 +12,9 @@ from django.db import transaction
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 
+from adm_deportiva.standings import recompute_positions, standings_suspended
+from adm_recursos.calendario import calendario_suspended, rebuild as rebuild_calendario
+
 from deporte_bd.models import (
     Rol, Usuario, Organizador, Delegado, Jugador,
     Categoria, Deporte, Instalacion, Equipo,
@@ -33,6 +36,14 @@ class Command(BaseCommand):
     help = 'Importa TODOS los datos del sistema desde archivos CSV'
 
     def handle(self, *args, **options):
+        # Los historiales vienen de los CSV: se suspende la actualización incremental de las tablas.
+        # El calendario se regenera una sola vez al final en lugar de fila por fila.
+        with standings_suspended(), calendario_suspended():
+            self.poblar()
+        total = rebuild_calendario()
+        self.stdout.write(self.style.SUCCESS(f'✓ Calendario: {total} partidos'))
+
+    def poblar(self):
         self.stdout.write(self.style.NOTICE('\n' + '='*70))
         self.stdout.write(self.style.NOTICE('INICIANDO POBLACIÓN COMPLETA DE LA BASE DE DATOS'))
         self.stdout.write(self.style.NOTICE('='*70 + '\n'))
@@ -649,7 +660,8 @@ class Command(BaseCommand):
                     IDFixture=fixture,
                     IDInstalacion=Instalacion.objects.first(),
                     IDEquipo_Local=local,
-                    IDEquipo_Visitante=visitante
+                    IDEquipo_Visitante=visitante,
+                    Fecha=fixture.Fecha
                 )
                 
                 if jugar:
@@ -700,8 +712,9 @@ class Command(BaseCommand):
                     PJ=s['PJ'], PG=s['PG'], PE=s['PE'], PP=s['PP'],
                     GF=s['GF'], GC=s['GC'], DG=s['GF']-s['GC'],
                     Puntos=s['Pts'],
-                    Posicion=0 # Se podría calcular el ranking
+                    Posicion=0
                 )
+        recompute_positions(campeonato.id)
 
     def _update_stats(self, stat, gf, gc):
         stat['PJ'] += 1
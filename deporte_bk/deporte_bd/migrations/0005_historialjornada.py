@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0004_fixture_fecha_fixture_numero_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistorialJornada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('Jornada', models.IntegerField()),
+                ('Tabla', models.JSONField(default=list)),
+                ('Actualizado', models.DateTimeField(auto_now=True)),
+                ('IDCampeonato', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='deporte_bd.campeonato')),
+            ],
+            options={
+                'verbose_name': 'Tabla por Jornada',
+                'verbose_name_plural': 'Tablas por Jornada',
+                'unique_together': {('IDCampeonato', 'Jornada')},
+            },
+        ),
+    ]
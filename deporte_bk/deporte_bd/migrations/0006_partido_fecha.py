@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copiar_fecha_jornada(apps, schema_editor):
+    """Los partidos existentes toman la fecha de su jornada."""
+    Partido = apps.get_model('deporte_bd', 'Partido')
+    Fixture = apps.get_model('deporte_bd', 'Fixture')
+    Partido.objects.filter(Fecha__isnull=True).update(
+        Fecha=Subquery(Fixture.objects.filter(pk=OuterRef('IDFixture_id')).values('Fecha')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0005_historialjornada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partido',
+            name='Fecha',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(copiar_fecha_jornada, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='partido',
+            index=models.Index(fields=['IDInstalacion', 'Fecha'], name='deporte_bd__IDInsta_dd66eb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partido',
+            index=models.Index(fields=['IDEquipo_Local', 'Fecha'], name='deporte_bd__IDEquip_bb4aec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partido',
+            index=models.Index(fields=['IDEquipo_Visitante', 'Fecha'], name='deporte_bd__IDEquip_255c80_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0006_partido_fecha'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarioPartido',
+            fields=[
+                ('IDPartido', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='calendario', serialize=False, to='deporte_bd.partido')),
+                ('Fecha', models.DateField(blank=True, null=True)),
+                ('IDFixture', models.IntegerField()),
+                ('Jornada', models.IntegerField()),
+                ('IDCampeonato', models.IntegerField()),
+                ('Campeonato', models.CharField(max_length=150)),
+                ('Campeonato_Estado', models.CharField(max_length=20)),
+                ('Deporte', models.CharField(blank=True, max_length=100, null=True)),
+                ('IDEquipo_Local', models.IntegerField()),
+                ('Equipo_Local', models.CharField(max_length=100)),
+                ('Logo_Local', models.CharField(blank=True, max_length=255, null=True)),
+                ('IDEquipo_Visitante', models.IntegerField()),
+                ('Equipo_Visitante', models.CharField(max_length=100)),
+                ('Logo_Visitante', models.CharField(blank=True, max_length=255, null=True)),
+                ('IDInstalacion', models.IntegerField(blank=True, null=True)),
+                ('Instalacion', models.CharField(blank=True, max_length=100, null=True)),
+                ('Ubicacion', models.CharField(blank=True, max_length=255, null=True)),
+                ('Goles_Local', models.IntegerField(blank=True, null=True)),
+                ('Goles_Visitante', models.IntegerField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Partido del Calendario',
+                'verbose_name_plural': 'Calendario de Partidos',
+                'indexes': [models.Index(fields=['Fecha', 'Jornada'], name='deporte_bd__Fecha_b07da7_idx'), models.Index(fields=['IDCampeonato', 'Fecha'], name='deporte_bd__IDCampe_acaf06_idx'), models.Index(fields=['IDEquipo_Local', 'Fecha'], name='deporte_bd__IDEquip_15cbcd_idx'), models.Index(fields=['IDEquipo_Visitante', 'Fecha'], name='deporte_bd__IDEquip_2b93f9_idx'), models.Index(fields=['IDInstalacion', 'Fecha'], name='deporte_bd__IDInsta_b35ddd_idx')],
+            },
+        ),
+    ]
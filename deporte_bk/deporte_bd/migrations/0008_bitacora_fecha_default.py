@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0007_calendariopartido'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bitacora',
+            name='Fecha',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
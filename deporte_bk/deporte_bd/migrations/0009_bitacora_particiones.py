@@ -0,0 +1,113 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+
+# Meses de particiones que se crean por delante del actual
+MESES_ADELANTE = 3
+
+
+def _siguiente(anio, mes):
+    return (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def _meses(desde, hasta):
+    """Meses (anio, mes) entre dos meses inclusive."""
+    while desde <= hasta:
+        yield desde
+        desde = _siguiente(*desde)
+
+
+def particionar_bitacora(apps, schema_editor):
+    """
+    PostgreSQL: convierte la bitácora en una tabla particionada por mes (RANGE sobre Fecha),
+    con una partición por mes desde el primer registro hasta MESES_ADELANTE meses después
+    del actual y una partición DEFAULT para lo que no tenga partición propia.
+    La clave primaria pasa a ser (id, Fecha), como exige PostgreSQL; id sigue siendo único
+    por su secuencia. En otros motores no hace nada (quedan los índices sobre Fecha).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    tabla = apps.get_model('deporte_bd', 'Bitacora')._meta.db_table
+    usuarios = apps.get_model('deporte_bd', 'Usuario')._meta.db_table
+    q = schema_editor.quote_name
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN({q("Fecha")}), MAX(id) FROM {q(tabla)}')
+        primero, max_id = cursor.fetchone()
+        ahora = datetime.now(timezone.utc)
+        primero = primero or ahora
+        ultimo = (ahora.year, ahora.month)
+        for _ in range(MESES_ADELANTE):
+            ultimo = _siguiente(*ultimo)
+
+        cursor.execute(f'ALTER TABLE {q(tabla)} RENAME TO {q(tabla + "_anterior")}')
+        cursor.execute(
+            f'CREATE TABLE {q(tabla)} (LIKE {q(tabla + "_anterior")} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({q("Fecha")})'
+        )
+        cursor.execute(f'ALTER TABLE {q(tabla)} ALTER COLUMN id DROP DEFAULT')
+        cursor.execute(f'ALTER TABLE {q(tabla)} ADD PRIMARY KEY (id, {q("Fecha")})')
+        cursor.execute(
+            f'ALTER TABLE {q(tabla)} ADD CONSTRAINT {q(tabla + "_IDUsuario_id_fk")} '
+            f'FOREIGN KEY ({q("IDUsuario_id")}) REFERENCES {q(usuarios)} (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+        for anio, mes in _meses((primero.year, primero.month), ultimo):
+            fin = _siguiente(anio, mes)
+            cursor.execute(
+                f'CREATE TABLE {q(f"{tabla}_p{anio}{mes:02d}")} PARTITION OF {q(tabla)} '
+                f"FOR VALUES FROM ('{anio}-{mes:02d}-01 00:00:00+00') TO ('{fin[0]}-{fin[1]:02d}-01 00:00:00+00')"
+            )
+        cursor.execute(f'CREATE TABLE {q(tabla + "_pdefault")} PARTITION OF {q(tabla)} DEFAULT')
+
+        cursor.execute(f'INSERT INTO {q(tabla)} SELECT * FROM {q(tabla + "_anterior")}')
+        cursor.execute(f'DROP TABLE {q(tabla + "_anterior")}')
+
+        secuencia = f'{tabla}_id_seq'
+        cursor.execute(f'CREATE SEQUENCE {q(secuencia)} OWNED BY {q(tabla)}.id')
+        cursor.execute(f"ALTER TABLE {q(tabla)} ALTER COLUMN id SET DEFAULT nextval('{secuencia}')")
+        cursor.execute("SELECT setval(%s, %s, false)", [secuencia, (max_id or 0) + 1])
+
+
+def desparticionar_bitacora(apps, schema_editor):
+    """Vuelve a una tabla simple con clave primaria id (sólo PostgreSQL)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    tabla = apps.get_model('deporte_bd', 'Bitacora')._meta.db_table
+    usuarios = apps.get_model('deporte_bd', 'Usuario')._meta.db_table
+    q = schema_editor.quote_name
+    secuencia = f'{tabla}_id_seq'
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'ALTER SEQUENCE {q(secuencia)} OWNED BY NONE')
+        cursor.execute(f'ALTER TABLE {q(tabla)} RENAME TO {q(tabla + "_particionada")}')
+        cursor.execute(f'CREATE TABLE {q(tabla)} (LIKE {q(tabla + "_particionada")} INCLUDING DEFAULTS)')
+        cursor.execute(f'ALTER TABLE {q(tabla)} ADD PRIMARY KEY (id)')
+        cursor.execute(f'INSERT INTO {q(tabla)} SELECT * FROM {q(tabla + "_particionada")}')
+        cursor.execute(f'DROP TABLE {q(tabla + "_particionada")} CASCADE')
+        cursor.execute(f'ALTER SEQUENCE {q(secuencia)} OWNED BY {q(tabla)}.id')
+        cursor.execute(
+            f'ALTER TABLE {q(tabla)} ADD CONSTRAINT {q(tabla + "_IDUsuario_id_fk")} '
+            f'FOREIGN KEY ({q("IDUsuario_id")}) REFERENCES {q(usuarios)} (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+        cursor.execute(f'CREATE INDEX {q(tabla + "_IDUsuario_id_idx")} ON {q(tabla)} ({q("IDUsuario_id")})')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0008_bitacora_fecha_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(particionar_bitacora, desparticionar_bitacora),
+        migrations.AddIndex(
+            model_name='bitacora',
+            index=models.Index(fields=['Fecha', 'id'], name='deporte_bd__Fecha_bcb5ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bitacora',
+            index=models.Index(fields=['IDUsuario', 'Fecha'], name='deporte_bd__IDUsuar_f20ba7_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from django.db import migrations
+
+# (modelo, campo) con índice de trigramas para las búsquedas icontains (ver deporte_bd.search)
+CAMPOS = [
+    ('Usuario', 'Nombre'),
+    ('Usuario', 'Apellido'),
+    ('Usuario', 'Correo'),
+    ('Campeonato', 'Nombre'),
+    ('Equipo', 'Nombre'),
+    ('Instalacion', 'Nombre'),
+    ('Bitacora', 'Accion'),
+]
+
+
+def _indice(tabla, campo):
+    return f'{tabla}_{campo.lower()}_trgm'
+
+
+def crear_indices(apps, schema_editor):
+    """
+    PostgreSQL: índices GIN pg_trgm sobre UPPER(campo::text), la expresión que genera
+    icontains, para que las búsquedas por subcadena no recorran la tabla.
+    En otros motores no hace nada (deporte_bd.search usa un índice en memoria).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    q = schema_editor.quote_name
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for modelo, campo in CAMPOS:
+        tabla = apps.get_model('deporte_bd', modelo)._meta.db_table
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {q(_indice(tabla, campo))} ON {q(tabla)} '
+            f'USING gin ((UPPER({q(campo)}::text)) gin_trgm_ops)'
+        )
+
+
+def eliminar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for modelo, campo in CAMPOS:
+        tabla = apps.get_model('deporte_bd', modelo)._meta.db_table
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(_indice(tabla, campo))}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0009_bitacora_particiones'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
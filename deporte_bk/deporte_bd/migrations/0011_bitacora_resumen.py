@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0010_busqueda_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BitacoraResumen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('Periodo', models.CharField(choices=[('hora', 'Hora'), ('dia', 'Día')], max_length=4)),
+                ('Inicio', models.DateTimeField()),
+                ('Accion', models.CharField(max_length=100)),
+                ('IDRol', models.IntegerField()),
+                ('Cantidad', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumen de Bitácora',
+                'verbose_name_plural': 'Resúmenes de Bitácora',
+                'constraints': [models.UniqueConstraint(fields=('Periodo', 'Inicio', 'Accion', 'IDRol'), name='bitacora_resumen_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BitacoraResumenUsuario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('Dia', models.DateTimeField()),
+                ('IDUsuario', models.IntegerField()),
+                ('Accion', models.CharField(max_length=100)),
+                ('Cantidad', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumen de Bitácora por Usuario',
+                'verbose_name_plural': 'Resúmenes de Bitácora por Usuario',
+                'indexes': [models.Index(fields=['Dia', 'Accion'], name='deporte_bd__Dia_1029d4_idx')],
+                'constraints': [models.UniqueConstraint(fields=('Dia', 'IDUsuario', 'Accion'), name='bitacora_resumen_usuario_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0011_bitacora_resumen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBusqueda',
+            fields=[
+                ('Nombre', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('Version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Índice de Búsqueda',
+                'verbose_name_plural': 'Índices de Búsqueda',
+            },
+        ),
+    ]
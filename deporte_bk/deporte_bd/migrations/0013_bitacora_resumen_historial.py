@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from datetime import timezone
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Trunc
+
+# Período de BitacoraResumen -> tipo de truncado (ver reportes.resumen.PERIODS)
+PERIODOS = {'hora': 'hour', 'dia': 'day'}
+
+
+def cargar_resumen(apps, schema_editor):
+    """
+    Calcula los resúmenes de la bitácora con los registros existentes: sin esto el
+    endpoint de resumen sólo vería los eventos escritos después del deploy.
+    Es lo mismo que `manage.py rebuild_resumen_bitacora`, con los modelos históricos.
+    """
+    Bitacora = apps.get_model('deporte_bd', 'Bitacora')
+    BitacoraResumen = apps.get_model('deporte_bd', 'BitacoraResumen')
+    BitacoraResumenUsuario = apps.get_model('deporte_bd', 'BitacoraResumenUsuario')
+    BitacoraResumen.objects.all().delete()
+    BitacoraResumenUsuario.objects.all().delete()
+
+    for periodo, kind in PERIODOS.items():
+        conteos = (
+            Bitacora.objects.annotate(inicio=Trunc('Fecha', kind, tzinfo=timezone.utc))
+            .values_list('inicio', 'Accion', 'IDUsuario__IDRol_id')
+            .annotate(cantidad=Count('id'))
+            .order_by()
+        )
+        BitacoraResumen.objects.bulk_create((
+            BitacoraResumen(Periodo=periodo, Inicio=inicio, Accion=accion, IDRol=rol, Cantidad=cantidad)
+            for inicio, accion, rol, cantidad in conteos.iterator(chunk_size=5000)
+        ), batch_size=1000)
+
+    conteos = (
+        Bitacora.objects.annotate(dia=Trunc('Fecha', 'day', tzinfo=timezone.utc))
+        .values_list('dia', 'IDUsuario_id', 'Accion')
+        .annotate(cantidad=Count('id'))
+        .order_by()
+    )
+    BitacoraResumenUsuario.objects.bulk_create((
+        BitacoraResumenUsuario(Dia=dia, IDUsuario=usuario, Accion=accion, Cantidad=cantidad)
+        for dia, usuario, accion, cantidad in conteos.iterator(chunk_size=5000)
+    ), batch_size=1000)
+
+
+def vaciar_resumen(apps, schema_editor):
+    apps.get_model('deporte_bd', 'BitacoraResumen').objects.all().delete()
+    apps.get_model('deporte_bd', 'BitacoraResumenUsuario').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0012_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.RunPython(cargar_resumen, vaciar_resumen),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deporte_bd', '0013_bitacora_resumen_historial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bitacora',
+            name='IDRol',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User # Si quieres usar el User de Django, si no, usa una clase Usuario personalizada.
 # Para este ejemplo, vamos a definir una clase Usuario personalizada que hereda de models.Model para simplificar.
 
@@ -162,6 +163,25 @@ class Historial(models.Model):
         verbose_name = "Historial del Campeonato"
         verbose_name_plural = "Historiales de Campeonatos"
 
+class HistorialJornada(models.Model):
+    """
+    Tabla de posiciones acumulada de un campeonato al cierre de una jornada (Fixture.Numero).
+    Tabla: [[IDEquipo, Puntos, PJ, PG, PE, PP, GF, GC, DG], ...] en orden de posición.
+    Se mantiene de forma incremental desde adm_deportiva.standings.
+    """
+    IDCampeonato = models.ForeignKey(Campeonato, on_delete=models.CASCADE)
+    Jornada = models.IntegerField()
+    Tabla = models.JSONField(default=list)
+    Actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (('IDCampeonato', 'Jornada'),)
+        verbose_name = "Tabla por Jornada"
+        verbose_name_plural = "Tablas por Jornada"
+
+    def __str__(self):
+        return f"Tabla {self.IDCampeonato_id} - Jornada {self.Jornada}"
+
 class Fixture(models.Model):
     # IDFixture SERIAL PRIMARY KEY
     IDCampeonato = models.ForeignKey(Campeonato, on_delete=models.CASCADE) # Varios Fixtures (Jornadas) por Campeonato
@@ -186,10 +206,58 @@ class Partido(models.Model):
     IDResultado = models.OneToOneField(Resultado, on_delete=models.SET_NULL, null=True, blank=True)
     IDEquipo_Local = models.ForeignKey(Equipo, on_delete=models.PROTECT, related_name='partidos_local')
     IDEquipo_Visitante = models.ForeignKey(Equipo, on_delete=models.PROTECT, related_name='partidos_visitante')
+    Fecha = models.DateField(blank=True, null=True) # Día del partido (dentro de su jornada)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['IDInstalacion', 'Fecha']),
+            models.Index(fields=['IDEquipo_Local', 'Fecha']),
+            models.Index(fields=['IDEquipo_Visitante', 'Fecha']),
+        ]
 
     def __str__(self):
         return f"{self.IDEquipo_Local.Nombre} vs {self.IDEquipo_Visitante.Nombre}"
 
+class CalendarioPartido(models.Model):
+    """
+    Calendario desnormalizado: una fila por partido con todo lo que muestra el calendario
+    (fecha, jornada, campeonato, deporte, equipos, instalación y marcador), para consultar
+    rangos de fechas sin joins. Se mantiene desde adm_recursos.calendario.
+    """
+    IDPartido = models.OneToOneField(Partido, on_delete=models.CASCADE, primary_key=True, related_name='calendario')
+    Fecha = models.DateField(blank=True, null=True) # Partido.Fecha o, si no tiene, la de su jornada
+    IDFixture = models.IntegerField()
+    Jornada = models.IntegerField()
+    IDCampeonato = models.IntegerField()
+    Campeonato = models.CharField(max_length=150)
+    Campeonato_Estado = models.CharField(max_length=20)
+    Deporte = models.CharField(max_length=100, blank=True, null=True)
+    IDEquipo_Local = models.IntegerField()
+    Equipo_Local = models.CharField(max_length=100)
+    Logo_Local = models.CharField(max_length=255, blank=True, null=True)
+    IDEquipo_Visitante = models.IntegerField()
+    Equipo_Visitante = models.CharField(max_length=100)
+    Logo_Visitante = models.CharField(max_length=255, blank=True, null=True)
+    IDInstalacion = models.IntegerField(blank=True, null=True)
+    Instalacion = models.CharField(max_length=100, blank=True, null=True)
+    Ubicacion = models.CharField(max_length=255, blank=True, null=True)
+    Goles_Local = models.IntegerField(blank=True, null=True) # Sin resultado: null
+    Goles_Visitante = models.IntegerField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['Fecha', 'Jornada']),
+            models.Index(fields=['IDCampeonato', 'Fecha']),
+            models.Index(fields=['IDEquipo_Local', 'Fecha']),
+            models.Index(fields=['IDEquipo_Visitante', 'Fecha']),
+            models.Index(fields=['IDInstalacion', 'Fecha']),
+        ]
+        verbose_name = "Partido del Calendario"
+        verbose_name_plural = "Calendario de Partidos"
+
+    def __str__(self):
+        return f"{self.Fecha} {self.Equipo_Local} vs {self.Equipo_Visitante}"
+
 class Incidencia(models.Model):
     # IDIncidencia SERIAL PRIMARY KEY
     IDPartido = models.ForeignKey(Partido, on_delete=models.CASCADE)
@@ -205,12 +273,83 @@ class Bitacora(models.Model):
     """Registro de eventos de autenticación y acciones de usuarios."""
     IDUsuario = models.ForeignKey(Usuario, on_delete=models.CASCADE)
     Accion = models.CharField(max_length=100)  # Ej: 'login', 'logout'
-    Fecha = models.DateTimeField(auto_now_add=True)
+    Fecha = models.DateTimeField(default=timezone.now)  # Momento del evento (la escritura puede ser diferida)
     Detalle = models.TextField(blank=True, null=True)
+    # Rol del usuario al guardar el evento (los resúmenes por rol usan éste, no el rol actual)
+    IDRol = models.IntegerField(blank=True, null=True)
 
     class Meta:
         verbose_name = 'Bitácora'
         verbose_name_plural = 'Bitácoras'
+        # En PostgreSQL la tabla está particionada por mes sobre Fecha (migración 0009)
+        indexes = [
+            models.Index(fields=['Fecha', 'id']),
+            models.Index(fields=['IDUsuario', 'Fecha']),
+        ]
+
+    def __str__(self):
+        return f"{self.IDUsuario.Correo} - {self.Accion} @ {self.Fecha}"
+
+class BitacoraResumen(models.Model):
+    """
+    Conteo de eventos de Bitacora por período (hora o día), acción y rol del usuario.
+    Se actualiza al escribir cada lote de la bitácora (ver reportes.resumen) y se conserva
+    aunque los registros se archiven.
+    """
+    PERIODO_CHOICES = [
+        ('hora', 'Hora'),
+        ('dia', 'Día'),
+    ]
+    Periodo = models.CharField(max_length=4, choices=PERIODO_CHOICES)
+    Inicio = models.DateTimeField()  # Inicio de la hora o del día (UTC)
+    Accion = models.CharField(max_length=100)
+    IDRol = models.IntegerField()
+    Cantidad = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['Periodo', 'Inicio', 'Accion', 'IDRol'], name='bitacora_resumen_unico'),
+        ]
+        verbose_name = 'Resumen de Bitácora'
+        verbose_name_plural = 'Resúmenes de Bitácora'
+
+    def __str__(self):
+        return f"{self.Periodo} {self.Inicio} {self.Accion} (rol {self.IDRol}): {self.Cantidad}"
+
+
+class BitacoraResumenUsuario(models.Model):
+    """Conteo diario de eventos de Bitacora por usuario y acción (ranking de usuarios)."""
+    Dia = models.DateTimeField()  # Inicio del día (UTC)
+    IDUsuario = models.IntegerField()
+    Accion = models.CharField(max_length=100)
+    Cantidad = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['Dia', 'IDUsuario', 'Accion'], name='bitacora_resumen_usuario_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['Dia', 'Accion']),
+        ]
+        verbose_name = 'Resumen de Bitácora por Usuario'
+        verbose_name_plural = 'Resúmenes de Bitácora por Usuario'
+
+    def __str__(self):
+        return f"{self.Dia} usuario {self.IDUsuario} {self.Accion}: {self.Cantidad}"
+
+
+class IndiceBusqueda(models.Model):
+    """
+    Versión de los datos de cada índice de búsqueda en memoria (ver deporte_bd.search).
+    Se incrementa al confirmar un cambio en los nombres indexados, de modo que todos
+    los procesos detectan que su índice quedó viejo.
+    """
+    Nombre = models.CharField(max_length=30, primary_key=True)  # 'usuario', 'equipo', ...
+    Version = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Índice de Búsqueda'
+        verbose_name_plural = 'Índices de Búsqueda'
 
     def __str__(self):
-        return f"{self.IDUsuario.Correo} - {self.Accion} @ {self.Fecha}"
\ No newline at end of file
+        return f"{self.Nombre} v{self.Version}"
@@ -0,0 +1,174 @@
+"""
+Paginación por cursor (keyset) compartida por los listados.
+
+En lugar de OFFSET, cada página continúa desde los valores de orden de la última fila
+de la anterior (p. ej. Fecha e id): la consulta es un rango sobre el índice y cuesta
+lo mismo en la primera página que en la página diez mil. El cursor es esa tupla de
+valores codificada en base64.
+
+- `limite`: filas por página (DEFAULT_PAGE_SIZE si no se envía, máximo MAX_PAGE_SIZE);
+  `cursor`: página siguiente. Todos los listados paginan siempre, también sin parámetros.
+- Todos responden {'total', 'siguiente', <filas>}: los ViewSets con la clave 'resultados',
+  los controladores con la suya ('logs', 'partidos', ...). 'siguiente' es None en la
+  última página.
+- El orden lo define la vista con `cursor_ordering` (campos no nulos del modelo,
+  con '-' para descendente); el último campo debe ser único (normalmente 'id').
+- El total nunca es un COUNT por request: en PostgreSQL sin filtros se usa la estimación
+  del planificador (pg_class.reltuples), y en otro caso un COUNT cacheado
+  COUNT_CACHE_TIMEOUT segundos por consulta.
+"""
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+COUNT_CACHE_TIMEOUT = 60
+# Por debajo de esta cantidad se cuenta exacto aunque haya estimación
+ESTIMATE_THRESHOLD = 100000
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Como DjangoJSONEncoder pero sin truncar las fechas a milisegundos (el cursor debe ser exacto)."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def estimated_count(queryset):
+    """Total de filas del queryset sin contar en cada request (ver docstring del módulo)."""
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= ESTIMATE_THRESHOLD:
+            return row[0]
+
+    sql, params = queryset.query.sql_with_params()
+    key = 'paginacion:total:' + hashlib.sha1(f'{sql}|{params}'.encode()).hexdigest()
+    return cache.get_or_set(key, queryset.count, COUNT_CACHE_TIMEOUT)
+
+
+class KeysetPagination(BasePagination):
+    """Paginación keyset de todos los listados (DEFAULT_PAGINATION_CLASS y controladores)."""
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limite'
+    page_size = DEFAULT_PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+    ordering = ('id',)
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        self.next_cursor = None
+        self.request = None
+        self.total_queryset = None
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def _fields(self, model):
+        return [
+            (model._meta.get_field(name.lstrip('-')), name.startswith('-'))
+            for name in self.ordering
+        ]
+
+    def encode_cursor(self, values):
+        raw = json.dumps(values, cls=CursorEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, fields):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [field.to_python(value) for (field, _), value in zip(fields, values)]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            raise NotFound('Cursor inválido')
+
+    def _after(self, fields, values):
+        """Filas posteriores a `values` en el orden dado: (a > x) o (a = x y b > y) o ..."""
+        condition, equal = Q(), Q()
+        for (field, descending), value in zip(fields, values):
+            condition |= equal & Q(**{f"{field.name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{field.name: value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.next_cursor = None
+
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering:
+            self.ordering = tuple(ordering)
+        fields = self._fields(queryset.model)
+        self.total_queryset = queryset
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self._after(fields, self.decode_cursor(cursor, fields)))
+
+        size = self.get_page_size(request)
+        page = list(queryset[:size + 1])
+        if len(page) > size:
+            page = page[:size]
+            last = page[-1]
+            self.next_cursor = self.encode_cursor([getattr(last, field.attname) for field, _ in fields])
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'total': estimated_count(self.total_queryset),
+            'siguiente': self.get_next_link(),
+            'resultados': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['total', 'siguiente', 'resultados'],
+            'properties': {
+                'siguiente': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'total': {'type': 'integer'},
+                'resultados': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Cursor de la página siguiente', 'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': f'Filas por página (máximo {self.max_page_size})', 'schema': {'type': 'integer'}},
+        ]
+
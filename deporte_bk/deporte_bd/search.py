@@ -0,0 +1,205 @@
+"""
+Búsqueda por subcadena (sin distinguir mayúsculas) sobre los nombres que usan los filtros
+de texto: usuarios, campeonatos, equipos e instalaciones.
+
+Los filtros no unen la tabla grande (Bitacora, Partido, ...) con la de nombres para hacer
+`icontains` fila por fila: primero resuelven qué ids coinciden con `matching(...)` y luego
+filtran la tabla grande por su clave foránea indexada (`IDUsuario__in=...`).
+
+- PostgreSQL: índices GIN pg_trgm sobre UPPER(campo::text) (migración 0010). Es la misma
+  expresión que genera icontains, así que el `UPPER(campo) LIKE UPPER('%texto%')` usa el
+  índice; `matching` devuelve la subconsulta sin materializarla.
+- Otros motores (SQLite): índice de trigramas en memoria por proceso (NgramIndex). Se toma
+  la lista del trigrama menos frecuente del texto y se verifica cada candidato, en lugar
+  de recorrer la tabla.
+
+El resultado es siempre el mismo que el de icontains en el mismo motor. El LIKE de SQLite
+sólo ignora mayúsculas ASCII, así que el índice pliega sólo A-Z (`_fold`): 'JOSÉ' coincide
+con 'josÉ' pero no con 'josé', igual que icontains, y el resultado no depende de si la
+búsqueda usó el índice o la subconsulta. Cada índice guarda la marca de los
+datos con los que se construyó: la versión de IndiceBusqueda (se incrementa al confirmar
+un guardado o borrado en cualquier proceso) y el id máximo (cubre los bulk_create). Si
+la marca actual es otra, la búsqueda usa la subconsulta icontains y el índice se
+reconstruye en un hilo aparte, fuera del request. Las escrituras masivas que no disparan
+señales y modifican filas existentes (queryset.update) deben llamar a `invalidate`.
+
+Si el texto coincide con demasiadas filas (MAX_IDS) también se devuelve la subconsulta:
+con un texto poco selectivo recorrer la tabla es lo adecuado.
+"""
+import string
+import threading
+from array import array
+
+from django.db import connection, transaction
+from django.db.models import F, Max, Q
+from django.db.models.signals import post_delete, post_save
+
+from deporte_bd.models import Campeonato, Equipo, IndiceBusqueda, Instalacion, Usuario
+
+# Nombre -> (modelo, campos en los que se busca)
+SEARCH_FIELDS = {
+    'usuario': (Usuario, ('Nombre', 'Apellido', 'Correo')),
+    'campeonato': (Campeonato, ('Nombre',)),
+    'equipo': (Equipo, ('Nombre',)),
+    'instalacion': (Instalacion, ('Nombre',)),
+}
+GRAM = 3
+MAX_IDS = 5000
+# Separa los campos en el texto indexado: ninguna búsqueda lo contiene
+SEPARATOR = '\x00'
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _fold(text):
+    """Minúsculas sólo para A-Z, como la comparación de LIKE en SQLite."""
+    return text.translate(_ASCII_LOWER)
+
+
+def _text(values):
+    return SEPARATOR.join(_fold(value or '') for value in values)
+
+
+def _grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class NgramIndex:
+    """
+    Índice invertido trigrama -> ids, con el texto de cada fila para verificar.
+    No se modifica después de construido (las búsquedas no necesitan lock).
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.texts = {}
+        self.postings = {}
+        self.stamp = None
+
+    def build(self, stamp):
+        texts, postings = {}, {}
+        for pk, *values in self.model.objects.values_list('pk', *self.fields).iterator(chunk_size=5000):
+            text = texts[pk] = _text(values)
+            for gram in _grams(text):
+                postings.setdefault(gram, []).append(pk)
+        self.texts = texts
+        self.postings = {gram: array('q', ids) for gram, ids in postings.items()}
+        self.stamp = stamp
+
+    def search(self, term):
+        term = _fold(term)
+        texts = self.texts
+        if len(term) < GRAM:
+            candidates = texts
+        else:
+            grams = _grams(term)
+            if any(gram not in self.postings for gram in grams):
+                return []
+            candidates = min((self.postings[gram] for gram in grams), key=len)
+        return sorted(pk for pk in candidates if term in texts[pk])
+
+
+_indexes = {}
+_building = set()
+_lock = threading.Lock()
+
+
+def stamp(nombre):
+    """Marca actual de los datos de `nombre`: (versión, id máximo)."""
+    model, _ = SEARCH_FIELDS[nombre]
+    version = IndiceBusqueda.objects.filter(Nombre=nombre).values_list('Version', flat=True).first()
+    return version or 0, model.objects.aggregate(maximo=Max('pk'))['maximo']
+
+
+def build_index(nombre):
+    """Construye el índice de `nombre` en este hilo y lo publica."""
+    model, fields = SEARCH_FIELDS[nombre]
+    index = NgramIndex(model, fields)
+    # La marca se lee antes que los datos: un cambio confirmado durante la construcción
+    # deja el índice con una marca vieja y se vuelve a construir
+    index.build(stamp(nombre))
+    with _lock:
+        _indexes[nombre] = index
+    return index
+
+
+def _rebuild(nombre):
+    try:
+        build_index(nombre)
+    except Exception as e:
+        print(f"Búsqueda: no se pudo construir el índice '{nombre}' ({e})")
+    finally:
+        with _lock:
+            _building.discard(nombre)
+        connection.close()
+
+
+def _schedule_rebuild(nombre):
+    with _lock:
+        if nombre in _building:
+            return
+        _building.add(nombre)
+    threading.Thread(target=_rebuild, args=(nombre,), name=f'busqueda-{nombre}', daemon=True).start()
+
+
+def get_index(nombre):
+    """Índice de `nombre` si está al día con los datos; si no, None (y se reconstruye aparte)."""
+    index = _indexes.get(nombre)
+    if index is not None and index.stamp == stamp(nombre):
+        return index
+    _schedule_rebuild(nombre)
+    return None
+
+
+def _bump(nombre):
+    if not IndiceBusqueda.objects.filter(Nombre=nombre).update(Version=F('Version') + 1):
+        IndiceBusqueda.objects.get_or_create(Nombre=nombre, defaults={'Version': 1})
+
+
+def invalidate(nombre):
+    """Marca el índice de `nombre` como viejo en todos los procesos (al confirmar la transacción)."""
+    transaction.on_commit(lambda: _bump(nombre))
+
+
+def _on_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for nombre, (model, _) in SEARCH_FIELDS.items():
+        if model is sender:
+            invalidate(nombre)
+
+
+for _nombre, (_model, _) in SEARCH_FIELDS.items():
+    post_save.connect(_on_change, sender=_model, dispatch_uid=f'search-{_nombre}-save')
+    post_delete.connect(_on_change, sender=_model, dispatch_uid=f'search-{_nombre}-delete')
+
+
+def reset():
+    """Descarta los índices en memoria (se reconstruyen en la próxima búsqueda)."""
+    with _lock:
+        _indexes.clear()
+
+
+def _icontains(nombre, term):
+    model, fields = SEARCH_FIELDS[nombre]
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': term})
+    return model.objects.filter(condition).values('pk')
+
+
+def matching(nombre, term):
+    """
+    Ids de `nombre` ('usuario', 'campeonato', 'equipo', 'instalacion') con algún campo que
+    contiene `term`, para usar en un filtro `__in`: subconsulta (PostgreSQL, índice viejo
+    o texto poco selectivo) o lista de ids (índice en memoria al día).
+    """
+    if connection.vendor == 'postgresql':
+        return _icontains(nombre, term)
+    index = get_index(nombre)
+    if index is None:
+        return _icontains(nombre, term)
+    ids = index.search(term)
+    if len(ids) > MAX_IDS:
+        return _icontains(nombre, term)
+    return ids
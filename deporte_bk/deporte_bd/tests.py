@@ -1,3 +1,121 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
 from django.test import TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from . import search
+from .models import Bitacora, Rol, Usuario
+from .pagination import KeysetPagination
+
+factory = APIRequestFactory()
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(Nombre='Test')
+        cls.usuario = Usuario.objects.create(
+            IDRol=rol, Nombre='Ana', Apellido='Test', Correo='ana@test.local', Contrasena='-'
+        )
+        inicio = datetime(2026, 3, 1, 12, 0, 0, 123456, tzinfo=dt_timezone.utc)
+        # Fechas repetidas de a tres: el desempate por id decide el orden dentro de cada grupo
+        Bitacora.objects.bulk_create([
+            Bitacora(IDUsuario=cls.usuario, Accion='login', Fecha=inicio + timedelta(minutes=i // 3))
+            for i in range(25)
+        ])
+
+    def paginar(self, queryset, ordering, **params):
+        paginator = KeysetPagination(ordering=ordering)
+        request = Request(factory.get('/logs/', params))
+        return paginator, paginator.paginate_queryset(queryset, request)
+
+    def recorrer(self, ordering, limite):
+        """Ids de todas las páginas, siguiendo el cursor de cada una."""
+        ids, cursor = [], None
+        while True:
+            params = {'limite': limite, **({'cursor': cursor} if cursor else {})}
+            paginator, page = self.paginar(Bitacora.objects.all(), ordering, **params)
+            self.assertLessEqual(len(page), limite)
+            ids += [log.id for log in page]
+            cursor = paginator.next_cursor
+            if cursor is None:
+                return ids
+
+    def test_walk_matches_offset_ordering(self):
+        for ordering in (('id',), ('-Fecha', '-id'), ('Fecha', '-id'), ('-Fecha', 'id')):
+            esperado = list(Bitacora.objects.order_by(*ordering).values_list('id', flat=True))
+            for limite in (1, 4, 7, 25, 100):
+                with self.subTest(ordering=ordering, limite=limite):
+                    self.assertEqual(self.recorrer(ordering, limite), esperado)
+
+    def test_after_builds_lexicographic_condition(self):
+        paginator = KeysetPagination(ordering=('-Fecha', 'id'))
+        fields = paginator._fields(Bitacora)
+        pivote = Bitacora.objects.order_by('-Fecha', 'id')[10]
+        esperado = list(Bitacora.objects.order_by('-Fecha', 'id').values_list('id', flat=True))[11:]
+        despues = Bitacora.objects.filter(paginator._after(fields, [pivote.Fecha, pivote.id]))
+        self.assertEqual(list(despues.order_by('-Fecha', 'id').values_list('id', flat=True)), esperado)
+
+    def test_cursor_keeps_microseconds(self):
+        paginator = KeysetPagination(ordering=('-Fecha', '-id'))
+        fields = paginator._fields(Bitacora)
+        log = Bitacora.objects.order_by('-Fecha', '-id').first()
+        cursor = paginator.encode_cursor([log.Fecha, log.id])
+        self.assertEqual(paginator.decode_cursor(cursor, fields), [log.Fecha, log.id])
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPagination(ordering=('-Fecha', '-id'))
+        fields = paginator._fields(Bitacora)
+        for cursor in ('no-es-base64!', paginator.encode_cursor([1]), paginator.encode_cursor(['x', 1])):
+            with self.subTest(cursor=cursor), self.assertRaises(NotFound):
+                paginator.decode_cursor(cursor, fields)
+
+    def test_page_size_is_clamped(self):
+        paginator = KeysetPagination()
+        for limite, esperado in (('0', 1), ('50', 50), ('5000', paginator.max_page_size), ('x', paginator.page_size)):
+            with self.subTest(limite=limite):
+                self.assertEqual(paginator.get_page_size(Request(factory.get('/', {'limite': limite}))), esperado)
+
+    def test_response_shape(self):
+        paginator, page = self.paginar(Bitacora.objects.all(), ('id',), limite=10)
+        response = paginator.get_paginated_response([log.id for log in page])
+        self.assertEqual(list(response.data), ['total', 'siguiente', 'resultados'])
+        self.assertEqual(response.data['total'], 25)
+        self.assertIn('cursor=', response.data['siguiente'])
+
+        paginator, page = self.paginar(Bitacora.objects.all(), ('id',), limite=25)
+        self.assertIsNone(paginator.get_paginated_response([]).data['siguiente'])
+
+
+class SearchTests(TestCase):
+    """El índice en memoria devuelve lo mismo que icontains (SQLite)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(Nombre='Test')
+        nombres = [
+            ('José', 'Pérez'), ('JOSÉ', 'PÉREZ'), ('josé', 'Núñez'), ('Jose', 'Perez'),
+            ('Ñandú', 'Ávila'), ('María', 'Ñuflo'), ('Ana', '100%_real'),
+        ]
+        for n, (nombre, apellido) in enumerate(nombres):
+            Usuario.objects.create(
+                IDRol=rol, Nombre=nombre, Apellido=apellido, Correo=f'u{n}@test.local', Contrasena='-'
+            )
+
+    def setUp(self):
+        search.build_index('usuario')
+        self.addCleanup(search.reset)
 
-# Create your tests here.
+    def test_matches_icontains(self):
+        terminos = [
+            'jos', 'JOSÉ', 'josé', 'josÉ', 'pérez', 'PÉREZ', 'perez', 'ñ', 'Ñ', 'ñandú', 'ÁVILA', 'ávila',
+            'é', 'ez', 'test.local', '%_', '0%', 'ana', 'x', 'u1@',
+        ]
+        for termino in terminos:
+            with self.subTest(termino=termino):
+                ids = search.matching('usuario', termino)
+                self.assertIsInstance(ids, list)
+                esperado = sorted(search._icontains('usuario', termino).values_list('pk', flat=True))
+                self.assertEqual(ids, esperado)
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -161,6 +162,8 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Paginación por cursor (?limite=N / ?cursor=...) en todos los listados, ver deporte_bd/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'deporte_bd.pagination.KeysetPagination',
 }
 
 SIMPLE_JWT = {
@@ -177,3 +180,9 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
 }
+
+# Escritura asíncrona de la bitácora (reportes.audit): cola + hilo de fondo en el servidor
+# web. En comandos de gestión y pruebas (manage.py, salvo runserver) se escribe directo:
+# el hilo usa otra conexión, que no ve la transacción de la prueba.
+_COMANDO_GESTION = Path(sys.argv[0]).name == 'manage.py' and sys.argv[1:2] != ['runserver']
+BITACORA_ASYNC = os.getenv('BITACORA_ASYNC', '0' if _COMANDO_GESTION else '1') == '1'
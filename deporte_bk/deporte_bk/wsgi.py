@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'deporte_bk.settings')
 
 application = get_wsgi_application()
+
+# Con `gunicorn --preload` esto corre una sola vez en el proceso maestro: los workers
+# heredan el modelo ML ya cargado y comparten su memoria (ver ModelRegistry.warm_up).
+from adm_ml.registry import get_registry  # noqa: E402
+
+get_registry().warm_up()
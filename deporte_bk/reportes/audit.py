@@ -0,0 +1,190 @@
+"""
+Escritura asíncrona y por lotes de la bitácora (Bitacora).
+
+Las vistas llaman a `registrar(...)`, que sólo encola el evento (con su fecha ya fijada)
+en una cola acotada del proceso. Un hilo de fondo la vacía con `bulk_create` cada
+BATCH_SIZE eventos o cada FLUSH_INTERVAL_MS milisegundos, lo que ocurra primero, así el
+login/logout no paga un INSERT propio en el request.
+
+- Cola llena: con OVERFLOW_POLICY = 'sync' el evento se escribe en el mismo request
+  (no se pierde nada); con 'drop' se descarta y se cuenta.
+- Un lote que falla (p. ej. un usuario eliminado antes del flush) se reintenta fila por
+  fila y sólo se descartan las filas inválidas.
+- Al terminar el proceso (atexit) se vacía lo pendiente. Tras un fork (gunicorn --preload)
+  cada proceso arranca su propio hilo en el primer evento.
+- Cada lote escrito se suma a los resúmenes (reportes.resumen) en la misma transacción,
+  con el rol que tiene cada usuario al guardarlo (Bitacora.IDRol);
+  si eso falla se cuenta en `resumen_fallidos` y los eventos se guardan igual.
+- settings.BITACORA_ASYNC = False desactiva la cola: `registrar` escribe en el mismo
+  hilo (comandos de gestión y pruebas, ver settings.py).
+- `stats()` devuelve los contadores: encolados, escritos, descartados, fallidos, lotes,
+  resumen_fallidos.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from deporte_bd.models import Bitacora
+from . import resumen
+
+BATCH_SIZE = 200
+FLUSH_INTERVAL_MS = 500
+MAX_QUEUE_SIZE = 10000
+OVERFLOW_POLICY = 'sync'  # 'sync' | 'drop'
+
+
+class AuditWriter:
+    """Cola acotada + hilo que escribe los eventos de Bitacora en lotes."""
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval_ms=FLUSH_INTERVAL_MS,
+                 max_queue_size=MAX_QUEUE_SIZE, overflow_policy=OVERFLOW_POLICY):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.overflow_policy = overflow_policy
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.counters = {'encolados': 0, 'escritos': 0, 'descartados': 0, 'fallidos': 0, 'lotes': 0,
+                         'resumen_fallidos': 0}
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='bitacora-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, evento):
+        """Encola un Bitacora sin guardar; aplica la política de desborde si la cola está llena."""
+        self.start()
+        try:
+            self.queue.put_nowait(evento)
+        except queue.Full:
+            if self.overflow_policy == 'drop':
+                self._count('descartados')
+            else:
+                self._write([evento])
+            return
+        self._count('encolados')
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    first = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batch = [first]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self._write(batch)
+        finally:
+            connection.close()
+
+    def _write(self, batch):
+        close_old_connections()
+        try:
+            resumen.assign_roles(batch)
+            with transaction.atomic():
+                Bitacora.objects.bulk_create(batch)
+                _summarize(batch, self)
+            self._count('escritos', len(batch))
+            self._count('lotes')
+            return
+        except Exception as e:
+            print(f"Bitácora: lote de {len(batch)} eventos falló ({e}); reintentando por fila")
+        for evento in batch:
+            evento.pk = None
+            try:
+                with transaction.atomic():
+                    evento.save(force_insert=True)
+                    _summarize([evento], self)
+                self._count('escritos')
+            except Exception:
+                self._count('fallidos')
+
+    def flush(self):
+        """Escribe en este hilo todo lo pendiente."""
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return
+            self._write(batch)
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, 'pendientes': self.queue.qsize(), 'activo': bool(self._thread and self._thread.is_alive())}
+
+
+def _summarize(eventos, writer=None):
+    """Suma los eventos a los resúmenes sin invalidar la escritura de la bitácora."""
+    try:
+        with transaction.atomic():
+            resumen.apply(eventos)
+    except Exception as e:
+        print(f"Bitácora: no se pudo actualizar el resumen ({e})")
+        if writer is not None:
+            writer._count('resumen_fallidos')
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Escritor del proceso actual (uno nuevo después de un fork)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None or _writer.pid != os.getpid():
+            _writer = AuditWriter()
+            atexit.register(_writer.stop)
+        return _writer
+
+
+def registrar(usuario_id, accion, detalle=None):
+    """Registra un evento de bitácora; la fecha es la del momento del evento, no la del INSERT."""
+    evento = Bitacora(IDUsuario_id=usuario_id, Accion=accion, Detalle=detalle, Fecha=timezone.now())
+    if not getattr(settings, 'BITACORA_ASYNC', True):
+        with transaction.atomic():
+            evento.save()
+            _summarize([evento])
+        return
+    get_writer().submit(evento)
+
+
+def stats():
+    return get_writer().stats()
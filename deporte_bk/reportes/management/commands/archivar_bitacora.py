@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from reportes.retencion import (
+    ARCHIVE_DIR, DEFAULT_RETENTION_MONTHS, archive_month, months_before, retention_cutoff
+)
+
+class Command(BaseCommand):
+    help = ('Archiva en archivos NDJSON comprimidos (gzip) los meses de bitácora más antiguos '
+            'que el período de retención y los elimina de la base')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses', type=int, default=DEFAULT_RETENTION_MONTHS,
+                            help='Meses completos que se conservan en la base además del actual')
+        parser.add_argument('--directorio', default=ARCHIVE_DIR, help='Carpeta de los archivos')
+        parser.add_argument('--simular', action='store_true', help='Sólo informa qué se archivaría')
+
+    def handle(self, *args, **options):
+        if options['meses'] < 0:
+            raise CommandError("--meses debe ser >= 0")
+        meses = months_before(retention_cutoff(options['meses']))
+        if not meses:
+            self.stdout.write("No hay registros anteriores al período de retención")
+            return
+
+        total = 0
+        for anio, mes in meses:
+            filas, ruta = archive_month(anio, mes, options['directorio'], dry_run=options['simular'])
+            total += filas
+            destino = ruta or ('(simulación)' if options['simular'] else '(sin registros)')
+            self.stdout.write(f"  {anio}-{mes:02d}: {filas} registros -> {destino}")
+        accion = 'se archivarían' if options['simular'] else 'archivados'
+        self.stdout.write(self.style.SUCCESS(f"{total} registros {accion} en {len(meses)} meses"))
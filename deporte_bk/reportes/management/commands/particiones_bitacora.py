@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from reportes.retencion import PARTITIONS_AHEAD, ensure_partitions, is_partitioned
+
+class Command(BaseCommand):
+    help = 'Crea por adelantado las particiones mensuales de la bitácora (sólo PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adelante', type=int, default=PARTITIONS_AHEAD,
+                            help='Meses por delante del actual')
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            self.stdout.write("La bitácora no está particionada en esta base de datos; nada que hacer")
+            return
+        creadas = ensure_partitions(options['adelante'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Particiones creadas: {', '.join(creadas)}" if creadas else "Particiones al día"
+        ))
@@ -0,0 +1,177 @@
+"""
+Resúmenes (rollups) de la bitácora para las estadísticas de administración.
+
+- BitacoraResumen: eventos por hora y por día × acción × rol del usuario.
+- BitacoraResumenUsuario: eventos por día × usuario × acción (ranking de usuarios).
+
+El escritor de la bitácora (reportes.audit) llama a `apply` con cada lote que escribe:
+los conteos del lote se agrupan en memoria y se suman con un único
+INSERT ... ON CONFLICT DO UPDATE por tabla (PostgreSQL y SQLite), así dos procesos que
+escriben el mismo período no pisan sus conteos. Las consultas (`series`, `by_role`,
+`top_users`) leen sólo estas tablas, que no crecen con la cantidad de eventos, y siguen
+disponibles después de archivar los meses viejos de la bitácora (reportes.retencion).
+
+`rebuild` recalcula los resúmenes desde los registros que hay en la base (comando
+rebuild_resumen_bitacora).
+
+Rol de un evento: el que tenía el usuario cuando se guardó el evento. El escritor lo
+fija en Bitacora.IDRol (`assign_roles`) y tanto `apply` como `rebuild` agrupan por esa
+columna, así un cambio de rol posterior no mueve eventos viejos entre roles y recalcular
+da lo mismo que se fue sumando. Sólo los registros anteriores a esa columna (IDRol nulo)
+se atribuyen en `rebuild` al rol actual del usuario.
+"""
+from collections import Counter
+from datetime import timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Trunc
+
+from deporte_bd.models import Bitacora, BitacoraResumen, BitacoraResumenUsuario, Usuario
+
+# Período -> tipo de truncado de Trunc
+PERIODS = {'hora': 'hour', 'dia': 'day'}
+# Filas por sentencia INSERT
+UPSERT_BATCH = 100
+
+
+def truncate(fecha, periodo):
+    """Inicio (UTC) de la hora o el día de `fecha`."""
+    fecha = fecha.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return fecha.replace(hour=0) if periodo == 'dia' else fecha
+
+
+def _upsert(model, key_fields, counts):
+    """Suma `counts` ({clave: cantidad}) a la columna Cantidad, creando las filas faltantes."""
+    q = connection.ops.quote_name
+    table = q(model._meta.db_table)
+    columns = ', '.join(q(field) for field in (*key_fields, 'Cantidad'))
+    conflict = ', '.join(q(field) for field in key_fields)
+    row = '(' + ', '.join(['%s'] * (len(key_fields) + 1)) + ')'
+    items = list(counts.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), UPSERT_BATCH):
+            chunk = items[start:start + UPSERT_BATCH]
+            params = []
+            for key, cantidad in chunk:
+                params.extend(
+                    connection.ops.adapt_datetimefield_value(value) if hasattr(value, 'tzinfo') else value
+                    for value in key
+                )
+                params.append(cantidad)
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES {", ".join([row] * len(chunk))} '
+                f'ON CONFLICT ({conflict}) DO UPDATE SET {q("Cantidad")} = {table}.{q("Cantidad")} + EXCLUDED.{q("Cantidad")}',
+                params
+            )
+
+
+def assign_roles(eventos):
+    """Fija en IDRol el rol actual del usuario de los eventos que todavía no lo tienen."""
+    pendientes = [evento for evento in eventos if evento.IDRol is None]
+    if not pendientes:
+        return
+    roles = dict(
+        Usuario.objects.filter(id__in={evento.IDUsuario_id for evento in pendientes}).values_list('id', 'IDRol_id')
+    )
+    for evento in pendientes:
+        evento.IDRol = roles.get(evento.IDUsuario_id)
+
+
+def apply(eventos):
+    """Suma a los resúmenes los eventos de Bitacora ya guardados (un lote del escritor)."""
+    eventos = list(eventos)
+    if not eventos:
+        return
+    by_period, by_user = Counter(), Counter()
+    for evento in eventos:
+        if evento.IDRol is None:
+            continue
+        for periodo in PERIODS:
+            by_period[(periodo, truncate(evento.Fecha, periodo), evento.Accion, evento.IDRol)] += 1
+        by_user[(truncate(evento.Fecha, 'dia'), evento.IDUsuario_id, evento.Accion)] += 1
+    _upsert(BitacoraResumen, ('Periodo', 'Inicio', 'Accion', 'IDRol'), by_period)
+    _upsert(BitacoraResumenUsuario, ('Dia', 'IDUsuario', 'Accion'), by_user)
+
+
+def rebuild(desde=None):
+    """
+    Recalcula los resúmenes desde Bitacora (desde la fecha `desde`, o todos).
+    Los períodos ya archivados no están en la base: usar `desde` para conservarlos.
+    Devuelve la cantidad de filas de resumen creadas.
+    """
+    logs = Bitacora.objects.all()
+    resumen = BitacoraResumen.objects.all()
+    resumen_usuario = BitacoraResumenUsuario.objects.all()
+    if desde is not None:
+        desde = truncate(desde, 'dia')
+        logs = logs.filter(Fecha__gte=desde)
+        resumen = resumen.filter(Inicio__gte=desde)
+        resumen_usuario = resumen_usuario.filter(Dia__gte=desde)
+
+    with transaction.atomic():
+        resumen.delete()
+        resumen_usuario.delete()
+        filas = []
+        con_rol = logs.annotate(rol=Coalesce('IDRol', 'IDUsuario__IDRol_id', output_field=IntegerField()))
+        for periodo, kind in PERIODS.items():
+            conteos = (
+                con_rol.annotate(inicio=Trunc('Fecha', kind, tzinfo=dt_timezone.utc))
+                .values_list('inicio', 'Accion', 'rol')
+                .annotate(cantidad=Count('id'))
+                .order_by()
+            )
+            filas += [
+                BitacoraResumen(Periodo=periodo, Inicio=inicio, Accion=accion, IDRol=rol, Cantidad=cantidad)
+                for inicio, accion, rol, cantidad in conteos.iterator(chunk_size=5000)
+            ]
+        BitacoraResumen.objects.bulk_create(filas, batch_size=1000)
+
+        conteos = (
+            logs.annotate(dia=Trunc('Fecha', 'day', tzinfo=dt_timezone.utc))
+            .values_list('dia', 'IDUsuario_id', 'Accion')
+            .annotate(cantidad=Count('id'))
+            .order_by()
+        )
+        filas_usuario = [
+            BitacoraResumenUsuario(Dia=dia, IDUsuario=usuario, Accion=accion, Cantidad=cantidad)
+            for dia, usuario, accion, cantidad in conteos.iterator(chunk_size=5000)
+        ]
+        BitacoraResumenUsuario.objects.bulk_create(filas_usuario, batch_size=1000)
+    return len(filas) + len(filas_usuario)
+
+
+def _periodo(periodo, desde, hasta, acciones=None, roles=None):
+    filas = BitacoraResumen.objects.filter(Periodo=periodo, Inicio__gte=desde, Inicio__lt=hasta)
+    if acciones:
+        filas = filas.filter(Accion__in=acciones)
+    if roles:
+        filas = filas.filter(IDRol__in=roles)
+    return filas
+
+
+def series(periodo, desde, hasta, acciones=None, roles=None):
+    """Cantidad por período y acción en [desde, hasta), ordenada por fecha."""
+    return list(
+        _periodo(periodo, desde, hasta, acciones, roles)
+        .values('Inicio', 'Accion').annotate(cantidad=Sum('Cantidad')).order_by('Inicio', 'Accion')
+    )
+
+
+def by_role(desde, hasta, acciones=None, roles=None):
+    """Cantidad por rol y acción en [desde, hasta)."""
+    return list(
+        _periodo('dia', desde, hasta, acciones, roles)
+        .values('IDRol', 'Accion').annotate(cantidad=Sum('Cantidad')).order_by('IDRol', 'Accion')
+    )
+
+
+def top_users(desde, hasta, acciones=None, limit=10):
+    """Los `limit` usuarios con más eventos en los días de [desde, hasta)."""
+    filas = BitacoraResumenUsuario.objects.filter(Dia__gte=desde, Dia__lt=hasta)
+    if acciones:
+        filas = filas.filter(Accion__in=acciones)
+    return list(
+        filas.values('IDUsuario').annotate(cantidad=Sum('Cantidad')).order_by('-cantidad', 'IDUsuario')[:limit]
+    )
@@ -0,0 +1,221 @@
+"""
+Particiones mensuales y archivo de la bitácora (Bitacora).
+
+En PostgreSQL la tabla está particionada por mes sobre Fecha (migración 0009 de
+deporte_bd): `ensure_partitions` crea por adelantado las particiones de los próximos
+meses (lo que llegue sin partición propia cae en la partición DEFAULT y se mueve al
+crearla). Las búsquedas filtran Fecha por rango, así el planificador sólo lee las
+particiones del período consultado.
+
+`archive_month` exporta un mes a un archivo NDJSON comprimido con gzip y lo elimina de la
+base: en PostgreSQL la partición se desvincula antes de exportarla y después se elimina
+completa (DROP, sin DELETE fila por fila); en otros motores se borra el rango de fechas,
+que está indexado.
+"""
+import gzip
+import json
+import os
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from deporte_bd.models import Bitacora
+
+ARCHIVE_DIR = os.path.join(settings.BASE_DIR, 'archivo', 'bitacora')
+PARTITIONS_AHEAD = 3
+DEFAULT_RETENTION_MONTHS = 12
+ARCHIVE_FIELDS = ('id', 'IDUsuario_id', 'Accion', 'Fecha', 'Detalle', 'IDRol')
+
+
+def _siguiente(anio, mes):
+    return (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def month_range(anio, mes):
+    """[inicio, fin) del mes en UTC."""
+    fin = _siguiente(anio, mes)
+    return (
+        datetime(anio, mes, 1, tzinfo=dt_timezone.utc),
+        datetime(fin[0], fin[1], 1, tzinfo=dt_timezone.utc),
+    )
+
+
+def _table():
+    return Bitacora._meta.db_table
+
+
+def partition_name(anio, mes):
+    return f'{_table()}_p{anio}{mes:02d}'
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [_table()]
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions():
+    """Nombres de las particiones vinculadas a la tabla."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname", [_table()]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def ensure_partitions(ahead=PARTITIONS_AHEAD):
+    """
+    Crea las particiones faltantes desde el mes actual hasta `ahead` meses después.
+    Las filas de ese mes que hubieran caído en la partición DEFAULT se mueven a la nueva.
+    Devuelve los nombres creados (lista vacía si la tabla no está particionada).
+    """
+    if not is_partitioned():
+        return []
+    q = connection.ops.quote_name
+    existentes = set(partitions())
+    ahora = timezone.now()
+    mes = (ahora.year, ahora.month)
+    creadas = []
+    for _ in range(ahead + 1):
+        nombre = partition_name(*mes)
+        if nombre not in existentes:
+            inicio, fin = month_range(*mes)
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'CREATE TABLE {q(nombre)} (LIKE {q(_table())} INCLUDING DEFAULTS)')
+                cursor.execute(
+                    f'WITH movidas AS (DELETE FROM {q(_table() + "_pdefault")} '
+                    f'WHERE {q("Fecha")} >= %s AND {q("Fecha")} < %s RETURNING *) '
+                    f'INSERT INTO {q(nombre)} SELECT * FROM movidas', [inicio, fin]
+                )
+                cursor.execute(
+                    f'ALTER TABLE {q(_table())} ATTACH PARTITION {q(nombre)} '
+                    f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+                )
+            creadas.append(nombre)
+        mes = _siguiente(*mes)
+    return creadas
+
+
+def months_before(cutoff):
+    """Meses (anio, mes) con registros anteriores al mes de `cutoff`."""
+    primero = Bitacora.objects.filter(Fecha__lt=cutoff).order_by('Fecha').values_list('Fecha', flat=True).first()
+    if primero is None:
+        return []
+    primero = primero.astimezone(dt_timezone.utc)
+    mes, limite = (primero.year, primero.month), (cutoff.year, cutoff.month)
+    meses = []
+    while mes < limite:
+        meses.append(mes)
+        mes = _siguiente(*mes)
+    return meses
+
+
+def retention_cutoff(months=DEFAULT_RETENTION_MONTHS):
+    """Inicio (UTC) del mes más antiguo que se conserva."""
+    ahora = timezone.now().astimezone(dt_timezone.utc)
+    anio, mes = ahora.year, ahora.month - months
+    while mes < 1:
+        anio, mes = anio - 1, mes + 12
+    return month_range(anio, mes)[0]
+
+
+def _serialize(valores):
+    registro = dict(zip(ARCHIVE_FIELDS, valores))
+    registro['Fecha'] = registro['Fecha'].isoformat()
+    return json.dumps(registro, ensure_ascii=False) + '\n'
+
+
+def _detached_rows(tabla, batch_size=5000):
+    """Filas de una partición ya desvinculada, por lotes de id (usa su índice (id, Fecha))."""
+    q = connection.ops.quote_name
+    columnas = ', '.join(q(campo) for campo in ARCHIVE_FIELDS)
+    ultimo = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                f'SELECT {columnas} FROM {q(tabla)} WHERE id > %s ORDER BY id LIMIT %s', [ultimo, batch_size]
+            )
+            filas = cursor.fetchall()
+            if not filas:
+                return
+            yield from filas
+            ultimo = filas[-1][0]
+
+
+def _write_archive(ruta, fuentes):
+    """Escribe las filas de `fuentes` en `ruta` (gzip, vía archivo temporal). Devuelve (filas, id máximo)."""
+    temporal = ruta + '.tmp'
+    filas, max_id = 0, None
+    try:
+        with gzip.open(temporal, 'wt', encoding='utf-8') as archivo:
+            for fuente in fuentes:
+                for valores in fuente:
+                    archivo.write(_serialize(valores))
+                    filas, max_id = filas + 1, max(max_id or 0, valores[0])
+    except Exception:
+        os.remove(temporal)
+        raise
+    if filas:
+        os.replace(temporal, ruta)
+    else:
+        os.remove(temporal)
+    return filas, max_id
+
+
+def archive_month(anio, mes, directory=ARCHIVE_DIR, dry_run=False):
+    """
+    Exporta el mes a `bitacora_AAAAMM_<marca>.ndjson.gz` y lo elimina de la base.
+    Devuelve (filas, ruta del archivo o None si no había filas / simulación).
+
+    Con partición propia (PostgreSQL) primero se desvincula: desde ese momento nada se
+    escribe en ella (un registro de ese mes que llegue cae en la partición DEFAULT), se
+    exporta la tabla desvinculada y recién entonces se elimina. Lo que haya del mes en la
+    partición DEFAULT, o en la tabla sin particionar, se exporta y se borra hasta el
+    último id exportado, así un registro que llegue durante la exportación no se pierde.
+    """
+    inicio, fin = month_range(anio, mes)
+    registros = Bitacora.objects.filter(Fecha__gte=inicio, Fecha__lt=fin)
+    nombre = partition_name(anio, mes)
+    particion = is_partitioned() and nombre in partitions()
+    q = connection.ops.quote_name
+
+    if dry_run:
+        return registros.count(), None
+
+    if particion:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {q(_table())} DETACH PARTITION {q(nombre)}')
+
+    os.makedirs(directory, exist_ok=True)
+    marca = timezone.now().strftime('%Y%m%dT%H%M%S')
+    ruta = os.path.join(directory, f'bitacora_{anio}{mes:02d}_{marca}.ndjson.gz')
+    fuentes = [registros.order_by('id').values_list(*ARCHIVE_FIELDS).iterator(chunk_size=5000)]
+    if particion:
+        fuentes.insert(0, _detached_rows(nombre))
+    try:
+        filas, max_id = _write_archive(ruta, fuentes)
+    except Exception:
+        if particion:
+            # Sin archivo completo no se elimina nada: la partición vuelve a su lugar
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f'ALTER TABLE {q(_table())} ATTACH PARTITION {q(nombre)} '
+                    f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+                )
+        raise
+
+    with transaction.atomic():
+        if particion:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE {q(nombre)}')
+        if max_id is not None:
+            registros.filter(id__lte=max_id).delete()
+    return filas, ruta if filas else None
@@ -1,3 +1,304 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from deporte_bd.models import Bitacora, BitacoraResumen, BitacoraResumenUsuario, Rol, Usuario
+from . import audit, resumen, retencion
+
+
+def evento(usuario_id, accion='login', fecha=None):
+    return Bitacora(IDUsuario_id=usuario_id, Accion=accion, Fecha=fecha or timezone.now())
+
+
+class AuditWriterBatchingTests(SimpleTestCase):
+    """Cuándo el hilo de fondo escribe un lote (la escritura se reemplaza por una lista)."""
+
+    def writer(self, **kwargs):
+        writer = audit.AuditWriter(**kwargs)
+        writer.lotes = []
+        escrito = threading.Event()
+
+        def escribir(batch):
+            writer.lotes.append(len(batch))
+            escrito.set()
+        writer._write = escribir
+        writer.escrito = escrito
+        self.addCleanup(writer.stop, 1)
+        return writer
+
+    def test_flush_at_batch_size(self):
+        writer = self.writer(batch_size=5, flush_interval_ms=60_000)
+        for _ in range(5):
+            writer.submit(evento(1))
+        # Con el lote completo no espera el intervalo (un minuto)
+        self.assertTrue(writer.escrito.wait(5))
+        self.assertEqual(writer.lotes, [5])
+
+    def test_flush_at_interval(self):
+        writer = self.writer(batch_size=100, flush_interval_ms=50)
+        for _ in range(3):
+            writer.submit(evento(1))
+        self.assertTrue(writer.escrito.wait(5))
+        self.assertEqual(writer.lotes, [3])
+        self.assertEqual(writer.stats()['encolados'], 3)
+
+
+class AuditWriterTests(TransactionTestCase):
+    """Escrituras reales: TransactionTestCase para que las FK se verifiquen al confirmar."""
+
+    def setUp(self):
+        rol = Rol.objects.create(Nombre='Test')
+        self.usuario = Usuario.objects.create(
+            IDRol=rol, Nombre='Ana', Apellido='Test', Correo='ana@test.local', Contrasena='-'
+        )
+
+    def writer(self, **kwargs):
+        # Sin hilo de fondo: los eventos quedan en la cola hasta flush/stop
+        writer = audit.AuditWriter(**kwargs)
+        writer.start = lambda: None
+        return writer
+
+    def test_sync_overflow_writes_in_the_request(self):
+        writer = self.writer(max_queue_size=2, overflow_policy='sync')
+        for _ in range(3):
+            writer.submit(evento(self.usuario.pk))
+        self.assertEqual(Bitacora.objects.count(), 1)
+        stats = writer.stats()
+        self.assertEqual((stats['encolados'], stats['escritos'], stats['descartados'], stats['pendientes']), (2, 1, 0, 2))
+
+    def test_drop_overflow_discards_and_counts(self):
+        writer = self.writer(max_queue_size=2, overflow_policy='drop')
+        for _ in range(3):
+            writer.submit(evento(self.usuario.pk))
+        self.assertEqual(Bitacora.objects.count(), 0)
+        stats = writer.stats()
+        self.assertEqual((stats['encolados'], stats['descartados'], stats['pendientes']), (2, 1, 2))
+
+    def test_invalid_row_is_retried_alone(self):
+        writer = self.writer()
+        for usuario_id in (self.usuario.pk, self.usuario.pk + 1000, self.usuario.pk):
+            writer.submit(evento(usuario_id))
+        with mock.patch('builtins.print'):
+            writer.flush()
+        self.assertEqual(Bitacora.objects.count(), 2)
+        self.assertEqual(set(Bitacora.objects.values_list('IDUsuario_id', flat=True)), {self.usuario.pk})
+        stats = writer.stats()
+        self.assertEqual((stats['escritos'], stats['fallidos'], stats['lotes']), (2, 1, 0))
+        # Las filas reintentadas también se suman a los resúmenes
+        self.assertEqual(sum(BitacoraResumen.objects.filter(Periodo='dia').values_list('Cantidad', flat=True)), 2)
+
+    def test_stop_flushes_pending_events(self):
+        writer = self.writer(batch_size=2)
+        for _ in range(5):
+            writer.submit(evento(self.usuario.pk))
+        writer.stop()
+        self.assertEqual(Bitacora.objects.count(), 5)
+        stats = writer.stats()
+        self.assertEqual((stats['escritos'], stats['lotes'], stats['pendientes']), (5, 3, 0))
+
+    def test_registrar_writes_directly_without_async(self):
+        self.assertFalse(settings.BITACORA_ASYNC)
+        audit.registrar(self.usuario.pk, 'login')
+        self.assertEqual(Bitacora.objects.filter(Accion='login').count(), 1)
+
+
+class ResumenTests(TestCase):
+    """Los resúmenes sumados lote a lote coinciden con recalcularlos desde la bitácora."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.delegado = Rol.objects.create(Nombre='Admin'), Rol.objects.create(Nombre='Delegado')
+        cls.usuarios = [
+            Usuario.objects.create(
+                IDRol=cls.delegado, Nombre=f'Usuario {n}', Apellido='Test', Correo=f'u{n}@test.local', Contrasena='-'
+            )
+            for n in range(4)
+        ]
+        cls.inicio = datetime(2026, 3, 1, 9, 30, tzinfo=dt_timezone.utc)
+
+    def escribir(self, eventos, batch_size=3):
+        writer = audit.AuditWriter(batch_size=batch_size)
+        writer.start = lambda: None
+        for item in eventos:
+            writer.submit(item)
+        writer.flush()
+
+    def eventos(self, desde, cantidad):
+        """`cantidad` eventos repartidos entre usuarios, acciones, horas y días."""
+        return [
+            evento(self.usuarios[i % 4].pk, ('login', 'logout', 'update_user')[i % 3], self.inicio + timedelta(hours=7 * (desde + i)))
+            for i in range(cantidad)
+        ]
+
+    def tablas(self):
+        return (
+            sorted(BitacoraResumen.objects.values_list('Periodo', 'Inicio', 'Accion', 'IDRol', 'Cantidad')),
+            sorted(BitacoraResumenUsuario.objects.values_list('Dia', 'IDUsuario', 'Accion', 'Cantidad')),
+        )
+
+    def test_apply_matches_rebuild(self):
+        self.escribir(self.eventos(0, 10))
+        # Un cambio de rol no mueve los eventos ya guardados
+        Usuario.objects.filter(pk=self.usuarios[0].pk).update(IDRol=self.admin)
+        self.escribir(self.eventos(10, 14), batch_size=5)
+        incremental = self.tablas()
+        self.assertEqual(sum(fila[-1] for fila in incremental[0] if fila[0] == 'dia'), 24)
+
+        resumen.rebuild()
+        self.assertEqual(self.tablas(), incremental)
+        por_rol = {}
+        for fila in resumen.by_role(self.inicio - timedelta(days=1), self.inicio + timedelta(days=30)):
+            por_rol[fila['IDRol']] = por_rol.get(fila['IDRol'], 0) + fila['cantidad']
+        # Usuario 0: 3 eventos antes del cambio de rol y 4 después
+        self.assertEqual(por_rol, {self.delegado.pk: 20, self.admin.pk: 4})
+
+    def test_rebuild_uses_current_role_for_rows_without_role(self):
+        Bitacora.objects.bulk_create(self.eventos(0, 4))
+        resumen.rebuild()
+        roles = set(BitacoraResumen.objects.values_list('IDRol', flat=True))
+        self.assertEqual(roles, {self.delegado.pk})
+
+
+class BitacoraResumenViewTests(TestCase):
+    url = '/api/reportes/bitacora/resumen/'
+
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(Nombre='Admin')
+        cls.usuarios = [
+            Usuario.objects.create(IDRol=rol, Nombre=f'Usuario {n}', Apellido='Test', Correo=f'u{n}@test.local', Contrasena='-')
+            for n in range(5)
+        ]
+        # Usuario n: n + 1 eventos por día, del 1 al 5 de marzo
+        eventos = [
+            evento(usuario.pk, 'login', datetime(2026, 3, dia, 12, tzinfo=dt_timezone.utc))
+            for dia in range(1, 6) for n, usuario in enumerate(cls.usuarios) for _ in range(n + 1)
+        ]
+        resumen.assign_roles(eventos)
+        Bitacora.objects.bulk_create(eventos)
+        resumen.apply(eventos)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.usuarios[0])
+
+    def test_range_is_inclusive(self):
+        data = self.client.get(self.url, {'desde': '2026-03-02', 'hasta': '2026-03-04'}).data
+        self.assertEqual(data['totales'], {'login': 3 * 15})
+        self.assertEqual([fila['inicio'][:10] for fila in data['serie']], ['2026-03-02', '2026-03-03', '2026-03-04'])
+        self.assertEqual((data['desde'], data['hasta']), ('2026-03-02', '2026-03-04'))
+
+        data = self.client.get(self.url, {'desde': '2026-03-05', 'hasta': '2026-03-05', 'periodo': 'hora'}).data
+        self.assertEqual(data['serie'], [{'inicio': '2026-03-05T12:00:00+00:00', 'accion': 'login', 'cantidad': 15}])
+
+    def test_top_users(self):
+        data = self.client.get(self.url, {'desde': '2026-03-01', 'hasta': '2026-03-05', 'top': 2}).data
+        self.assertEqual(
+            [(fila['id'], fila['cantidad']) for fila in data['topUsuarios']],
+            [(self.usuarios[4].pk, 25), (self.usuarios[3].pk, 20)]
+        )
+        for top, esperado in (('0', 1), ('500', 5)):
+            with self.subTest(top=top):
+                data = self.client.get(self.url, {'desde': '2026-03-01', 'hasta': '2026-03-05', 'top': top}).data
+                self.assertEqual(len(data['topUsuarios']), esperado)
+
+    def test_invalid_parameters(self):
+        for params in (
+            {'periodo': 'semana'}, {'desde': '03/01/2026'}, {'desde': '2026-03-05', 'hasta': '2026-03-01'}, {'top': 'x'}
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class ArchiveMonthTests(TestCase):
+    """Archivo de un mes sin particiones (SQLite y PostgreSQL sin migrar): borra por rango de fechas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(Nombre='Test')
+        cls.usuario = Usuario.objects.create(
+            IDRol=rol, Nombre='Ana', Apellido='Test', Correo='ana@test.local', Contrasena='-'
+        )
+        fechas = [
+            datetime(2026, 2, 28, 23, 59, 59, tzinfo=dt_timezone.utc),
+            datetime(2026, 3, 1, tzinfo=dt_timezone.utc),
+            datetime(2026, 3, 15, 12, tzinfo=dt_timezone.utc),
+            datetime(2026, 3, 31, 23, 59, 59, 999999, tzinfo=dt_timezone.utc),
+            datetime(2026, 4, 1, tzinfo=dt_timezone.utc),
+        ]
+        Bitacora.objects.bulk_create([
+            Bitacora(IDUsuario=cls.usuario, Accion='login', Fecha=fecha, Detalle=f'evento {n}', IDRol=rol.pk)
+            for n, fecha in enumerate(fechas)
+        ])
+        inicio, fin = retencion.month_range(2026, 3)
+        cls.marzo = list(Bitacora.objects.filter(Fecha__gte=inicio, Fecha__lt=fin).order_by('id').values_list('id', flat=True))
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+
+    def archivar(self, **kwargs):
+        return retencion.archive_month(2026, 3, directory=self.directorio, **kwargs)
+
+    def test_file_has_exactly_the_month(self):
+        filas, ruta = self.archivar()
+        self.assertEqual(filas, 3)
+        with gzip.open(ruta, 'rt', encoding='utf-8') as archivo:
+            registros = [json.loads(linea) for linea in archivo]
+        self.assertEqual([registro['id'] for registro in registros], self.marzo)
+        self.assertEqual(set(registros[0]), set(retencion.ARCHIVE_FIELDS))
+        self.assertEqual(registros[0]['Fecha'], '2026-03-01T00:00:00+00:00')
+        self.assertEqual(os.listdir(self.directorio), [os.path.basename(ruta)])
+        self.assertEqual(Bitacora.objects.count(), 2)
+        self.assertFalse(Bitacora.objects.filter(id__in=self.marzo).exists())
+
+    def test_deletes_only_exported_ids(self):
+        escribir = retencion._write_archive
+
+        def escribir_y_registrar(ruta, fuentes):
+            resultado = escribir(ruta, fuentes)
+            # Llega un evento del mes mientras se exporta: no está en el archivo y no se borra
+            Bitacora.objects.create(IDUsuario=self.usuario, Accion='login', Fecha=datetime(2026, 3, 20, tzinfo=dt_timezone.utc))
+            return resultado
+        with mock.patch.object(retencion, '_write_archive', escribir_y_registrar):
+            filas, _ = self.archivar()
+        self.assertEqual(filas, 3)
+        restantes = Bitacora.objects.filter(Fecha__month=3)
+        self.assertEqual(restantes.count(), 1)
+        self.assertGreater(restantes.get().id, max(self.marzo))
+
+    def test_dry_run_deletes_nothing(self):
+        self.assertEqual(self.archivar(dry_run=True), (3, None))
+        self.assertEqual(Bitacora.objects.count(), 5)
+        self.assertEqual(os.listdir(self.directorio), [])
+
+    def test_write_failure_leaves_table_untouched(self):
+        serializar = retencion._serialize
+        llamadas = []
+
+        def fallar_en_la_segunda(valores):
+            llamadas.append(valores)
+            if len(llamadas) == 2:
+                raise OSError('disco lleno')
+            return serializar(valores)
+        with mock.patch.object(retencion, '_serialize', fallar_en_la_segunda), self.assertRaises(OSError):
+            self.archivar()
+        self.assertEqual(Bitacora.objects.count(), 5)
+        self.assertEqual(os.listdir(self.directorio), [])
+
+    def test_empty_month_writes_no_file(self):
+        self.assertEqual(retencion.archive_month(2026, 6, directory=self.directorio), (0, None))
+        self.assertEqual(os.listdir(self.directorio), [])
+
+    def test_ensure_partitions_without_partitioning(self):
+        self.assertEqual(retencion.ensure_partitions(), [])
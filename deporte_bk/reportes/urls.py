@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import AdminSummaryView, bitacora_controllers
+from .views import AdminSummaryView, bitacora_controllers, BitacoraExportView, BitacoraWriterStatsView, BitacoraResumenView
 
 urlpatterns = [
     path('admin/summary/', AdminSummaryView.as_view(), name='admin-summary'),
     path('bitacora/', bitacora_controllers.as_view(), name='bitacora'),
+    path('bitacora/exportar/', BitacoraExportView.as_view(), name='bitacora-exportar'),
+    path('bitacora/resumen/', BitacoraResumenView.as_view(), name='bitacora-resumen'),
+    path('bitacora/escritor/', BitacoraWriterStatsView.as_view(), name='bitacora-escritor'),
 ]
\ No newline at end of file
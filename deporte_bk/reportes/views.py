@@ -1,10 +1,17 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Q
-from datetime import datetime
+from django.db.models import Count
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+import csv
+import json
 
 from deporte_bd.models import Usuario, Rol, Equipo, Campeonato, Partido, Incidencia, Bitacora
+from deporte_bd.pagination import KeysetPagination, estimated_count
+from deporte_bd.search import matching
+from . import audit, resumen
 
 
 class AdminSummaryView(APIView):
@@ -46,6 +53,60 @@ class AdminSummaryView(APIView):
 		})
 
 
+def _inicio_dia(fecha_param):
+	"""Inicio (zona horaria actual) del día YYYY-MM-DD, o None si el formato es inválido."""
+	try:
+		fecha_obj = datetime.strptime(fecha_param, '%Y-%m-%d').date()
+	except ValueError:
+		return None
+	return timezone.make_aware(datetime.combine(fecha_obj, time.min))
+
+
+def filtrar_bitacora(params):
+	"""
+	Queryset de Bitacora con los filtros de la bitácora (fecha o desde/hasta, usuario, accion),
+	compartido por el listado y la exportación.
+	Las fechas se filtran como rango sobre Fecha (no Fecha__date): usa el índice y, en
+	PostgreSQL, sólo se leen las particiones mensuales del período (ver reportes.retencion).
+	"""
+	# Obtener parámetros de filtrado
+	fecha_param = params.get('fecha', None)
+	desde_param = params.get('desde', None)
+	hasta_param = params.get('hasta', None)
+	usuario_param = params.get('usuario', None)
+	accion_param = params.get('accion', None)
+
+	# Iniciar queryset
+	logs = Bitacora.objects.all()
+
+	# Filtrar por fecha (un día) o por rango desde/hasta (inclusive)
+	if fecha_param:
+		desde_param = hasta_param = fecha_param
+	inicio = _inicio_dia(desde_param) if desde_param else None
+	if inicio:
+		logs = logs.filter(Fecha__gte=inicio)
+	fin = _inicio_dia(hasta_param) if hasta_param else None
+	if fin:
+		logs = logs.filter(Fecha__lt=fin + timedelta(days=1))
+
+	# Filtrar por usuario (por ID, nombre, apellido o correo)
+	if usuario_param:
+		# Intentar convertir a entero para buscar por ID
+		try:
+			usuario_id = int(usuario_param)
+			logs = logs.filter(IDUsuario__id=usuario_id)
+		except ValueError:
+			# Si no es ID, buscar por nombre, apellido o correo: se resuelven primero los
+			# usuarios con el índice de búsqueda y la bitácora se filtra por (IDUsuario, Fecha)
+			logs = logs.filter(IDUsuario__in=matching('usuario', usuario_param))
+
+	# Filtrar por acción
+	if accion_param:
+		logs = logs.filter(Accion__icontains=accion_param)
+
+	return logs
+
+
 class bitacora_controllers(APIView):
 	"""Controlador para gestionar la bitácora del sistema."""
 	permission_classes = [IsAuthenticated]
@@ -54,49 +115,21 @@ class bitacora_controllers(APIView):
 		"""
 		Obtiene logs filtrados según parámetros:
 		- fecha: Fecha específica (formato YYYY-MM-DD)
+		- desde / hasta: Rango de fechas inclusive (formato YYYY-MM-DD)
 		- usuario: ID del usuario o búsqueda por nombre/correo
 		- accion: Tipo de acción (login, logout, crear, editar, eliminar, etc.)
+		- limite / cursor: paginación por cursor (ver deporte_bd.pagination)
 		"""
-		# Obtener parámetros de filtrado
-		fecha_param = request.query_params.get('fecha', None)
-		usuario_param = request.query_params.get('usuario', None)
-		accion_param = request.query_params.get('accion', None)
-
-		# Iniciar queryset
-		logs = Bitacora.objects.all().select_related('IDUsuario', 'IDUsuario__IDRol')
-
-		# Filtrar por fecha
-		if fecha_param:
-			try:
-				fecha_obj = datetime.strptime(fecha_param, '%Y-%m-%d').date()
-				logs = logs.filter(Fecha__date=fecha_obj)
-			except ValueError:
-				pass  # Si el formato es inválido, ignorar el filtro
-
-		# Filtrar por usuario (por ID, nombre, apellido o correo)
-		if usuario_param:
-			# Intentar convertir a entero para buscar por ID
-			try:
-				usuario_id = int(usuario_param)
-				logs = logs.filter(IDUsuario__id=usuario_id)
-			except ValueError:
-				# Si no es ID, buscar por nombre, apellido o correo
-				logs = logs.filter(
-					Q(IDUsuario__Nombre__icontains=usuario_param) |
-					Q(IDUsuario__Apellido__icontains=usuario_param) |
-					Q(IDUsuario__Correo__icontains=usuario_param)
-				)
-
-		# Filtrar por acción
-		if accion_param:
-			logs = logs.filter(Accion__icontains=accion_param)
-
-		# Ordenar por fecha descendente (más recientes primero)
-		logs = logs.order_by('-Fecha')
+		# Filtrar por fecha, usuario y acción
+		logs = filtrar_bitacora(request.query_params).select_related('IDUsuario', 'IDUsuario__IDRol')
+
+		# Paginar por cursor, por fecha descendente (más recientes primero)
+		paginador = KeysetPagination(ordering=('-Fecha', '-id'))
+		pagina = paginador.paginate_queryset(logs, request, view=self)
 
 		# Construir respuesta con datos relevantes
 		datos = []
-		for log in logs:
+		for log in pagina:
 			datos.append({
 				'id': log.id,
 				'usuario': {
@@ -112,6 +145,158 @@ class bitacora_controllers(APIView):
 			})
 
 		return Response({
-			'total': logs.count(),
+			'total': estimated_count(logs),
+			'siguiente': paginador.get_next_link(),
 			'logs': datos
 		})
+
+
+class _Echo:
+	"""Pseudo-archivo para csv.writer: devuelve la línea en lugar de escribirla."""
+	def write(self, value):
+		return value
+
+
+class BitacoraExportView(APIView):
+	"""
+	Exportación completa de la bitácora en streaming (NDJSON o CSV).
+	Mismos filtros que el listado (fecha, usuario, accion) y formato=ndjson|csv.
+	Las filas se leen con .iterator() sobre una proyección values() y se escriben a
+	medida que se generan, así la memoria del worker no depende de la cantidad de filas.
+	"""
+	permission_classes = [IsAuthenticated]
+	CHUNK_SIZE = 2000
+	COLUMNAS = (
+		('id', 'id'),
+		('usuario_id', 'IDUsuario_id'),
+		('nombre', 'IDUsuario__Nombre'),
+		('apellido', 'IDUsuario__Apellido'),
+		('correo', 'IDUsuario__Correo'),
+		('rol', 'IDUsuario__IDRol__Nombre'),
+		('accion', 'Accion'),
+		('fecha', 'Fecha'),
+		('detalle', 'Detalle'),
+	)
+
+	def get(self, request):
+		formato = request.query_params.get('formato', 'ndjson').lower()
+		if formato not in ('ndjson', 'csv'):
+			return Response({'detail': 'formato debe ser ndjson o csv'}, status=400)
+
+		campos = [campo for _, campo in self.COLUMNAS]
+		filas = (
+			filtrar_bitacora(request.query_params)
+			.order_by('-Fecha', '-id')
+			.values_list(*campos)
+			.iterator(chunk_size=self.CHUNK_SIZE)
+		)
+
+		if formato == 'csv':
+			contenido, content_type = self._csv(filas), 'text/csv; charset=utf-8'
+		else:
+			contenido, content_type = self._ndjson(filas), 'application/x-ndjson'
+
+		response = StreamingHttpResponse(contenido, content_type=content_type)
+		nombre = f"bitacora_{timezone.now():%Y%m%d_%H%M%S}.{formato}"
+		response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+		return response
+
+	def _registros(self, filas):
+		nombres = [nombre for nombre, _ in self.COLUMNAS]
+		for fila in filas:
+			registro = dict(zip(nombres, fila))
+			registro['fecha'] = registro['fecha'].isoformat()
+			yield registro
+
+	def _ndjson(self, filas):
+		for registro in self._registros(filas):
+			yield json.dumps(registro, ensure_ascii=False) + '\n'
+
+	def _csv(self, filas):
+		writer = csv.writer(_Echo())
+		yield writer.writerow([nombre for nombre, _ in self.COLUMNAS])
+		for registro in self._registros(filas):
+			yield writer.writerow(registro.values())
+
+
+class BitacoraWriterStatsView(APIView):
+	"""Contadores del escritor asíncrono de bitácora de este proceso (ver reportes.audit)."""
+	permission_classes = [IsAuthenticated]
+
+	def get(self, request):
+		return Response(audit.stats())
+
+
+class BitacoraResumenView(APIView):
+	"""
+	Estadísticas de la bitácora desde los resúmenes precalculados (ver reportes.resumen),
+	sin recorrer los registros:
+	- desde / hasta: rango de días inclusive (YYYY-MM-DD); por defecto los últimos DIAS_DEFECTO días
+	- periodo: hora | dia (agrupación de la serie)
+	- accion: una o varias acciones separadas por coma (login, login_fail, update_user, ...)
+	- rol: ID del rol
+	- top: cantidad de usuarios del ranking (máximo TOP_MAXIMO)
+	"""
+	permission_classes = [IsAuthenticated]
+	DIAS_DEFECTO = 30
+	TOP_DEFECTO = 10
+	TOP_MAXIMO = 100
+
+	def get(self, request):
+		params = request.query_params
+		periodo = params.get('periodo', 'dia')
+		if periodo not in resumen.PERIODS:
+			return Response({'detail': 'periodo debe ser hora o dia'}, status=400)
+
+		hoy = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+		desde = _inicio_dia(params['desde']) if 'desde' in params else hoy - timedelta(days=self.DIAS_DEFECTO - 1)
+		hasta = _inicio_dia(params['hasta']) if 'hasta' in params else hoy
+		if desde is None or hasta is None:
+			return Response({'detail': 'desde y hasta deben tener el formato YYYY-MM-DD'}, status=400)
+		if hasta < desde:
+			return Response({'detail': 'hasta debe ser posterior a desde'}, status=400)
+		fin = hasta + timedelta(days=1)
+
+		acciones = [accion.strip() for accion in params.get('accion', '').split(',') if accion.strip()]
+		try:
+			roles = [int(params['rol'])] if params.get('rol') else None
+			top = min(max(int(params.get('top', self.TOP_DEFECTO)), 1), self.TOP_MAXIMO)
+		except ValueError:
+			return Response({'detail': 'rol y top deben ser números'}, status=400)
+
+		serie = resumen.series(periodo, desde, fin, acciones, roles)
+		por_rol = resumen.by_role(desde, fin, acciones, roles)
+		# El ranking es por usuario (sin filtro de rol: el rol puede cambiar en el período)
+		top_usuarios = resumen.top_users(desde, fin, acciones, top)
+
+		totales = {}
+		for fila in por_rol:
+			totales[fila['Accion']] = totales.get(fila['Accion'], 0) + fila['cantidad']
+		nombres_rol = dict(Rol.objects.filter(id__in={fila['IDRol'] for fila in por_rol}).values_list('id', 'Nombre'))
+		usuarios = Usuario.objects.in_bulk([fila['IDUsuario'] for fila in top_usuarios])
+
+		return Response({
+			'periodo': periodo,
+			'desde': desde.date().isoformat(),
+			'hasta': hasta.date().isoformat(),
+			'totales': totales,
+			'serie': [
+				{'inicio': fila['Inicio'].isoformat(), 'accion': fila['Accion'], 'cantidad': fila['cantidad']}
+				for fila in serie
+			],
+			'porRol': [
+				{'rol': nombres_rol.get(fila['IDRol']), 'IDRol': fila['IDRol'], 'accion': fila['Accion'], 'cantidad': fila['cantidad']}
+				for fila in por_rol
+			],
+			'topUsuarios': [self._usuario(usuarios.get(fila['IDUsuario']), fila) for fila in top_usuarios],
+		})
+
+	def _usuario(self, usuario, fila):
+		# El usuario puede haber sido eliminado: el resumen se conserva igual
+		return {
+			'id': fila['IDUsuario'],
+			'nombre': usuario.Nombre if usuario else None,
+			'apellido': usuario.Apellido if usuario else None,
+			'correo': usuario.Correo if usuario else None,
+			'cantidad': fila['cantidad'],
+		}
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class UsuariosConfig(AppConfig):
     name = 'usuarios'
+
+    def ready(self):
+        # Conecta las señales que invalidan la caché de usuarios autenticados
+        from . import signals
@@ -1,6 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
+from deporte_bd.models import Usuario
+
+# Per-process LRU of authenticated users: entries and seconds before a user is reloaded.
+# The TTL bounds how stale a user can be in other processes (signals only invalidate
+# the LRU of the process that handled the write) or after a queryset.update() that
+# skips signals.
+PRINCIPAL_CACHE_SIZE = 2048
+PRINCIPAL_CACHE_TTL = 30
+# Keep users in Django's cache framework instead of the per-process LRU. With a backend
+# shared by all workers (Redis, Memcached) an invalidation reaches every process, so a
+# deleted or edited user is never served again; the local LRU is skipped in this mode.
+PRINCIPAL_SHARED_CACHE = False
+PRINCIPAL_SHARED_CACHE_TTL = 300
+SHARED_CACHE_PREFIX = 'auth:usuario:'
+
+# Stored as a tuple of column values (picklable, and each request gets its own instance)
+_FIELDS = [field.attname for field in Usuario._meta.concrete_fields]
+
+
+class PrincipalCache:
+    """Thread-safe LRU with TTL mapping user id -> tuple of `Usuario` column values."""
+
+    def __init__(self, max_size=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'shared_hits': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.counters['hits'] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[user_id]
+            self.counters['misses'] += 1
+            return None
+
+    def set(self, user_id, values):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.counters['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters['hits'] + self.counters['misses']
+            return {
+                **self.counters,
+                'size': len(self._entries),
+                'hit_ratio': round(self.counters['hits'] / lookups, 4) if lookups else None,
+            }
+
+
+principal_cache = PrincipalCache()
+
+
+def _shared_key(user_id):
+    return f'{SHARED_CACHE_PREFIX}{user_id}'
+
+
+def _query_user(user_id):
+    values = Usuario.objects.filter(pk=user_id).values_list(*_FIELDS).first()
+    if values is None:
+        raise Usuario.DoesNotExist
+    return values
+
+
+def load_user(user_id):
+    """`Usuario` for `user_id` from the cache, querying the database only on a miss."""
+    if PRINCIPAL_SHARED_CACHE:
+        values = cache.get(_shared_key(user_id))
+        if values is not None:
+            principal_cache.count('shared_hits')
+        else:
+            principal_cache.count('misses')
+            values = _query_user(user_id)
+            cache.set(_shared_key(user_id), values, PRINCIPAL_SHARED_CACHE_TTL)
+    else:
+        values = principal_cache.get(user_id)
+        if values is None:
+            values = _query_user(user_id)
+            principal_cache.set(user_id, values)
+    return Usuario.from_db(Usuario.objects.db, _FIELDS, values)
+
+
+def invalidate_user(user_id):
+    """Drop a user from the caches (called by the `Usuario` save/delete signals)."""
+    principal_cache.invalidate(user_id)
+    if PRINCIPAL_SHARED_CACHE:
+        cache.delete(_shared_key(user_id))
+
+
+def cache_stats():
+    return principal_cache.stats()
+
 
 class UsuarioJWTAuthentication(JWTAuthentication):
     """Custom JWT authentication that resolves tokens to the `deporte_bd.Usuario` model.
@@ -8,24 +129,22 @@ class UsuarioJWTAuthentication(JWTAuthentication):
     SimpleJWT's default `get_user` looks up the Django `AUTH_USER_MODEL`. Since this
     project uses a custom `Usuario` model stored in `deporte_bd`, we override the
     lookup so `request.user` and permission checks work with that model.
+
+    Users are served from `principal_cache` (see `load_user`), so an authenticated
+    request does not query `Usuario` while the entry is fresh.
     """
 
     def get_user(self, validated_token):
         # validated_token is a dict-like with the user id claim (usually 'user_id')
         # Some SimpleJWT versions set `self.user_id_claim`, but to remain compatible
         # we attempt to read the common claim names directly and fall back safely.
-        try:
-            from django.conf import settings
-            claim_name = getattr(self, 'user_id_claim', None) or settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id')
-        except Exception:
-            claim_name = 'user_id'
+        claim_name = getattr(self, 'user_id_claim', None) or getattr(settings, 'SIMPLE_JWT', {}).get('USER_ID_CLAIM', 'user_id')
 
         user_id = validated_token.get(claim_name) or validated_token.get('user_id')
         if user_id is None:
             raise AuthenticationFailed('Token contained no recognizable user identification', code='no_user_id')
 
         try:
-            from deporte_bd.models import Usuario
-            return Usuario.objects.get(pk=user_id)
+            return load_user(int(user_id))
         except Exception:
             raise AuthenticationFailed('User not found', code='user_not_found')
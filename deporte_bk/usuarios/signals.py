@@ -0,0 +1,29 @@
+"""
+Invalida el usuario en la caché de autenticación (usuarios.authentication) cuando el
+Usuario se guarda (datos, rol, Estado) o se elimina. Se invalida en el momento y otra vez
+al confirmar la transacción, para que un request concurrente no vuelva a cachear la
+versión anterior mientras la transacción sigue abierta.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from deporte_bd.models import Usuario
+from .authentication import invalidate_user
+
+
+def _invalidate(user_id):
+    invalidate_user(user_id)
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+@receiver(post_save, sender=Usuario)
+def usuario_post_save(sender, instance, created=False, raw=False, **kwargs):
+    if created:
+        return
+    _invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=Usuario)
+def usuario_post_delete(sender, instance, **kwargs):
+    _invalidate(instance.pk)
@@ -1,3 +1,84 @@
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from deporte_bd.models import Rol, Usuario
+from . import authentication
+from .authentication import PrincipalCache, load_user
+
+
+class PrincipalCacheTests(TestCase):
+    """Caché de usuarios autenticados: aciertos, fallos e invalidación por señales."""
+
+    shared = False
+
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(Nombre='Test')
+        cls.usuario = Usuario.objects.create(
+            IDRol=rol, Nombre='Ana', Apellido='Test', Correo='ana@test.local', Contrasena='-'
+        )
+
+    def setUp(self):
+        self.cache = PrincipalCache()
+        for nombre, valor in (('principal_cache', self.cache), ('PRINCIPAL_SHARED_CACHE', self.shared)):
+            patcher = mock.patch.object(authentication, nombre, valor)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def contadores(self):
+        stats = self.cache.stats()
+        return stats['hits'], stats['misses'], stats['shared_hits']
+
+    def cargar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return load_user(self.usuario.pk)
+
+    def test_hits_and_misses(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cargar().Nombre, 'Ana')
+        with self.assertNumQueries(0):
+            self.cargar()
+        self.assertEqual(self.contadores(), (1, 1, 0))
+
+    def test_save_invalidates(self):
+        self.cargar()
+        with self.captureOnCommitCallbacks(execute=True):
+            usuario = Usuario.objects.get(pk=self.usuario.pk)
+            usuario.Nombre = 'Ana María'
+            usuario.save()
+        self.assertGreaterEqual(self.cache.stats()['invalidations'], 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cargar().Nombre, 'Ana María')
+        self.assertEqual(self.contadores()[:2], (0, 2))
+
+    def test_delete_invalidates(self):
+        self.cargar()
+        with self.captureOnCommitCallbacks(execute=True):
+            Usuario.objects.get(pk=self.usuario.pk).delete()
+        with self.assertRaises(Usuario.DoesNotExist):
+            self.cargar()
+        self.assertEqual(self.contadores()[:2], (0, 2))
+
+
+class SharedPrincipalCacheTests(PrincipalCacheTests):
+    """Con caché compartida no hay LRU local: lo invalidado en otro proceso no se vuelve a servir."""
+
+    shared = True
+
+    def test_hits_and_misses(self):
+        self.cargar()
+        with self.assertNumQueries(0):
+            self.cargar()
+        self.assertEqual(self.contadores(), (0, 1, 1))
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_invalidation_from_another_process(self):
+        self.cargar()
+        # Otro worker guarda el usuario: su señal borra la clave compartida, no este LRU
+        Usuario.objects.filter(pk=self.usuario.pk).update(Nombre='Ana María')
+        cache.delete(authentication._shared_key(self.usuario.pk))
+        self.assertEqual(self.cargar().Nombre, 'Ana María')
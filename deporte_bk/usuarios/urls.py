@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import AuthController, LogoutController, UserDetail, UsersList
+from .views import AuthController, LogoutController, UserDetail, UsersList, UserCacheStatsView
 
 urlpatterns = [
     path('login/', AuthController.as_view(), name='auth_login'),
     path('logout/', LogoutController.as_view(), name='auth_logout'),
     path('users/', UsersList.as_view(), name='users-list'),
     path('users/<int:pk>/', UserDetail.as_view(), name='user-detail'),
+    path('cache/', UserCacheStatsView.as_view(), name='auth-cache'),
 ]
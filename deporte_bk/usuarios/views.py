@@ -4,7 +4,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework_simplejwt.tokens import RefreshToken
-from deporte_bd.models import Usuario, Bitacora
+from deporte_bd.models import Usuario
+from reportes.audit import registrar
 from drf_spectacular.utils import extend_schema
 from .serializers import LoginSerializer, TokenResponseSerializer
 from .serializers import RolSerializer
@@ -13,7 +14,7 @@ from deporte_bd.models import Rol
 from .serializers import UsuarioSerializer
 from .permissions import IsAdminOrOrganizer
 from rest_framework.generics import RetrieveUpdateDestroyAPIView
-from usuarios.authentication import UsuarioJWTAuthentication
+from usuarios.authentication import UsuarioJWTAuthentication, cache_stats
 
 
 class AuthController(APIView):
@@ -37,7 +38,7 @@ class AuthController(APIView):
 		# Verificar contraseña (almacenada como hash)
 		if not check_password(contrasena, usuario.Contrasena):
 			# registrar intento fallido en bitácora
-			Bitacora.objects.create(IDUsuario=usuario, Accion='login_fail', Detalle='Credenciales inválidas')
+			registrar(usuario.id, 'login_fail', 'Credenciales inválidas')
 			return Response({'detail': 'Credenciales inválidas.'}, status=status.HTTP_401_UNAUTHORIZED)
 
 		# Crear tokens JWT
@@ -46,7 +47,7 @@ class AuthController(APIView):
 		refresh_token = str(refresh)
 
 		# Registrar éxito en bitácora
-		Bitacora.objects.create(IDUsuario=usuario, Accion='login', Detalle='Inicio de sesión exitoso')
+		registrar(usuario.id, 'login', 'Inicio de sesión exitoso')
 
 		return Response({
 			'access': access,
@@ -65,14 +66,10 @@ class LogoutController(APIView):
 	permission_classes = [permissions.IsAuthenticated]
 
 	def post(self, request, *args, **kwargs):
-		# Registrar cierre de sesión en bitácora
-		user = request.user
-		# Nuestro token puede no mapear a un Usuario Django; intentamos hallar Usuario por pk en request.user
-		try:
-			usuario = Usuario.objects.get(id=getattr(user, 'id', None))
-			Bitacora.objects.create(IDUsuario=usuario, Accion='logout', Detalle='Cierre de sesión')
-		except Exception:
-			pass
+		# Registrar cierre de sesión en bitácora (request.user ya es el Usuario del token)
+		usuario_id = getattr(request.user, 'id', None)
+		if usuario_id:
+			registrar(usuario_id, 'logout', 'Cierre de sesión')
 
 		return Response({'detail': 'Sesión cerrada'}, status=status.HTTP_200_OK)
 
@@ -105,38 +102,22 @@ class UserDetail(RetrieveUpdateDestroyAPIView):
 		usuario_actualizado = serializer.save()
 
 		# Registrar en bitácora: actor obtenido desde token
+		# (si no se conoce actor, se registra con el mismo usuario objetivo)
+		actor_id = self._actor_id() or usuario_actualizado.id
+		registrar(actor_id, 'update_user', f'Usuario actualizado: id={usuario_actualizado.id}')
+
+	def _actor_id(self):
+		"""ID del usuario que hace la petición, leído del token sin consultar la base."""
 		token = getattr(self.request, 'auth', None)
-		actor = None
 		try:
-			user_id = token.get('user_id') if hasattr(token, 'get') else getattr(token, 'user_id', None)
-			if user_id:
-				actor = Usuario.objects.filter(id=user_id).first()
+			return token.get('user_id') if hasattr(token, 'get') else getattr(token, 'user_id', None)
 		except Exception:
-			actor = None
-
-		detalle = f'Usuario actualizado: id={usuario_actualizado.id}'
-		if actor:
-			Bitacora.objects.create(IDUsuario=actor, Accion='update_user', Detalle=detalle)
-		else:
-			# registrar con el mismo usuario objetivo si no se conoce actor
-			Bitacora.objects.create(IDUsuario=usuario_actualizado, Accion='update_user', Detalle=detalle)
+			return None
 
 	def perform_destroy(self, instance):
 		# Registrar antes de borrar
-		token = getattr(self.request, 'auth', None)
-		actor = None
-		try:
-			user_id = token.get('user_id') if hasattr(token, 'get') else getattr(token, 'user_id', None)
-			if user_id:
-				actor = Usuario.objects.filter(id=user_id).first()
-		except Exception:
-			actor = None
-
-		detalle = f'Usuario eliminado: id={instance.id}'
-		if actor:
-			Bitacora.objects.create(IDUsuario=actor, Accion='delete_user', Detalle=detalle)
-		else:
-			Bitacora.objects.create(IDUsuario=instance, Accion='delete_user', Detalle=detalle)
+		actor_id = self._actor_id() or instance.id
+		registrar(actor_id, 'delete_user', f'Usuario eliminado: id={instance.id}')
 
 		instance.delete()
 
@@ -151,3 +132,11 @@ class UsersList(generics.ListAPIView):
 	@extend_schema(responses=UsuarioSerializer(many=True))
 	def get(self, request, *args, **kwargs):
 		return super().get(request, *args, **kwargs)
+
+
+class UserCacheStatsView(APIView):
+	"""Contadores de la caché de usuarios autenticados de este proceso (ver usuarios.authentication)."""
+	permission_classes = (IsAdminOrOrganizer,)
+
+	def get(self, request):
+		return Response(cache_stats())